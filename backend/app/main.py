@@ -1,6 +1,5 @@
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.routes import complaint_routes
@@ -11,13 +10,23 @@ from app.routes import official_routes
 from app.routes.worker_router import router as worker_router
 from app.routes.category_routes import router as category_router
 from app.routes.admin_routes import router as admin_router
+from app.routes.media_routes import router as media_router
 
 from app.utils.db import get_db, engine
 from app.models.base import Base
 from app.models.worker import Worker
 from app.routes.employee_routes import router as employee_router
+from app.services import ai_service, analytics_service, mail_queue_service
+from app.utils.hash_pool import hash_pool
+from app.utils.images import image_pool
+from app.utils.smtp_client import smtp_pool
+from app.utils.uploads import UploadSizeLimitMiddleware
 app = FastAPI(title="Urbanlife API")
 
+# Yükleme gövdeleri ağdan okunurken boyut sınırı uygulanır (413).
+# CORS'tan önce eklenir ki 413 yanıtları da CORS header'larını alsın.
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS middleware - allow React Native app to communicate with API
 app.add_middleware(
     CORSMiddleware,
@@ -37,8 +46,24 @@ app.include_router(assignment_routes.router)
 app.include_router(user_routes.router)
 app.include_router(admin_router)
 app.include_router(employee_router)
-# Statik dosyalar
-app.mount("/media", StaticFiles(directory="media"), name="media")
+# Medya dosyaları (yerel disk ya da S3 uyumlu depo, bkz. app/utils/storage.py)
+app.include_router(media_router)
+
+
+@app.on_event("startup")
+def start_background_jobs():
+    analytics_service.start_rollup_worker()
+    mail_queue_service.start_mail_worker()
+    ai_service.warm_up()
+    ai_service.start_model_watcher()
+
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    hash_pool.shutdown()
+    image_pool.shutdown()
+    smtp_pool.close_all()
+
 
 @app.get("/auth/open-app", response_class=HTMLResponse)
 def open_mobile_app_bridge(token: str):
@@ -9,3 +9,10 @@ from .assignment_model import Assignment, AssignmentStatus
 from .notification_model import Notification, NotificationStatus
 from .worker import Worker
 from .complaint_resolution_photo_model import ComplaintResolutionPhoto
+from .complaint_cluster_model import ComplaintClusterCell
+from .stats_counter_model import StatsCounter
+from .analytics_rollup_model import AnalyticsDirtyDay, ComplaintDailyRollup, ResolutionTimeBucket
+from .job_checkpoint_model import JobCheckpoint
+from .outbound_email_model import OutboundEmail
+from .bulk_email_job_model import BulkEmailJob
+from .media_blob_model import MediaBlob
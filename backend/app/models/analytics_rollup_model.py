@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, String, Date
+
+from .base import Base
+
+
+class ComplaintDailyRollup(Base):
+    """
+    Gün, kategori ve bölge (5 karakterlik geohash, ~5km) başına açılan,
+    çözülen ve reddedilen şikayet sayıları. Analitik job'u tarafından doldurulur.
+    """
+    __tablename__ = "complaint_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    # 0 = kategorisiz, "" = konumsuz (PK içinde NULL kullanılamıyor)
+    category_id = Column(Integer, primary_key=True)
+    area = Column(String(5), primary_key=True)
+
+    opened = Column(Integer, nullable=False, default=0)
+    resolved = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+
+
+class ResolutionTimeBucket(Base):
+    """
+    Çözülme süresi histogramı (log ölçekli kovalar). Medyan süre, seçilen
+    aralıktaki kovalar birleştirilerek ham satırlara inmeden hesaplanır.
+    """
+    __tablename__ = "resolution_time_buckets"
+
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    area = Column(String(5), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
+
+
+class AnalyticsDirtyDay(Base):
+    """
+    Artık hiçbir satırın o güne düşmediği değişiklikler (çözülme / red
+    geri alındı, şikayet silindi) yüzünden rollup'ı yeniden hesaplanacak
+    günler. Sonraki rollup çalışması işleyip siler.
+    """
+    __tablename__ = "analytics_dirty_days"
+
+    day = Column(Date, primary_key=True)
+    # Rollup okuduğu kadarını siler; arada gelen işaret kaybolmaz
+    changes = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from datetime import datetime
+
+from .base import Base
+
+
+class BulkEmailJob(Base):
+    """
+    Toplu e-posta gönderimi (ör. çözülen şikayetin destekçilerine bildirim).
+    Alıcılar parça parça outbound_emails'e yazılır; alıcı bazında durum
+    outbound_emails.bulk_job_id üzerinden izlenir.
+    """
+    __tablename__ = "bulk_email_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    complaint_id = Column(Integer, ForeignKey("complaints.id"), nullable=False, index=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    note = Column(Text, nullable=True)
+
+    # queued | expanding | done
+    status = Column(String(16), nullable=False, default="queued")
+    total_recipients = Column(Integer, nullable=False, default=0)
+    # Alıcı listesinde kalınan yer (complaint_supports.id); yarıda kalan job buradan devam eder
+    last_support_id = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expanded_at = Column(DateTime, nullable=True)
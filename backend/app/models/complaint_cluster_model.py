@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float
+
+from .base import Base
+
+
+class ComplaintClusterCell(Base):
+    """
+    Harita kümeleri için zoom seviyesi başına önceden toplanmış şikayet sayıları.
+    Her satır bir ızgara hücresinde (status, kategori) kırılımını tutar.
+    """
+    __tablename__ = "complaint_cluster_cells"
+
+    zoom = Column(Integer, primary_key=True)
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+    status = Column(String(20), primary_key=True)
+    # 0 = kategorisiz (PK içinde NULL kullanılamıyor)
+    category_id = Column(Integer, primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
+    # Küme merkezini (ağırlık merkezi) hesaplamak için koordinat toplamları
+    lat_sum = Column(Float, nullable=False, default=0.0)
+    lon_sum = Column(Float, nullable=False, default=0.0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, DateTime, ForeignKey, Float, Text, Boolean
+from sqlalchemy import Column, Integer, String, Enum, DateTime, ForeignKey, Float, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -24,6 +24,14 @@ class Priority(enum.Enum):
 
 class Complaint(Base):
     __tablename__ = "complaints"
+    # Feed keyset sayfalaması (created_at, id) ve (support_count, created_at, id) üzerinden yürür.
+    __table_args__ = (
+        Index("ix_complaints_created_at_id", "created_at", "id"),
+        Index("ix_complaints_support_count_created_at_id", "support_count", "created_at", "id"),
+        Index("ix_complaints_geo_cell", "geo_cell"),
+        Index("ix_complaints_resolved_at", "resolved_at"),
+        Index("ix_complaints_rejected_at", "rejected_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -38,6 +46,13 @@ class Complaint(Base):
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
 
+    # Konumun geohash'i; yakındaki şikayetler index üzerinden prefix aralığıyla bulunur.
+    # Postgres'te "C" collation ile byte sıralaması garanti edilir.
+    geo_cell = Column(
+        String(12).with_variant(String(12, collation="C"), "postgresql"),
+        nullable=True,
+    )
+
     
     photo_url = Column(String, nullable=True)
 
@@ -49,6 +64,10 @@ class Complaint(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Şikayetin resolved / rejected durumuna girdiği an; durumdan çıkınca
+    # silinir (bkz. analytics_service.record_status_change)
+    resolved_at = Column(DateTime, nullable=True)
+    rejected_at = Column(DateTime, nullable=True)
 
     user = relationship("User", backref="complaints")
     category = relationship("Category", back_populates="complaints")
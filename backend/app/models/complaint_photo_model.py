@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -11,6 +11,8 @@ class ComplaintPhoto(Base):
     id = Column(Integer, primary_key=True, index=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id"), nullable=False)
     photo_url = Column(String, nullable=False)
+    # Türevler: {"thumb"|"medium"|"original": {url, width, height, bytes}}; eski kayıtlarda NULL
+    variants = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, func
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -9,6 +9,8 @@ class ComplaintResolutionPhoto(Base):
     id = Column(Integer, primary_key=True, index=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id", ondelete="CASCADE"), nullable=False, index=True)
     photo_url = Column(String, nullable=False)
+    # Türevler: {"thumb"|"medium"|"original": {url, width, height, bytes}}; eski kayıtlarda NULL
+    variants = Column(JSON, nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     complaint = relationship("Complaint", back_populates="resolution_photos")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -16,3 +16,8 @@ class ComplaintSupport(Base):
     
     complaint = relationship("Complaint", backref="supports")
     user = relationship("User", backref="supports")
+
+    __table_args__ = (
+        # Bir şikayetin destekçilerini id sırasıyla parça parça okumak için
+        Index("ix_complaint_supports_complaint_id_id", "complaint_id", "id"),
+    )
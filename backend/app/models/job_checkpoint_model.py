@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+
+from .base import Base
+
+
+class JobCheckpoint(Base):
+    """
+    Arka plan job'larının kaldığı yer (watermark, son işlenen id vb.).
+    """
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String, primary_key=True)
+    value = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
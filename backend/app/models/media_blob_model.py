@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from datetime import datetime
+
+from .base import Base
+
+
+class MediaBlob(Base):
+    """
+    İçerik adresli medya dosyası. Aynı bayt dizisi bir kez saklanır;
+    ref_count, dosyayı gösteren fotoğraf türevi / avatar sayısıdır.
+    Son referans silinince dosya da silinir.
+    """
+    __tablename__ = "media_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    # MEDIA_ROOT altındaki yol: blobs/ab/cd/<sha256>.<uzantı>
+    key = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(64), nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, ForeignKey
+from datetime import datetime
+
+from .base import Base
+
+
+class OutboundEmail(Base):
+    """
+    Gönderilmeyi bekleyen e-postalar. Mesaj hazır RFC 822 metni olarak
+    saklanır; arka plan worker'ı SMTP'ye teslim eder ve hata alırsa
+    üstel bekleme ile yeniden dener.
+    """
+    __tablename__ = "outbound_emails"
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=True)
+    message = Column(Text, nullable=False)
+
+    # pending | sending | sent | failed
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    # Toplu gönderimlerde ait olduğu job; tekil mesajlarda boş
+    bulk_job_id = Column(Integer, ForeignKey("bulk_email_jobs.id"), nullable=True, index=True)
+    recipient_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbound_emails_status_next_attempt_at", "status", "next_attempt_at"),
+    )
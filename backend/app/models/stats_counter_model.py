@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Date
+
+from .base import Base
+
+
+class StatsCounter(Base):
+    """
+    Dashboard istatistikleri için artımlı tutulan şikayet sayaçları.
+    Şikayetin oluşturulduğu gün, güncel status'u ve kategorisi başına bir satır.
+    """
+    __tablename__ = "stats_counters"
+
+    status = Column(String(20), primary_key=True)
+    # 0 = kategorisiz (PK içinde NULL kullanılamıyor)
+    category_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
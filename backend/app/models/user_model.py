@@ -49,6 +49,11 @@ class User(Base):
     is_phone_verified = Column(Boolean, default=False, nullable=False)
     phone_verification_code = Column(String(6), nullable=True)
     phone_verification_expires = Column(DateTime, nullable=True)
+
+    # JWT "ver" claim'i ile karşılaştırılır; artırılınca eski token'lar geçersiz olur
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
+    token_revoked_at = Column(DateTime, nullable=True, index=True)
+
     @property
     def full_name(self):
         return self.name
\ No newline at end of file
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from typing import Optional, List
+from datetime import date
 
 from app.utils.db import get_db
-from app.routes.auth_routes import get_current_user, role_required
+from app.routes.auth_routes import get_current_principal, role_required
+from app.utils.user_cache import UserPrincipal, principal_cache
+from app.utils.hash_pool import hash_pool
+from app.utils.images import image_pool
 from app.models.user_model import User, UserRole
 from app.schemas.admin_schema import CategoryCreate, CategoryUpdate, CategoryOut
 
@@ -11,8 +15,8 @@ from app.schemas.admin_schema import (
     OfficialCreate, OfficialUpdate, OfficialOut,
     AdminUserOut, StatsOverviewOut, AuditLogOut
 )
-from app.services import admin_service
-from app.schemas.admin_schema import AdminStatsOut
+from app.services import admin_service, ai_service, analytics_service, mail_queue_service, media_store
+from app.schemas.admin_schema import AdminStatsOut, TimeseriesOut, ModelActivateIn
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 @router.get("/officials", response_model=List[OfficialOut], dependencies=[Depends(role_required(UserRole.admin))])
@@ -27,7 +31,7 @@ def admin_list_officials(
 def admin_create_official(
     payload: OfficialCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: UserPrincipal = Depends(get_current_principal),
 ):
     return admin_service.create_official(db, user, payload.full_name, payload.email, payload.password, payload.phone_number)
 
@@ -40,7 +44,7 @@ def admin_update_official(
     official_id: int,
     payload: OfficialUpdate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: UserPrincipal = Depends(get_current_principal),
 ):
     return admin_service.update_official(db, user, official_id, payload.full_name, payload.phone_number, payload.is_active)
 
@@ -54,8 +58,11 @@ def admin_list_users(
     return admin_service.list_users(db, q, role, is_active)
 
 @router.get("/stats/overview", response_model=StatsOverviewOut, dependencies=[Depends(role_required(UserRole.admin))])
-def admin_stats_overview(db: Session = Depends(get_db)):
-    return admin_service.stats_overview(db)
+def admin_stats_overview(
+    fresh: bool = Query(False, description="Önbelleği atlayıp anlık hesapla"),
+    db: Session = Depends(get_db),
+):
+    return admin_service.stats_overview(db, use_cache=not fresh)
 
 @router.get("/audit", response_model=List[AuditLogOut], dependencies=[Depends(role_required(UserRole.admin))])
 def admin_audit(limit: int = 100, db: Session = Depends(get_db)):
@@ -67,8 +74,70 @@ def admin_audit(limit: int = 100, db: Session = Depends(get_db)):
 
 
 @router.get("/stats", response_model=AdminStatsOut, dependencies=[Depends(role_required(UserRole.admin))])
-def admin_stats(db: Session = Depends(get_db)):
-    return admin_service.get_admin_stats(db)
+def admin_stats(
+    fresh: bool = Query(False, description="Önbelleği atlayıp anlık hesapla"),
+    db: Session = Depends(get_db),
+):
+    return admin_service.get_admin_stats(db, use_cache=not fresh)
+
+@router.get("/analytics/timeseries", response_model=TimeseriesOut, dependencies=[Depends(role_required([UserRole.admin, UserRole.official]))])
+def admin_analytics_timeseries(
+    start: date = Query(...),
+    end: date = Query(...),
+    granularity: str = Query("day", description="day | week"),
+    category_id: Optional[int] = Query(None),
+    area: Optional[str] = Query(None, description="5 karakterlik geohash bölge kodu"),
+    group_by: Optional[str] = Query(None, description="category | area"),
+    db: Session = Depends(get_db),
+):
+    return analytics_service.get_timeseries(db, start, end, granularity, category_id, area, group_by)
+
+@router.post("/analytics/rollup", dependencies=[Depends(role_required(UserRole.admin))])
+def admin_run_analytics_rollup(
+    full: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    result = analytics_service.run_rollup(db, full=full)
+    db.commit()
+    return result
+
+@router.get("/metrics", dependencies=[Depends(role_required(UserRole.admin))])
+def admin_runtime_metrics(db: Session = Depends(get_db)):
+    """
+    Bu sürecin iç kuyruk / önbellek metrikleri (worker başına) ve
+    e-posta kuyruğunun / medya deposunun durumu.
+    """
+    return {
+        "hash_pool": hash_pool.stats(),
+        "image_pool": image_pool.stats(),
+        "user_cache": principal_cache.stats(),
+        "mail_queue": mail_queue_service.queue_stats(db),
+        "category_batcher": ai_service.batcher_stats(),
+        "category_cache": ai_service.prediction_cache.stats(),
+        "media_store": media_store.stats(db),
+    }
+
+@router.get("/models", dependencies=[Depends(role_required(UserRole.admin))])
+def admin_model_status():
+    """
+    Bu süreçteki aktif/önceki kategori modeli ve diskteki sürümler.
+    """
+    return ai_service.registry.status()
+
+@router.post("/models/activate", status_code=202, dependencies=[Depends(role_required(UserRole.admin))])
+def admin_activate_model(payload: ModelActivateIn):
+    """
+    Sürümü arka planda yükler, doğrular ve aktif dosyaya yazar; diğer
+    worker'lar izleyicileriyle aynı sürüme geçer. version verilmezse aktif
+    dosya yeniden okunur.
+    """
+    ai_service.registry.activate(payload.version)
+    return ai_service.registry.status()
+
+@router.post("/models/rollback", dependencies=[Depends(role_required(UserRole.admin))])
+def admin_rollback_model():
+    ai_service.registry.rollback()
+    return ai_service.registry.status()
 
 @router.get("/categories", response_model=List[CategoryOut], dependencies=[Depends(role_required(UserRole.admin))])
 def admin_list_categories(
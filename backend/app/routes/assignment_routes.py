@@ -3,8 +3,9 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.utils.db import get_db
-from app.routes.auth_routes import get_current_user, role_required
-from app.models.user_model import User, UserRole
+from app.routes.auth_routes import get_current_principal, role_required
+from app.utils.user_cache import UserPrincipal
+from app.models.user_model import UserRole
 from app.schemas.assignment_schema import (
     AssignmentCreate,
     AssignmentOut,
@@ -20,7 +21,7 @@ router = APIRouter(prefix="/assignments", tags=["Assignments"])
 def assign_complaint(
     data: AssignmentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required([UserRole.admin, UserRole.official]))
+    current_user: UserPrincipal = Depends(role_required([UserRole.admin, UserRole.official]))
 ):
     """
     Bir şikayeti bir çalışan kullanıcıya atar.
@@ -37,7 +38,7 @@ def assign_complaint(
 @router.get("/my", response_model=List[AssignmentOut])
 def get_my_assignments(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     if current_user.role != UserRole.employee:
         raise HTTPException(
@@ -57,7 +58,7 @@ def get_my_assignments(
 def get_assignment_detail(
     assignment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     assignment = assignment_service.get_assignment(db, assignment_id)
     if not assignment:
@@ -75,7 +76,7 @@ def change_assignment_status(
     assignment_id: int,
     data: AssignmentStatusUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     assignment = assignment_service.get_assignment(db, assignment_id)
     if not assignment:
@@ -11,6 +11,7 @@ from app.models.user_model import User, UserRole
 from app.utils.db import get_db
 from app.utils.security import decode_access_token, hash_password
 from app.utils.email_service import send_password_reset_email
+from app.utils.user_cache import UserPrincipal, principal_cache, token_revocations
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -30,12 +31,12 @@ class ResetPasswordRequest(BaseModel):
 
 
 
-def get_current_user(
-    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    credentials = token.credentials
-    payload = decode_access_token(credentials)
+def _verified_claims(token: HTTPAuthorizationCredentials, db: Session):
+    """
+    Token'ı çözer ve iptal listesine karşı kontrol eder.
+    (payload, user_id, token_version) döner.
+    """
+    payload = decode_access_token(token.credentials)
 
     if not payload:
         raise HTTPException(
@@ -44,6 +45,29 @@ def get_current_user(
         )
 
     user_id = int(payload.get("sub"))
+    # "ver" claim'i olmayan eski token'lar 0. sürüm sayılır
+    token_version = int(payload.get("ver", 0))
+
+    token_revocations.refresh(db)
+    if token_revocations.is_revoked(user_id, token_version):
+        raise _revoked_token()
+
+    return payload, user_id, token_version
+
+
+def _revoked_token():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Oturumunuz sonlandırıldı. Lütfen tekrar giriş yapın.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def get_current_user(
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    _, user_id, token_version = _verified_claims(token, db)
     db_user = db.query(User).filter_by(id=user_id).first()
 
     if not db_user:
@@ -52,24 +76,78 @@ def get_current_user(
             detail="User not found"
         )
 
+    if token_version < (db_user.token_version or 0):
+        raise _revoked_token()
+
+    principal_cache.put(UserPrincipal.from_user(db_user))
     return db_user
 
 
+def get_current_principal(
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> UserPrincipal:
+    """
+    get_current_user'ın salt okunur karşılığı: kullanıcıyı önbellekten
+    döner, önbellekte yoksa tek sorguyla yükleyip önbelleğe koyar.
+    Kullanıcıyı değiştirecek endpoint'ler get_current_user kullanmalıdır.
+    """
+    _, user_id, token_version = _verified_claims(token, db)
+
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        db_user = db.query(User).filter_by(id=user_id).first()
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        principal = UserPrincipal.from_user(db_user)
+        principal_cache.put(principal)
+
+    if token_version < principal.token_version:
+        raise _revoked_token()
+    return principal
+
+
 
 def role_required(required_roles: Union[UserRole, Iterable[UserRole]]):
-   
+    """
+    Yalnızca role bakan endpoint'ler için yetki kontrolü. Rol, login'de
+    token'a yazılan "role" claim'inden okunur; token sürümü iptal listesinde
+    geride kalmadıkça veritabanına gidilmez.
+    """
     if isinstance(required_roles, UserRole):
         required_roles = [required_roles]
     else:
         required_roles = list(required_roles)
 
-    def wrapper(current_user=Depends(get_current_user)):
-        if current_user.role not in required_roles:
+    def wrapper(
+        token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+        db: Session = Depends(get_db)
+    ):
+        payload, user_id, token_version = _verified_claims(token, db)
+
+        try:
+            role = UserRole(payload.get("role"))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token"
+            )
+
+        if role not in required_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Bu işlem için yetkiniz yok."
             )
-        return current_user
+
+        principal = principal_cache.get(user_id)
+        if principal is None:
+            return UserPrincipal.from_claims(user_id, role, token_version)
+        if token_version < principal.token_version:
+            raise _revoked_token()
+        return principal
 
     return wrapper
 
@@ -85,7 +163,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     from fastapi import HTTPException as FastAPIHTTPException
 
     try:
-        new_user = register_user(db, user)
+        new_user = await register_user(db, user)
         return {
             "message": "Kayıt başarılı. Lütfen emailinizi kontrol ederek hesabınızı doğrulayın.",
             "user": {
@@ -108,12 +186,13 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: Session = Depends(get_db)):
     """
     - Email + şifre doğrulama
     - is_verified = True değilse login'e izin vermez
+    - bcrypt doğrulaması hash havuzunda yapılır; havuz doluysa 503 döner
     """
-    return login_user(db, user)
+    return await login_user(db, user)
 
 
 
@@ -158,17 +237,19 @@ def change_password(
     current_user.updated_at = datetime.utcnow()
     db.add(current_user)
     db.commit()
+    principal_cache.invalidate(current_user.id)
     
     return {"message": "Şifre başarıyla değiştirildi."}
 
 
-@router.get("/admin-only")
-def admin_endpoint(current_user: User = Depends(role_required([UserRole.admin]))):
+@router.get("/admin-only", dependencies=[Depends(role_required([UserRole.admin]))])
+def admin_endpoint(current_user: User = Depends(get_current_user)):
+    # Principal'da ad yok; karşılama için kullanıcı satırı okunur
     return {"message": f"Hoş geldin {current_user.name}, sen adminsin!"}
 
 
 @router.get("/dashboard")
-def dashboard(current_user: User = Depends(role_required([UserRole.admin, UserRole.official]))):
+def dashboard(current_user: UserPrincipal = Depends(role_required([UserRole.admin, UserRole.official]))):
     return {"message": f"{current_user.role.value} paneline eriştin"}
 
 
@@ -198,6 +279,7 @@ def verify_email(token: str, db: Session = Depends(get_db)):
     user.is_verified = True
     user.verification_token = None
     db.commit()
+    principal_cache.invalidate(user.id)
 
     return {"message": "E-posta başarıyla doğrulandı. Artık giriş yapabilirsiniz."}
 
@@ -278,5 +360,6 @@ def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db))
 
     db.add(user)
     db.commit()
+    principal_cache.invalidate(user.id)
 
     return {"message": "Şifreniz başarıyla güncellendi. Artık yeni şifrenizle giriş yapabilirsiniz."}
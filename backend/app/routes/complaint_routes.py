@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status,UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List,Optional
 from fastapi import UploadFile, File,Query
+from fastapi.concurrency import run_in_threadpool
 from app.utils.db import get_db
-from app.services import complaint_service
+from app.services import complaint_service, cluster_service
 from app.schemas.complaint_schema import (
     ComplaintCreate,
     ComplaintOut,
@@ -13,24 +14,26 @@ from app.schemas.complaint_schema import (
     ComplaintRatingOut,
     ComplaintUpdateStatus,
     ComplaintPhotoOut,
-   
+    ComplaintFeedOut,
+    NearbyComplaintOut,
+    ClusterResponseOut,
+    CategorySuggestRequest,
+    CategorySuggestOut,
 )
-from app.routes.auth_routes import get_current_user, role_required
+from app.routes.auth_routes import get_current_principal, role_required
+from app.utils.user_cache import UserPrincipal
+from app.utils.uploads import save_uploads
+from app.utils.images import DEFAULT_FEED_VARIANT, VARIANT_NAMES, process_uploads, variant_url
+from app.services import media_store
 from app.models.user_model import User, UserRole
 from app.models.category_model import Category
 from app.models.complaint_model import Complaint
 from app.models.assignment_model import Assignment
-import time
-from pathlib import Path
 import os
 
 
 from app.models.complaint_model import ComplaintPhoto
 
-MEDIA_ROOT = Path("media")
-UPLOAD_DIR = Path("media/complaints")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 router = APIRouter(prefix="/complaints", tags=["Complaints"])
 
 
@@ -39,7 +42,7 @@ router = APIRouter(prefix="/complaints", tags=["Complaints"])
 def create_complaint(
     complaint: ComplaintCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
 
     if current_user.role != UserRole.citizen:
@@ -65,10 +68,22 @@ def create_complaint(
 
 
 
+@router.post("/suggest-category", response_model=CategorySuggestOut)
+async def suggest_category(
+    payload: CategorySuggestRequest,
+    current_user: UserPrincipal = Depends(get_current_principal),
+):
+    """
+    Şikayet yazılırken kategori seçicisini önceden doldurmak için; uygulama
+    yazmayı debounce ederek çağırır.
+    """
+    return await complaint_service.suggest_categories(payload.text, payload.k)
+
+
 @router.get("/my", response_model=List[ComplaintOut])
 def get_my_complaints(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     return complaint_service.get_my_complaints(db, current_user.id)
 
@@ -76,7 +91,7 @@ def get_my_complaints(
 @router.get("/", response_model=List[ComplaintOut])
 def get_all_complaints(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     if current_user.role not in [UserRole.admin, UserRole.official]:
         raise HTTPException(
@@ -92,7 +107,7 @@ def update_complaint_status(
     complaint_id: int,
     data: ComplaintUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     if current_user.role not in [UserRole.admin, UserRole.official, UserRole.employee]:
         raise HTTPException(
@@ -112,7 +127,7 @@ def add_rating(
     complaint_id: int,
     rating: ComplaintRatingCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     return complaint_service.add_rating(db, complaint_id, current_user.id, rating)
 
@@ -122,7 +137,7 @@ def add_rating(
 def toggle_support(
     complaint_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     result, error = complaint_service.toggle_support(db, complaint_id, current_user.id)
 
@@ -159,7 +174,7 @@ async def upload_complaint_photos(
     complaint_id: int,
     files: List[UploadFile] = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     complaint = complaint_service.get_complaint_by_id(db, complaint_id)
     if not complaint:
@@ -178,63 +193,65 @@ async def upload_complaint_photos(
 
     saved_photos = []
 
-    for f in files:
-        timestamp = int(time.time())
-        safe_name = f"complaint_{complaint_id}_{timestamp}_{f.filename}"
-        file_path = UPLOAD_DIR / safe_name
+    uploads = await save_uploads(files, media_store.STAGING_DIR, f"complaint_{complaint_id}")
+    for image in await process_uploads(uploads):
+        # Depoya yazma (S3'te boto3) ve commit event loop'u bloklamasın
+        photo = await run_in_threadpool(_publish_photo, db, complaint_id, image)
+        saved_photos.append(photo)
 
-        content = await f.read()
-        with open(file_path, "wb") as out:
-            out.write(content)
+    return saved_photos
 
-        public_path = f"/media/complaints/{safe_name}"
 
-        photo = complaint_service.add_photo(
+def _publish_photo(db: Session, complaint_id: int, image):
+    with media_store.publishing(db, image.staged) as staged:
+        return complaint_service.add_photo(
             db,
             complaint_id=complaint_id,
-            photo_url=public_path,  
+            photo_url=image.variants["original"]["url"],
+            variants=image.variants,
+            blobs=staged,
         )
-        saved_photos.append(photo)
-
-    return saved_photos
 
 
-@router.get("/feed", response_model=List[ComplaintOut])
-def get_complaints_feed(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    sort: Optional[str] = Query("newest"),
-):
-    from app.models.complaint_support_model import ComplaintSupport
-    from sqlalchemy.orm import joinedload
-    
-    query = db.query(Complaint).options(
-        joinedload(Complaint.photos),
-        joinedload(Complaint.resolution_photos),
-        joinedload(Complaint.user),
-    )
+def _serialize_photo(photo, photo_size: str) -> dict:
+    return {
+        "id": photo.id,
+        "photo_url": variant_url(photo.variants, photo_size, photo.photo_url),
+        "variants": photo.variants,
+        "created_at": photo.created_at,
+    }
 
-    if sort == "newest":
-        query = query.order_by(Complaint.created_at.desc())
 
-    elif sort == "oldest":
-        query = query.order_by(Complaint.created_at.asc())
+def _serialize_feed_items(
+    db: Session,
+    complaints: List[Complaint],
+    current_user_id: int,
+    photo_size: str = DEFAULT_FEED_VARIANT,
+) -> List[dict]:
+    """
+    Feed kartlarını üretir. Sayfa başına sabit sayıda sorgu çalışır.
+    Fotoğrafların photo_url'i photo_size türevidir (varsayılan küçük
+    resim); diğer türevler variants içinde döner.
+    """
+    from app.models.complaint_support_model import ComplaintSupport
 
-    elif sort == "popular": 
-        query = query.order_by(
-            Complaint.support_count.desc(),
-            Complaint.created_at.desc()
-        )
+    page_ids = [c.id for c in complaints]
+
+    # Sadece bu sayfadaki şikayetler için kullanıcının desteklerini tek sorguda al
+    user_supported_ids = set()
+    if page_ids:
+        user_supported_ids = {
+            row[0]
+            for row in db.query(ComplaintSupport.complaint_id)
+            .filter(
+                ComplaintSupport.user_id == current_user_id,
+                ComplaintSupport.complaint_id.in_(page_ids),
+            )
+            .all()
+        }
 
-    complaints = query.all()
-    
-    # Get all support records for current user in one query
-    user_supported_ids = set(
-        db.query(ComplaintSupport.complaint_id)
-        .filter(ComplaintSupport.user_id == current_user.id)
-        .all()
-    )
-    user_supported_ids = {id[0] for id in user_supported_ids}
+    # Eski (assignments.solution_photo_url) çözüm fotoğrafları sayfa için tek sorguda
+    legacy_resolution_photos = complaint_service.get_legacy_resolution_photos(db, complaints)
     
     # Add user_supported field to each complaint
     result = []
@@ -254,36 +271,11 @@ def get_complaints_feed(
             else:
                 user_name = full_name
         
-        # Çözüm fotoğraflarını al (yeni model + eski assignments tablosu)
-        import json
-        from datetime import datetime as dt
-        resolution_photos = []
-        
-        # Önce yeni resolution_photos relationship'ten al
-        for photo in complaint.resolution_photos:
-            resolution_photos.append({
-                "id": photo.id,
-                "photo_url": photo.photo_url,
-                "created_at": photo.created_at,
-            })
-        
-        # Eski assignments tablosundan da al (geriye uyumluluk)
-        if not resolution_photos:
-            assignments = db.query(Assignment).filter(Assignment.complaint_id == complaint.id).all()
-            for assignment in assignments:
-                if assignment.solution_photo_url:
-                    try:
-                        urls = json.loads(assignment.solution_photo_url)
-                        if isinstance(urls, list):
-                            for idx, url in enumerate(urls):
-                                resolution_photos.append({
-                                    "id": idx + 1000 + len(resolution_photos),
-                                    "photo_url": url,
-                                    "created_at": assignment.updated_at or dt.utcnow(),
-                                })
-                    except:
-                        pass
-        
+        # Çözüm fotoğraflarını al (yeni model, yoksa eski assignments tablosu)
+        resolution_photos = [
+            _serialize_photo(photo, photo_size) for photo in complaint.resolution_photos
+        ] or legacy_resolution_photos.get(complaint.id, [])
+
         complaint_dict = {
             "id": complaint.id,
             "user_id": complaint.user_id,
@@ -302,7 +294,7 @@ def get_complaints_feed(
             "support_count": complaint.support_count,
             "created_at": complaint.created_at,
             "updated_at": complaint.updated_at,
-            "photos": complaint.photos,
+            "photos": [_serialize_photo(photo, photo_size) for photo in complaint.photos],
             "user_supported": complaint.id in user_supported_ids,
             "resolution_photos": resolution_photos,
         }
@@ -311,11 +303,54 @@ def get_complaints_feed(
     return result
 
 
+@router.get("/feed", response_model=ComplaintFeedOut)
+def get_complaints_feed(
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_principal),
+    sort: Optional[str] = Query("newest"),
+    limit: int = Query(complaint_service.FEED_DEFAULT_LIMIT, ge=1, le=complaint_service.FEED_MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    photo_size: str = Query(DEFAULT_FEED_VARIANT, pattern=f"^({'|'.join(VARIANT_NAMES)})$"),
+):
+    complaints, next_cursor = complaint_service.get_feed_page(db, sort, limit, cursor)
+    return {
+        "items": _serialize_feed_items(db, complaints, current_user.id, photo_size),
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/nearby", response_model=List[NearbyComplaintOut])
+def get_nearby_complaints(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_m: float = Query(complaint_service.NEARBY_DEFAULT_RADIUS_M, gt=0, le=complaint_service.NEARBY_MAX_RADIUS_M),
+    limit: int = Query(complaint_service.FEED_DEFAULT_LIMIT, ge=1, le=complaint_service.FEED_MAX_LIMIT),
+    photo_size: str = Query(DEFAULT_FEED_VARIANT, pattern=f"^({'|'.join(VARIANT_NAMES)})$"),
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_principal),
+):
+    rows = complaint_service.get_nearby_complaints(db, lat, lon, radius_m, limit)
+    items = _serialize_feed_items(db, [c for c, _ in rows], current_user.id, photo_size)
+    for item, (_, distance) in zip(items, rows):
+        item["distance_m"] = round(distance, 1)
+    return items
+
+
+@router.get("/clusters", response_model=ClusterResponseOut)
+def get_complaint_clusters(
+    bbox: str = Query(..., description="min_lon,min_lat,max_lon,max_lat"),
+    zoom: int = Query(..., ge=0, le=22),
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_principal),
+):
+    return cluster_service.get_clusters(db, cluster_service.parse_bbox(bbox), zoom)
+
+
 @router.get("/{complaint_id}")
 def get_complaint_detail(
     complaint_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     import json
     complaint = complaint_service.get_complaint_by_id(db, complaint_id)
@@ -363,7 +398,7 @@ def get_complaint_detail(
 def delete_complaint(
     complaint_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     complaint = complaint_service.get_complaint_by_id(db, complaint_id)
     if not complaint:
@@ -387,7 +422,7 @@ def delete_complaint(
 def delete_complaint_photo(
     photo_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     photo = db.query(ComplaintPhoto).filter(ComplaintPhoto.id == photo_id).first()
     if not photo:
@@ -408,18 +443,13 @@ def delete_complaint_photo(
         )
 
     
-    if photo.photo_url and photo.photo_url.startswith("/media/"):
-        file_path = MEDIA_ROOT / photo.photo_url.replace("/media/", "")
-        if file_path.exists():
-            file_path.unlink()
-
     complaint_service.delete_photo(db, photo_id)  
     return
 @router.get("/{complaint_id}/photos", response_model=List[ComplaintPhotoOut])
 def get_complaint_photos(
     complaint_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
     if not complaint:
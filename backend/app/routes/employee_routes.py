@@ -1,32 +1,33 @@
 from fastapi import APIRouter, Depends,HTTPException,UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.models.assignment_model import Assignment, AssignmentStatus
 from datetime import datetime
 from app.utils.db import get_db
 from app.routes.auth_routes import get_current_user, role_required
-from app.models.user_model import UserRole, User
+from app.models.user_model import UserRole
+from app.utils.user_cache import UserPrincipal
 from app.services import employee_service
+from app.utils.uploads import save_uploads
+from app.utils.images import process_uploads
+from app.services import media_store
 from typing import List
 
-from pathlib import Path
-import time, json
+import json
 
 
 from app.models.complaint_model import Complaint, ComplaintStatus
+from app.services import aggregate_service
 
 router = APIRouter(prefix="/employee", tags=["Employee"])
-SOLUTION_DIR = Path("media/solutions")
-SOLUTION_DIR.mkdir(parents=True, exist_ok=True)
 
 @router.post("/assignments/{assignment_id}/solution-photos")
 async def upload_solution_photos(
     assignment_id: int,
     files: List[UploadFile] = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required(UserRole.employee)),
+    current_user: UserPrincipal = Depends(role_required(UserRole.employee)),
 ):
-    from app.models.complaint_resolution_photo_model import ComplaintResolutionPhoto
-    
     assignment = (
         db.query(Assignment)
         .filter(Assignment.id == assignment_id, Assignment.employee_id == current_user.id)
@@ -35,24 +36,28 @@ async def upload_solution_photos(
     if not assignment:
         raise HTTPException(status_code=404, detail="Görev bulunamadı.")
 
-    saved_paths: List[str] = []
+    uploads = await save_uploads(files, media_store.STAGING_DIR, f"solution_{assignment_id}")
+    images = await process_uploads(uploads)
+    # Depoya yazma (S3'te boto3) ve commit event loop'u bloklamasın
+    merged = await run_in_threadpool(_record_solution_photos, db, assignment, images)
+    return {"solution_photo_urls": merged, "assignment_status": "completed"}
 
-    for f in files:
-        timestamp = int(time.time())
-        safe_name = f"solution_{assignment_id}_{timestamp}_{f.filename}"
-        file_path = SOLUTION_DIR / safe_name
 
-        content = await f.read()
-        with open(file_path, "wb") as out:
-            out.write(content)
+def _record_solution_photos(db: Session, assignment: Assignment, images) -> List[str]:
+    from app.models.complaint_resolution_photo_model import ComplaintResolutionPhoto
+
+    saved_paths: List[str] = []
 
-        public_path = f"/media/solutions/{safe_name}"
+    staged = [blob for image in images for blob in image.staged]
+    for image in images:
+        public_path = image.variants["original"]["url"]
         saved_paths.append(public_path)
         
         # Yeni resolution_photos tablosuna ekle
         resolution_photo = ComplaintResolutionPhoto(
             complaint_id=assignment.complaint_id,
-            photo_url=public_path
+            photo_url=public_path,
+            variants=image.variants,
         )
         db.add(resolution_photo)
 
@@ -72,23 +77,31 @@ async def upload_solution_photos(
     assignment.status = AssignmentStatus.completed
     assignment.end_time = assignment.end_time or datetime.utcnow()
 
-    complaint = db.query(Complaint).filter(Complaint.id == assignment.complaint_id).first()
+    complaint = (
+        db.query(Complaint).filter(Complaint.id == assignment.complaint_id).with_for_update().first()
+    )
     if complaint:
+        before = aggregate_service.snapshot(complaint)
         complaint.status = ComplaintStatus.resolved
+        aggregate_service.on_complaint_changed(db, complaint, before)
+
+    with media_store.publishing(db, staged) as batch:
+        media_store.acquire(db, batch)
+        db.commit()
+    return merged
+
 
-    db.commit()
-    return {"solution_photo_urls": merged, "assignment_status": "completed"}
 @router.get("/complaints/assigned")
 def get_assigned_complaints(
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required(UserRole.employee)),
+    current_user: UserPrincipal = Depends(role_required(UserRole.employee)),
 ):
     return employee_service.get_assigned_complaints(db, current_user.id)
 @router.post("/assignments/{assignment_id}/start")
 def start_assignment(
     assignment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required(UserRole.employee)),
+    current_user: UserPrincipal = Depends(role_required(UserRole.employee)),
 ):
     assignment = (
         db.query(Assignment)
@@ -112,7 +125,7 @@ def start_assignment(
 def complete_assignment(
     assignment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required(UserRole.employee)),
+    current_user: UserPrincipal = Depends(role_required(UserRole.employee)),
 ):
     assignment = (
         db.query(Assignment)
@@ -134,7 +147,7 @@ def complete_assignment(
 @router.get("/complaints/completed")
 def get_completed_complaints(
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required(UserRole.employee)),
+    current_user: UserPrincipal = Depends(role_required(UserRole.employee)),
 ):
     return employee_service.get_completed_complaints(db, current_user.id)
 
@@ -142,7 +155,7 @@ def get_completed_complaints(
 def get_assignment_detail(
     assignment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required(UserRole.employee)),
+    current_user: UserPrincipal = Depends(role_required(UserRole.employee)),
 ):
     assignment = (
         db.query(Assignment)
@@ -155,7 +168,9 @@ def get_assignment_detail(
     if not assignment:
         raise HTTPException(status_code=404, detail="Görev bulunamadı")
 
-    complaint = db.query(Complaint).filter(Complaint.id == assignment.complaint_id).first()
+    complaint = (
+        db.query(Complaint).filter(Complaint.id == assignment.complaint_id).with_for_update().first()
+    )
 
     return {
         "assignment_id": assignment.id,
@@ -0,0 +1,189 @@
+import mimetypes
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+
+from app.services import media_store
+from app.services.media_store import BLOB_PREFIX, IMMUTABLE_CACHE_CONTROL
+from app.utils.storage import S3_PRESIGN_EXPIRES, LocalStorage, local_storage, storage
+
+
+# İçerik adresli olmayan eski dosyalar (complaints/, solutions/, avatars/)
+# için önbellek süresi; süre dolunca ETag ile 304 alınır.
+MEDIA_LEGACY_MAX_AGE = int(os.getenv("MEDIA_LEGACY_MAX_AGE", "86400"))
+# Boş değilse yerel dosyalar nginx'e devredilir: yanıt gövdesiz döner,
+# nginx "X-Accel-Redirect: <önek><anahtar>" ile dosyayı kendisi gönderir.
+# Örnek nginx: location /_media/ { internal; alias /app/media/; }
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "")
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+
+def _not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dosya bulunamadı.")
+
+
+def _check_key(key: str):
+    """
+    Gizli dizinler (.staging) ve dizin dışına çıkan yollar servis edilmez.
+    """
+    if not key or any(part in ("", ".", "..") or part.startswith(".") for part in key.split("/")):
+        raise _not_found()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match zayıf karşılaştırma kullanır
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # İkisi birlikte gelirse If-Modified-Since yok sayılır (RFC 9110 13.1.3)
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return int(last_modified.timestamp()) <= int(since.timestamp())
+    return False
+
+
+def _cache_headers(key: str, etag: str, last_modified: Optional[datetime]) -> dict:
+    immutable = key.startswith(f"{BLOB_PREFIX}/")
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else f"public, max-age={MEDIA_LEGACY_MAX_AGE}",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def _single_range(request: Request, etag: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Range başlığındaki tek bayt aralığı (başlangıç, bitiş dahil); başlık
+    yoksa, If-Range tutmuyorsa ya da birden fazla aralık istenmişse None
+    (tüm dosya gönderilir). Karşılanamayan aralıkta 416.
+    """
+    header = request.headers.get("range")
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range != etag:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = min(int(end_text), size - 1) if end_text else size - 1
+        else:
+            # bytes=-N: son N bayt
+            start, end = max(size - int(end_text), 0), size - 1
+    except ValueError:
+        return None
+    if start < 0 or start > end or start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            detail="İstenen aralık karşılanamıyor.",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def _local_response(request: Request, key: str, etag: Optional[str]):
+    try:
+        path = local_storage.local_path(key)
+        stat_result = path.stat()
+    except (OSError, ValueError):
+        raise _not_found()
+    if not path.is_file():
+        raise _not_found()
+
+    last_modified = datetime.fromtimestamp(stat_result.st_mtime, tz=timezone.utc)
+    # Eski dosyalar için içerikten değil değişiklik zamanı ve boyuttan
+    etag = etag or f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    headers = _cache_headers(key, etag, last_modified)
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+    if MEDIA_ACCEL_REDIRECT_PREFIX:
+        headers["X-Accel-Redirect"] = MEDIA_ACCEL_REDIRECT_PREFIX + key
+        return Response(media_type=media_type, headers=headers)
+    # Range / If-Range / HEAD ve destekleyen sunucularda pathsend FileResponse'ta
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat_result)
+
+
+def _proxied_response(request: Request, key: str, backend, etag: str):
+    stored = backend.stat(key)
+    if stored is None:
+        raise _not_found()
+    headers = _cache_headers(key, etag, stored.last_modified)
+    if _not_modified(request, etag, stored.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = stored.content_type or mimetypes.guess_type(key)[0] or "application/octet-stream"
+    headers["Accept-Ranges"] = "bytes"
+    byte_range = _single_range(request, etag, stored.size)
+    if byte_range is None:
+        headers["Content-Length"] = str(stored.size)
+        return StreamingResponse(backend.stream(key), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{stored.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        backend.stream(key, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"])
+def get_media(key: str, request: Request):
+    """
+    İçerik adresli dosyalar (blobs/) asla değişmez: immutable önbellek
+    başlığıyla döner, ETag'i sha256'dır ve If-None-Match eşleşirse depoya
+    hiç gidilmeden 304 döner.
+    """
+    _check_key(key)
+
+    # İçerik adresli dosyalar yapılandırılmış depoda, eskiler yerel diskte
+    backend = local_storage
+    etag = None
+    if key.startswith(f"{BLOB_PREFIX}/"):
+        backend = storage
+        sha256 = media_store.sha_from_url(f"/media/{key}")
+        if sha256 is None:
+            raise _not_found()
+        etag = f'"{sha256}"'
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(key, etag, None))
+
+    url = backend.presigned_url(key)
+    if url:
+        # İmzalı URL süresinin yarısı boyunca istemci yönlendirmeyi tekrar kullanabilir
+        return RedirectResponse(
+            url,
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+            headers={"Cache-Control": f"private, max-age={S3_PRESIGN_EXPIRES // 2}"},
+        )
+
+    if isinstance(backend, LocalStorage):
+        return _local_response(request, key, etag)
+    # S3_PRESIGN_EXPIRES=0: depo istemcilere açık değil, uygulama üzerinden
+    return _proxied_response(request, key, backend, etag)
@@ -5,15 +5,21 @@ from app.models.assignment_model import Assignment, AssignmentStatus
 from app.utils.db import get_db
 from app.routes.auth_routes import get_current_user, role_required
 from app.models.user_model import User, UserRole
+from app.utils.user_cache import UserPrincipal
 from app.models.complaint_model import Complaint
 from app.models.category_model import Category
 from app.schemas.complaint_schema import (
     ComplaintOut,
     ComplaintUpdateStatus,
     ComplaintSupportOut,
+    SupporterNotificationCreate,
+    BulkEmailJobOut,
+    BulkEmailRecipientOut,
 )
 from app.schemas.category_schema import CategoryCreate, CategoryUpdate, CategoryOut
 from app.models.worker import Worker
+from app.services import aggregate_service, bulk_email_service
+from app.utils.category_cache import category_ids
 router = APIRouter(prefix="/official", tags=["Official / Manager"])
 
 @router.get("/complaints", response_model=List[ComplaintOut])
@@ -21,7 +27,7 @@ def list_complaints_for_official(
     status: Optional[str] = Query(None),
     category_id: Optional[int] = Query(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required([UserRole.official, UserRole.admin])),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
 ):
     query = db.query(Complaint)
 
@@ -37,7 +43,7 @@ def list_complaints_for_official(
 def get_complaint_detail(
     complaint_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required([UserRole.official, UserRole.admin])),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
 ):
     complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
 
@@ -86,15 +92,17 @@ def reject_complaint(
     complaint_id: int,
     reason: str = Query(..., min_length=3, max_length=300),
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required([UserRole.official, UserRole.admin])),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
 ):
-    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).with_for_update().first()
 
     if not complaint:
         raise HTTPException(status_code=404, detail="Şikayet bulunamadı.")
 
+    before = aggregate_service.snapshot(complaint)
     complaint.status = "rejected"
     complaint.reject_reason = reason
+    aggregate_service.on_complaint_changed(db, complaint, before)
     db.commit()
     db.refresh(complaint)
 
@@ -105,9 +113,9 @@ def assign_complaint_to_employee(
     complaint_id: int,
     employee_id: int = Query(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required([UserRole.official, UserRole.admin])),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
 ):
-    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).with_for_update().first()
     employee = db.query(User).filter(User.id == employee_id, User.role == UserRole.employee).first()
 
     if not complaint:
@@ -133,7 +141,9 @@ def assign_complaint_to_employee(
     db.add(new_assignment)
 
    
+    before = aggregate_service.snapshot(complaint)
     complaint.status = "assigned"
+    aggregate_service.on_complaint_changed(db, complaint, before)
 
     db.commit()
     db.refresh(complaint)
@@ -144,7 +154,7 @@ def assign_complaint_to_employee(
 def get_supports(
     complaint_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required([UserRole.official, UserRole.admin])),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
 ):
     complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
 
@@ -155,14 +165,14 @@ def get_supports(
 @router.get("/categories", response_model=List[CategoryOut])
 def list_categories(
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required([UserRole.official, UserRole.admin])),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
 ):
     return db.query(Category).order_by(Category.id.desc()).all()
 @router.post("/categories", response_model=CategoryOut)
 def create_category(
     data: CategoryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required([UserRole.official, UserRole.admin])),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
 ):
     exists = db.query(Category).filter(Category.name == data.name).first()
     if exists:
@@ -171,6 +181,7 @@ def create_category(
     new_category = Category(**data.dict())
     db.add(new_category)
     db.commit()
+    category_ids.invalidate()
     db.refresh(new_category)
     return new_category
 @router.put("/categories/{category_id}", response_model=CategoryOut)
@@ -178,7 +189,7 @@ def update_category(
     category_id: int,
     data: CategoryUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required([UserRole.official, UserRole.admin])),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
 ):
     category = db.query(Category).filter(Category.id == category_id).first()
     if not category:
@@ -199,6 +210,7 @@ def update_category(
         setattr(category, key, value)
 
     db.commit()
+    category_ids.invalidate()
     db.refresh(category)
     return category
 
@@ -206,7 +218,7 @@ def update_category(
 def delete_category(
     category_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required([UserRole.official, UserRole.admin])),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
 ):
     category = db.query(Category).filter(Category.id == category_id).first()
     if not category:
@@ -221,5 +233,44 @@ def delete_category(
 
     db.delete(category)
     db.commit()
+    category_ids.invalidate()
     return None
 
+
+@router.post("/complaints/{complaint_id}/notify-supporters", response_model=BulkEmailJobOut, status_code=202)
+def notify_complaint_supporters(
+    complaint_id: int,
+    payload: SupporterNotificationCreate,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
+):
+    """
+    Çözülen şikayetin tüm destekçilerine e-posta gönderimini başlatır.
+    Gönderim arka planda, MAIL_BULK_RATE hızında yapılır. Şikayet için
+    daha önce gönderim başlatıldıysa resend=true verilmedikçe 409 döner.
+    """
+    job = bulk_email_service.create_supporter_notification(
+        db, current_user.id, complaint_id, payload.note, resend=payload.resend
+    )
+    return bulk_email_service.job_summary(db, job.id)
+
+
+@router.get("/bulk-emails/{job_id}", response_model=BulkEmailJobOut)
+def get_bulk_email_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
+):
+    return bulk_email_service.job_summary(db, job_id)
+
+
+@router.get("/bulk-emails/{job_id}/recipients", response_model=List[BulkEmailRecipientOut])
+def list_bulk_email_recipients(
+    job_id: int,
+    status: Optional[str] = Query(None, description="pending | sending | sent | failed"),
+    after_id: Optional[int] = Query(None),
+    limit: int = Query(bulk_email_service.RECIPIENTS_DEFAULT_LIMIT, ge=1, le=bulk_email_service.RECIPIENTS_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(role_required([UserRole.official, UserRole.admin])),
+):
+    return bulk_email_service.list_job_recipients(db, job_id, status, after_id, limit)
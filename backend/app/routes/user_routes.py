@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime, date  
-import os
 
 from app.utils.db import get_db
 from app.models.user_model import User
@@ -10,6 +10,10 @@ from app.routes.auth_routes import get_current_user
 from app.schemas.user_schema import EmailChangeRequestIn, EmailChangeConfirmIn
 from app.services.user_service import request_email_change, confirm_email_change
 from pydantic import BaseModel
+from app.utils.user_cache import principal_cache
+from app.utils.uploads import save_upload
+from app.utils.images import process_uploads
+from app.services import media_store
 
 router = APIRouter(
     prefix="/users",
@@ -24,6 +28,16 @@ class VerifyPhoneRequest(BaseModel):
 AVATAR_DIR = "media/avatars"
 
 
+def _release_avatar(db: Session, user: User):
+    """
+    Kullanıcının mevcut avatarının referansını bırakır. Eski düzendeki
+    dosyalardan sadece bu kullanıcıya ait olanlar silinir.
+    """
+    url = user.avatar_url
+    if media_store.sha_from_url(url) or (url or "").startswith(f"/{AVATAR_DIR}/user_{user.id}_"):
+        media_store.release(db, [url])
+
+
 @router.post("/upload-avatar")
 async def upload_avatar(
     file: UploadFile = File(...),
@@ -36,25 +50,26 @@ async def upload_avatar(
             detail="Sadece JPG veya PNG dosyası yükleyebilirsin.",
         )
 
-    os.makedirs(AVATAR_DIR, exist_ok=True)
+    upload = await save_upload(file, media_store.STAGING_DIR, f"user_{current_user.id}")
+    # Avatar her yerde küçük gösterildiği için sadece küçük resim türevi tutulur
+    (image,) = await process_uploads([upload], names=("thumb",))
 
-    ext = ".jpg"
-    if file.filename.lower().endswith(".png"):
-        ext = ".png"
+    # Depoya yazma/silme (S3'te boto3) ve commit event loop'u bloklamasın
+    await run_in_threadpool(_publish_avatar, db, current_user, image)
+    principal_cache.invalidate(current_user.id)
 
-    filename = f"user_{current_user.id}_{int(datetime.utcnow().timestamp())}{ext}"
-    filepath = os.path.join(AVATAR_DIR, filename)
+    return {"avatar_url": current_user.avatar_url}
 
-    with open(filepath, "wb") as f:
-        f.write(await file.read())
 
-    current_user.avatar_url = f"/{AVATAR_DIR}/{filename}"
-    current_user.updated_at = datetime.utcnow()
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-
-    return {"avatar_url": current_user.avatar_url}
+def _publish_avatar(db: Session, user: User, image):
+    with media_store.publishing(db, image.staged) as staged:
+        media_store.acquire(db, staged)
+        _release_avatar(db, user)
+        user.avatar_url = image.variants["thumb"]["url"]
+        user.updated_at = datetime.utcnow()
+        db.add(user)
+        db.commit()
+    db.refresh(user)
 
 
 @router.put("/profile", response_model=UserResponse)
@@ -116,8 +131,18 @@ def update_profile(
         current_user.is_name_public = profile_data.is_name_public
 
   
-    if profile_data.avatar_url is not None:
-        current_user.avatar_url = profile_data.avatar_url
+    if profile_data.avatar_url is not None and profile_data.avatar_url != current_user.avatar_url:
+        # Kendi sunucumuzdaki dosyalardan sadece var olan blob'lar kabul edilir;
+        # aksi halde sonraki release başkasının dosyasını silebilir.
+        new_url = profile_data.avatar_url
+        sha256 = media_store.sha_from_url(new_url)
+        if new_url.startswith("/media/") and (sha256 is None or sha256 not in media_store.retain(db, [new_url])):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Geçersiz avatar adresi.",
+            )
+        _release_avatar(db, current_user)
+        current_user.avatar_url = new_url
 
     # Check if profile is now complete (has required fields)
     # Required fields: tc_kimlik_no, birth_date, phone_number
@@ -133,6 +158,7 @@ def update_profile(
     db.add(current_user) 
     db.commit()          
     db.refresh(current_user) 
+    principal_cache.invalidate(current_user.id)
 
     return current_user
 @router.post("/me/email-change/request")
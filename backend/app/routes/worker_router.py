@@ -3,8 +3,9 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.utils.db import get_db
-from app.routes.auth_routes import get_current_user, role_required
-from app.models.user_model import User, UserRole
+from app.routes.auth_routes import get_current_principal, role_required
+from app.utils.user_cache import UserPrincipal
+from app.models.user_model import UserRole
 from app.schemas.worker_schema import WorkerCreate, WorkerUpdate, WorkerOut
 from app.services.worker_service import (
     create_worker,
@@ -22,7 +23,7 @@ router = APIRouter(
 def create(
     data: WorkerCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required(UserRole.official))
+    current_user: UserPrincipal = Depends(role_required(UserRole.official))
 
 ):
     return create_worker(db, data)
@@ -31,7 +32,7 @@ def create(
 def list_workers(
     category_id: Optional[int] = Query(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     return get_workers(db, category_id)
 
@@ -40,7 +41,7 @@ def update(
     worker_id: int,
     data: WorkerUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required(UserRole.official))
+    current_user: UserPrincipal = Depends(role_required(UserRole.official))
 ):
     return update_worker(db, worker_id, data)
 
@@ -48,7 +49,7 @@ def update(
 def delete(
     worker_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(role_required(UserRole.official))
+    current_user: UserPrincipal = Depends(role_required(UserRole.official))
 ):
     delete_worker(db, worker_id)
     return None
\ No newline at end of file
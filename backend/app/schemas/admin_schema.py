@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date
 from typing import Dict
 class OfficialCreate(BaseModel):
     full_name: str
@@ -77,4 +77,20 @@ class CategoryOut(BaseModel):
     is_active: bool
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TimeseriesPointOut(BaseModel):
+    period: date
+    category_id: Optional[int] = None
+    area: Optional[str] = None
+    opened: int
+    resolved: int
+    rejected: int
+    median_resolution_hours: Optional[float] = None
+
+class TimeseriesOut(BaseModel):
+    granularity: str
+    points: List[TimeseriesPointOut] = []
+
+class ModelActivateIn(BaseModel):
+    version: Optional[str] = None
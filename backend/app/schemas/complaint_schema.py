@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from enum import Enum
 
@@ -38,6 +38,23 @@ class ComplaintUpdate(BaseModel):
 
 
 
+class CategorySuggestRequest(BaseModel):
+    text: str = Field(..., max_length=5000, example="Sokağımızdaki lamba yanmıyor")
+    k: int = Field(3, ge=1, le=5)
+
+
+class CategorySuggestionOut(BaseModel):
+    category_id: int
+    name: str
+    score: float
+
+
+class CategorySuggestOut(BaseModel):
+    suggestions: List[CategorySuggestionOut] = []
+    confident: bool = False
+
+
+
 class ComplaintRatingCreate(BaseModel):
     rating: int = Field(..., ge=1, le=5, example=4)
     comment: Optional[str] = Field(None, example="Teşekkürler")
@@ -75,9 +92,17 @@ class ComplaintUpdateStatus(BaseModel):
     status: ComplaintStatusEnum
 
 
+class PhotoVariantOut(BaseModel):
+    url: str
+    width: int
+    height: int
+    bytes: int
+
+
 class ComplaintPhotoOut(BaseModel):
     id: int
     photo_url: str
+    variants: Optional[Dict[str, PhotoVariantOut]] = None
     created_at: datetime
 
     class Config:
@@ -87,6 +112,7 @@ class ComplaintPhotoOut(BaseModel):
 class ResolutionPhotoOut(BaseModel):
     id: int
     photo_url: str
+    variants: Optional[Dict[str, PhotoVariantOut]] = None
     created_at: datetime
 
     class Config:
@@ -122,3 +148,58 @@ class ComplaintOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ComplaintFeedOut(BaseModel):
+    items: List[ComplaintOut] = []
+    next_cursor: Optional[str] = None
+
+
+class NearbyComplaintOut(ComplaintOut):
+    distance_m: float
+
+
+class ClusterCellOut(BaseModel):
+    x: int
+    y: int
+    count: int
+    latitude: float
+    longitude: float
+    by_status: Dict[str, int] = {}
+    by_category: Dict[str, int] = {}
+
+
+class ClusterResponseOut(BaseModel):
+    zoom: int
+    cells: List[ClusterCellOut] = []
+
+
+class SupporterNotificationCreate(BaseModel):
+    note: Optional[str] = None
+    # Şikayet için daha önce gönderim yapıldıysa yine de yeniden gönder
+    resend: bool = False
+
+
+class BulkEmailJobOut(BaseModel):
+    id: int
+    complaint_id: int
+    status: str
+    total_recipients: int
+    pending: int
+    sent: int
+    failed: int
+    created_at: datetime
+    expanded_at: Optional[datetime] = None
+
+
+class BulkEmailRecipientOut(BaseModel):
+    id: int
+    recipient_user_id: Optional[int] = None
+    to_email: str
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    sent_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
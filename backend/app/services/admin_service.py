@@ -1,9 +1,12 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, func
 from fastapi import HTTPException
-from typing import Optional
+from typing import Callable, Optional
 
 from datetime import datetime, timedelta
+import os
+import threading
+import time
 
 from app.models.user_model import User, UserRole
 from app.models.audit_log_model import AuditLog
@@ -11,6 +14,10 @@ from app.models.complaint_model import Complaint, ComplaintStatus
 from app.utils.security import hash_password
 
 from app.models.category_model import Category
+from app.services import stats_counter_service
+from app.services.auth_service import revoke_tokens
+from app.utils.user_cache import principal_cache, token_revocations
+from app.utils.category_cache import category_ids
 def _audit(
     db: Session,
     actor_user_id: Optional[int],
@@ -104,11 +111,19 @@ def update_official(
         u.name = full_name.strip()
     if phone_number is not None:
         u.phone_number = phone_number.strip()
+    revoked = False
     if is_active is not None:
+        if u.is_active and not is_active:
+            # Devre dışı bırakılan yetkilinin elindeki token'lar da geçersiz olmalı
+            revoke_tokens(u)
+            revoked = True
         u.is_active = bool(is_active)
 
     _audit(db, actor.id, "UPDATE_OFFICIAL", "user", u.id, f"official updated: {u.email}")
     db.commit()
+    principal_cache.invalidate(u.id)
+    if revoked:
+        token_revocations.note(u.id, u.token_version, u.token_revoked_at)
     db.refresh(u)
     return u
 
@@ -125,19 +140,67 @@ def list_users(db: Session, q: Optional[str], role: Optional[str], is_active: Op
     return query.order_by(User.created_at.desc()).all()
 
 
-def stats_overview(db: Session):
-    total = db.query(Complaint).count()
-    open_count = db.query(Complaint).filter(Complaint.status == ComplaintStatus.pending).count()
-    in_progress = db.query(Complaint).filter(Complaint.status == ComplaintStatus.in_progress).count()
-    resolved = db.query(Complaint).filter(Complaint.status == ComplaintStatus.resolved).count()
+# Dashboard istatistikleri bu süre (saniye) boyunca bellekte tutulur; 0 kapatır.
+ADMIN_STATS_CACHE_TTL = float(os.getenv("ADMIN_STATS_CACHE_TTL", "5"))
 
+_stats_cache = {}
+_stats_cache_lock = threading.Lock()
+
+
+def _cached_snapshot(key: str, builder: Callable[[], dict], use_cache: bool = True) -> dict:
+    """
+    builder() sonucunu ADMIN_STATS_CACHE_TTL saniye saklar. Aynı anda gelen
+    istekler tek bir hesaplamayı bekler, her biri ayrı sorgu atmaz.
+    """
+    if not use_cache or ADMIN_STATS_CACHE_TTL <= 0:
+        return builder()
+
+    with _stats_cache_lock:
+        cached = _stats_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        value = builder()
+        _stats_cache[key] = (time.monotonic() + ADMIN_STATS_CACHE_TTL, value)
+        return value
+
+
+def invalidate_stats_cache():
+    with _stats_cache_lock:
+        _stats_cache.clear()
+
+
+def _user_counts_by_role(db: Session) -> dict:
+    counts = {role.value: 0 for role in UserRole}
+    for role, count in db.query(User.role, func.count(User.id)).group_by(User.role).all():
+        counts[role.value if hasattr(role, "value") else role] = int(count)
+    return counts
+
+
+def _complaint_counts(db: Session, since: datetime):
+    """
+    status başına toplam ve `since` gününden itibaren oluşturulan şikayet
+    sayısı -> (by_status, son dönem toplamı). complaints yerine artımlı
+    tutulan stats_counters tablosundan okunur.
+    """
+    by_status = {s.value: 0 for s in ComplaintStatus}
+    counts, recent = stats_counter_service.complaint_counts(db, since.date())
+    by_status.update(counts)
+    return by_status, recent
+
+
+def _build_stats_overview(db: Session) -> dict:
+    by_status, _ = _complaint_counts(db, datetime.utcnow())
     return {
-        "total": int(total),
-        "open": int(open_count),
-        "in_progress": int(in_progress),
-        "resolved": int(resolved),
+        "total": sum(by_status.values()),
+        "open": by_status["pending"],
+        "in_progress": by_status["in_progress"],
+        "resolved": by_status["resolved"],
     }
 
+
+def stats_overview(db: Session, use_cache: bool = True):
+    return _cached_snapshot("stats_overview", lambda: _build_stats_overview(db), use_cache)
+
 def list_audit_logs(db: Session, limit: int = 100):
     """
     Returns audit log entries, ordered by most recent first.
@@ -151,41 +214,27 @@ def list_audit_logs(db: Session, limit: int = 100):
         return []
 
 
-def get_admin_stats(db: Session):
-  
-    total_users = db.query(User).count()
-    total_complaints = db.query(Complaint).count()
-
-   
-    users_by_role = {
-        "citizen": db.query(User).filter(User.role == UserRole.citizen).count(),
-        "official": db.query(User).filter(User.role == UserRole.official).count(),
-        "employee": db.query(User).filter(User.role == UserRole.employee).count(),
-        "admin": db.query(User).filter(User.role == UserRole.admin).count(),
-    }
-
- 
-    complaints_by_status = {
-        "pending": db.query(Complaint).filter(Complaint.status == ComplaintStatus.pending).count(),
-        "in_progress": db.query(Complaint).filter(Complaint.status == ComplaintStatus.in_progress).count(),
-        "resolved": db.query(Complaint).filter(Complaint.status == ComplaintStatus.resolved).count(),
-    }
+def _build_admin_stats(db: Session) -> dict:
+    users_by_role = _user_counts_by_role(db)
 
-   
     seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    complaints_last_7_days = (
-        db.query(Complaint)
-        .filter(Complaint.created_at >= seven_days_ago)
-        .count()
-    )
+    by_status, complaints_last_7_days = _complaint_counts(db, seven_days_ago)
 
     return {
-        "total_users": int(total_users),
-        "users_by_role": {k: int(v) for k, v in users_by_role.items()},
-        "total_complaints": int(total_complaints),
-        "complaints_by_status": {k: int(v) for k, v in complaints_by_status.items()},
-        "complaints_last_7_days": int(complaints_last_7_days),
+        "total_users": sum(users_by_role.values()),
+        "users_by_role": users_by_role,
+        "total_complaints": sum(by_status.values()),
+        "complaints_by_status": {
+            "pending": by_status["pending"],
+            "in_progress": by_status["in_progress"],
+            "resolved": by_status["resolved"],
+        },
+        "complaints_last_7_days": complaints_last_7_days,
     }
+
+
+def get_admin_stats(db: Session, use_cache: bool = True):
+    return _cached_snapshot("admin_stats", lambda: _build_admin_stats(db), use_cache)
 def list_categories(db: Session, q: Optional[str] = None, is_active: Optional[bool] = None):
     query = db.query(Category)
     if is_active is not None:
@@ -214,6 +263,7 @@ def create_category(db: Session, actor: User, name: str, description: Optional[s
 
     _audit(db, actor.id, "CREATE_CATEGORY", "category", c.id, f"category created: {c.name}")
     db.commit()
+    category_ids.invalidate()
     db.refresh(c)
     return c
 
@@ -236,6 +286,7 @@ def update_category(db: Session, actor: User, category_id: int, name: Optional[s
 
     _audit(db, actor.id, "UPDATE_CATEGORY", "category", c.id, f"category updated: {c.name}")
     db.commit()
+    category_ids.invalidate()
     db.refresh(c)
     return c
 
@@ -247,4 +298,5 @@ def delete_category(db: Session, actor: User, category_id: int):
     _audit(db, actor.id, "DELETE_CATEGORY", "category", category_id, "category deleted")
     db.delete(c)
     db.commit()
+    category_ids.invalidate()
     return {"ok": True}
\ No newline at end of file
@@ -0,0 +1,91 @@
+from collections import Counter, namedtuple
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.complaint_model import Complaint
+from app.services import analytics_service, cluster_service, stats_counter_service
+
+
+# Önceden toplanmış tabloların (harita kümeleri, dashboard sayaçları)
+# ihtiyaç duyduğu şikayet alanları.
+ComplaintSnapshot = namedtuple(
+    "ComplaintSnapshot",
+    ["status", "category_id", "latitude", "longitude", "created_at"],
+)
+
+
+def _status_value(value) -> str:
+    # Bazı yerlerde status düz string olarak atanıyor ("rejected", "assigned")
+    return value.value if hasattr(value, "value") else str(value)
+
+
+def snapshot_from_row(row) -> ComplaintSnapshot:
+    return ComplaintSnapshot(
+        status=_status_value(row.status),
+        category_id=row.category_id or 0,
+        latitude=row.latitude,
+        longitude=row.longitude,
+        created_at=row.created_at,
+    )
+
+
+def snapshot(complaint: Optional[Complaint]) -> Optional[ComplaintSnapshot]:
+    """
+    Şikayetin değişiklikten önceki halini yakalar. Değişiklik yapılmadan önce
+    çağrılıp on_complaint_changed'e verilmelidir.
+    """
+    if complaint is None:
+        return None
+    return snapshot_from_row(complaint)
+
+
+def apply_changes(db: Session, changes: Iterable[Tuple[Optional[ComplaintSnapshot], Optional[ComplaintSnapshot]]]):
+    """
+    Birden çok (önce, sonra) çiftinin etkisini birleştirip tek küme ve tek
+    sayaç upsert'i ile yazar. Toplu işler için; commit etmez.
+    """
+    clusters = {}
+    counters = Counter()
+    for before, after in changes:
+        if before == after:
+            continue
+        cluster_service.merge_deltas(clusters, cluster_service.cluster_deltas(before, -1))
+        cluster_service.merge_deltas(clusters, cluster_service.cluster_deltas(after, +1))
+        counters.update(stats_counter_service.counter_deltas(before, -1))
+        counters.update(stats_counter_service.counter_deltas(after, +1))
+
+    cluster_service.apply_cluster_deltas(db, clusters)
+    stats_counter_service.apply_counter_deltas(db, counters)
+
+
+def _apply(db: Session, before: Optional[ComplaintSnapshot], after: Optional[ComplaintSnapshot]):
+    apply_changes(db, [(before, after)])
+
+
+def on_complaint_created(db: Session, complaint: Complaint):
+    """
+    Yeni şikayeti toplam tablolarına ekler. Commit etmez; şikayetle aynı
+    transaction içinde çağrılmalıdır.
+    """
+    # created_at varsayılanı flush'ta atanır; sayacın günü ondan okunur
+    db.flush()
+    _apply(db, None, snapshot(complaint))
+
+
+def on_complaint_changed(db: Session, complaint: Complaint, before: Optional[ComplaintSnapshot]):
+    """
+    status / kategori / konum değişikliğini toplam tablolarına yansıtır;
+    çözülme / red anını şikayete yazar. Commit etmez.
+    """
+    after = snapshot(complaint)
+    analytics_service.record_status_change(db, complaint, before.status if before else None, after.status)
+    _apply(db, before, after)
+
+
+def on_complaint_deleted(db: Session, complaint: Complaint):
+    """
+    Silinen şikayetin katkısını geri alır. Commit etmez.
+    """
+    analytics_service.mark_complaint_deleted(db, complaint)
+    _apply(db, snapshot(complaint), None)
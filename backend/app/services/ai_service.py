@@ -1,14 +1,263 @@
-import joblib
+import asyncio
 import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
 
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
 
-MODEL_PATH = "category_model.pkl"
-if not os.path.exists(MODEL_PATH):
-    raise RuntimeError("AI kategori modeli bulunamadı. Lütfen train_category_model.py çalıştırın.")
+from app.services.model_registry import ModelRegistry
+from app.utils.micro_batcher import MicroBatcher
+from app.utils.text_normalize import normalize_complaint_text
+
+
+MODEL_PATH = os.getenv("CATEGORY_MODEL_PATH", "category_model.pkl")
+# Model yoksa / yüklenemezse şikayetlere verilecek kategori
+DEFAULT_CATEGORY = os.getenv("DEFAULT_CATEGORY", "Diğer")
+# joblib.load(mmap_mode=...): numpy dizileri kopyalanmadan dosyadan map edilir,
+# aynı makinedeki uvicorn worker'ları bu sayfaları paylaşır. Boş: kapalı.
+CATEGORY_MODEL_MMAP = os.getenv("CATEGORY_MODEL_MMAP", "r") or None
+# Uygulama açılışında modeli arka planda yükle (ilk isteği bekletmemek için)
+CATEGORY_MODEL_WARM_UP = os.getenv("CATEGORY_MODEL_WARM_UP", "1").lower() in ("1", "true", "yes")
+# Eşzamanlı tahminler en fazla bu kadar bekletilip tek transform/predict ile
+# işlenir. CATEGORY_BATCH_MAX_SIZE=1: batching kapalı, tahmin çağıran thread'de yapılır.
+CATEGORY_BATCH_MAX_SIZE = int(os.getenv("CATEGORY_BATCH_MAX_SIZE", "32"))
+CATEGORY_BATCH_MAX_WAIT_MS = float(os.getenv("CATEGORY_BATCH_MAX_WAIT_MS", "5"))
+CATEGORY_PREDICT_TIMEOUT = float(os.getenv("CATEGORY_PREDICT_TIMEOUT", "10"))
+# Normalize edilmiş metin -> kategori sıralaması önbelleği (0: kapalı)
+CATEGORY_CACHE_SIZE = int(os.getenv("CATEGORY_CACHE_SIZE", "10000"))
+# Aktif model dosyasının değişip değişmediğine arka planda bu sıklıkla
+# bakılır (saniye); 0: izleme kapalı, değişiklik sadece admin endpoint'iyle
+CATEGORY_MODEL_CHECK_INTERVAL = float(os.getenv("CATEGORY_MODEL_CHECK_INTERVAL", "5"))
+# Öneri listesinin en fazla uzunluğu (önbellekte bu kadarı tutulur)
+CATEGORY_SUGGEST_MAX_K = int(os.getenv("CATEGORY_SUGGEST_MAX_K", "5"))
+# train_category_model.py'nin sürümlü model dosyaları
+MODELS_DIR = os.getenv("CATEGORY_MODELS_DIR", "category_models")
+
+# Yeni model etkinleştirilmeden önce bu cümlelerle denenir
+SMOKE_TEXTS = [
+    "sokakta çöp yığılmış",
+    "yolda çukur var",
+    "sokak lambası yanmıyor",
+    "parktaki bank kırık",
+]
+
+
+class PredictionCache:
+    """
+    Normalize edilmiş metin -> sıralı (kategori, skor) listesi LRU
+    önbelleği. Model değiştiğinde temizlenir.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # clear() ile artar; eski modelle yapılmış tahminin temizlikten
+        # sonra önbelleğe yazılmasını engeller
+        self.generation = 0
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: tuple, generation: int):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+            }
+
+
+prediction_cache = PredictionCache(CATEGORY_CACHE_SIZE)
+
+
+registry = ModelRegistry(
+    MODEL_PATH,
+    MODELS_DIR,
+    SMOKE_TEXTS,
+    mmap_mode=CATEGORY_MODEL_MMAP,
+    on_swap=prediction_cache.clear,
+)
+
+
+def get_model():
+    """
+    Aktif (vectorizer, model) ikilisi; ilk kullanımda yüklenir, model yoksa
+    None. Yeni sürümler registry tarafından arka planda yüklenip atomik
+    olarak değiştirilir; çağıran dönen ikiliyi bir kez alıp kullanmalıdır.
+    """
+    version = registry.get()
+    if version is None:
+        return None
+    return version.vectorizer, version.model
+
+
+def model_version() -> Optional[str]:
+    """
+    Aktif modelin kimliği (dosya içeriğinin sha256'sı); model yoksa None.
+    Toplu işler hangi modelle çalıştıklarını kaydetmek için kullanır.
+    """
+    version = registry.get()
+    return version.sha256 if version is not None else None
+
+
+def start_model_watcher():
+    return registry.start_watcher(CATEGORY_MODEL_CHECK_INTERVAL)
+
+
+def warm_up(background: bool = True):
+    """
+    Modeli önceden yükler. Startup'ta çağrılır; background=True ise
+    açılışı bekletmez, ilk istek yükleme bitene kadar lock'ta bekler.
+    """
+    if not CATEGORY_MODEL_WARM_UP:
+        return None
+    if not background:
+        return get_model()
+    worker = threading.Thread(target=get_model, name="category-model-warm-up", daemon=True)
+    worker.start()
+    return worker
+
+
+def _predict_normalized(texts: List[str]) -> List[str]:
+    loaded = get_model()
+    if loaded is None:
+        return [DEFAULT_CATEGORY] * len(texts)
+
+    vectorizer, model = loaded
+    X = vectorizer.transform(texts)
+    return model.predict(X).tolist()
+
+
+def predict_categories(texts: List[str]) -> List[str]:
+    """
+    Metin listesini normalize edip tek vectorizer.transform + model.predict
+    çağrısıyla sınıflandırır. Önbelleğe bakmaz (toplu işler içindir).
+    """
+    return _predict_normalized([normalize_complaint_text(t) for t in texts])
+
+
+def _rank_normalized(texts: List[str]) -> List[tuple]:
+    """
+    Her metin için olasılığa göre sıralı en fazla CATEGORY_SUGGEST_MAX_K
+    (etiket, skor) ikilisi. Model yoksa boş. predict_proba'nın argmax'ı
+    predict ile aynı etikettir.
+    """
+    loaded = get_model()
+    if loaded is None:
+        return [()] * len(texts)
+
+    vectorizer, model = loaded
+    X = vectorizer.transform(texts)
+    if not hasattr(model, "predict_proba"):
+        return [((str(label), 1.0),) for label in model.predict(X)]
+
+    proba = model.predict_proba(X)
+    classes = model.classes_
+    k = min(CATEGORY_SUGGEST_MAX_K, len(classes))
+    top = np.argsort(-proba, axis=1)[:, :k]
+    return [
+        tuple((str(classes[j]), round(float(row[j]), 4)) for j in indices)
+        for indices, row in zip(top, proba)
+    ]
+
+
+_batcher = MicroBatcher(
+    _rank_normalized,
+    max_batch_size=CATEGORY_BATCH_MAX_SIZE,
+    max_wait=CATEGORY_BATCH_MAX_WAIT_MS / 1000.0,
+    name="category-predict",
+)
+
+
+def _cached(key: str):
+    # İlk yükleme önbelleği temizler (nesil artar); nesil ondan sonra okunmalı
+    get_model()
+    generation = prediction_cache.generation
+    return generation, prediction_cache.get(key)
+
+
+def rank_categories(key: str) -> tuple:
+    """
+    Normalize edilmiş metnin sıralı (etiket, skor) listesi; önbellekten ya
+    da batcher üzerinden.
+    """
+    generation, ranking = _cached(key)
+    if ranking is not None:
+        return ranking
+
+    if CATEGORY_BATCH_MAX_SIZE <= 1:
+        ranking = _rank_normalized([key])[0]
+    else:
+        ranking = _batcher.submit(key).result(timeout=CATEGORY_PREDICT_TIMEOUT)
+    if ranking:
+        prediction_cache.put(key, ranking, generation)
+    return ranking
+
+
+async def rank_categories_async(key: str) -> tuple:
+    """
+    async endpoint'ler için: tahmin batcher thread'inde yapılır, event loop
+    ve threadpool beklemez. Model henüz yüklenmediyse (joblib.load + smoke
+    doğrulaması ya da süren warm-up beklenir) ve batching kapalıysa iş
+    threadpool'da yapılır; event loop hiçbir durumda bloklanmaz.
+    """
+    if registry.initialized:
+        generation, ranking = _cached(key)
+    else:
+        generation, ranking = await run_in_threadpool(_cached, key)
+    if ranking is not None:
+        return ranking
+
+    if CATEGORY_BATCH_MAX_SIZE <= 1:
+        ranking = (await run_in_threadpool(_rank_normalized, [key]))[0]
+    else:
+        future = _batcher.submit(key)
+        ranking = await asyncio.wait_for(asyncio.wrap_future(future), timeout=CATEGORY_PREDICT_TIMEOUT)
+    if ranking:
+        prediction_cache.put(key, ranking, generation)
+    return ranking
 
-vectorizer, model = joblib.load(MODEL_PATH)
 
 def predict_category(text: str) -> str:
-    X = vectorizer.transform([text])
-    prediction = model.predict(X)[0]
-    return prediction
+    ranking = rank_categories(normalize_complaint_text(text))
+    return ranking[0][0] if ranking else DEFAULT_CATEGORY
+
+
+async def predict_category_async(text: str) -> str:
+    ranking = await rank_categories_async(normalize_complaint_text(text))
+    return ranking[0][0] if ranking else DEFAULT_CATEGORY
+
+
+def batcher_stats() -> dict:
+    return _batcher.stats()
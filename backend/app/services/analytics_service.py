@@ -0,0 +1,321 @@
+import math
+import os
+import threading
+import time as time_module
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, insert, text
+from sqlalchemy.orm import Session
+
+from app.models.analytics_rollup_model import AnalyticsDirtyDay, ComplaintDailyRollup, ResolutionTimeBucket
+from app.models.complaint_model import Complaint
+from app.services.checkpoint_service import get_checkpoint, set_checkpoint
+from app.utils.db import SessionLocal, upsert_increment
+
+
+ROLLUP_JOB_NAME = "analytics_rollup"
+# Bölge boyutu: 5 karakterlik geohash (~4.9km x 4.9km)
+AREA_PRECISION = 5
+# Çözülme süresi histogramında bir ikiye katlanma başına kova sayısı (~%19 genişlik)
+BUCKETS_PER_OCTAVE = 4
+# Watermark'tan geri sarma payı: geç commit edilen satırlar kaçmasın diye
+ROLLUP_OVERLAP = timedelta(minutes=5)
+# Arka plan job aralığı (saniye); 0 ise job sadece CLI ile çalışır
+ANALYTICS_ROLLUP_INTERVAL = int(os.getenv("ANALYTICS_ROLLUP_INTERVAL", "0"))
+TIMESERIES_MAX_DAYS = 730
+
+
+def _area(geo_cell: Optional[str]) -> str:
+    return (geo_cell or "")[:AREA_PRECISION]
+
+
+def resolution_bucket(seconds: float) -> int:
+    minutes = max(seconds, 0) / 60.0
+    return int(BUCKETS_PER_OCTAVE * math.log2(minutes + 1))
+
+
+def _bucket_midpoint_hours(bucket: int) -> float:
+    lo = 2 ** (bucket / BUCKETS_PER_OCTAVE)
+    hi = 2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE)
+    return (math.sqrt(lo * hi) - 1) / 60.0
+
+
+def _median_hours(histogram: Counter) -> Optional[float]:
+    total = sum(histogram.values())
+    if total == 0:
+        return None
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen * 2 >= total:
+            return round(_bucket_midpoint_hours(bucket), 2)
+    return None
+
+
+# Durum -> o duruma giriş anını tutan kolon
+_STATUS_TIMESTAMPS = (("resolved", "resolved_at"), ("rejected", "rejected_at"))
+
+
+def mark_days_dirty(db: Session, days: Iterable[Optional[date]]):
+    """
+    Günleri sonraki rollup çalışmasında yeniden hesaplanmak üzere işaretler.
+    Commit etmez.
+    """
+    counts = Counter(day for day in days if day is not None)
+    rows = [{"day": day, "changes": n} for day, n in sorted(counts.items())]
+    upsert_increment(db, AnalyticsDirtyDay, rows, key_columns=["day"], increment_columns=["changes"])
+
+
+def record_status_change(db: Session, complaint: Complaint, old_status: Optional[str], new_status: str):
+    """
+    Şikayet resolved / rejected durumuna girince anı kaydeder (rollup bu
+    anı sayar; şikayet başına tek olay). Durumdan çıkınca an silinir ve
+    eski gün kirli işaretlenir. Commit etmez.
+    """
+    if old_status == new_status:
+        return
+    dirty = []
+    for status_value, column in _STATUS_TIMESTAMPS:
+        previous = getattr(complaint, column)
+        if new_status == status_value:
+            if previous is not None:
+                dirty.append(previous.date())
+            setattr(complaint, column, datetime.utcnow())
+        elif old_status == status_value and previous is not None:
+            dirty.append(previous.date())
+            setattr(complaint, column, None)
+    mark_days_dirty(db, dirty)
+
+
+def mark_complaint_deleted(db: Session, complaint: Complaint):
+    """
+    Silinen şikayetin sayıldığı günleri kirli işaretler. Commit etmez.
+    """
+    mark_days_dirty(
+        db,
+        (value.date() for value in (complaint.created_at, complaint.resolved_at, complaint.rejected_at) if value),
+    )
+
+
+def _contiguous_ranges(days: List[date]) -> List[Tuple[date, date]]:
+    ranges = []
+    for day in sorted(set(days)):
+        if ranges and day - ranges[-1][1] <= timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def _recompute_range(db: Session, day_from: date, day_to: date, batch_size: int = 5000):
+    """
+    [day_from, day_to] aralığındaki rollup satırlarını ham tablolardan
+    yeniden üretir. İdempotenttir; aynı günü iki kez işlemek sorun değildir.
+    """
+    start = datetime.combine(day_from, time.min)
+    end = datetime.combine(day_to + timedelta(days=1), time.min)
+
+    counts: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0, 0])
+    buckets: Counter = Counter()
+
+    opened = (
+        db.query(Complaint.created_at, Complaint.category_id, Complaint.geo_cell)
+        .filter(Complaint.created_at >= start, Complaint.created_at < end)
+        .execution_options(yield_per=batch_size)
+    )
+    for created_at, category_id, geo_cell in opened:
+        counts[(created_at.date(), category_id or 0, _area(geo_cell))][0] += 1
+
+    # Şikayet başına tek çözülme olayı; görevsiz (status endpoint'iyle)
+    # çözülenler de sayılır, birden çok tamamlanan görev tekrar saymaz.
+    resolved = (
+        db.query(Complaint.resolved_at, Complaint.created_at, Complaint.category_id, Complaint.geo_cell)
+        .filter(Complaint.resolved_at >= start, Complaint.resolved_at < end)
+        .execution_options(yield_per=batch_size)
+    )
+    for resolved_at, created_at, category_id, geo_cell in resolved:
+        key = (resolved_at.date(), category_id or 0, _area(geo_cell))
+        counts[key][1] += 1
+        if created_at is not None:
+            buckets[key + (resolution_bucket((resolved_at - created_at).total_seconds()),)] += 1
+
+    rejected = (
+        db.query(Complaint.rejected_at, Complaint.category_id, Complaint.geo_cell)
+        .filter(Complaint.rejected_at >= start, Complaint.rejected_at < end)
+        .execution_options(yield_per=batch_size)
+    )
+    for rejected_at, category_id, geo_cell in rejected:
+        counts[(rejected_at.date(), category_id or 0, _area(geo_cell))][2] += 1
+
+    for model in (ComplaintDailyRollup, ResolutionTimeBucket):
+        db.query(model).filter(model.day >= day_from, model.day <= day_to).delete(synchronize_session=False)
+
+    rollup_rows = [
+        {"day": k[0], "category_id": k[1], "area": k[2], "opened": v[0], "resolved": v[1], "rejected": v[2]}
+        for k, v in counts.items()
+    ]
+    bucket_rows = [
+        {"day": k[0], "category_id": k[1], "area": k[2], "bucket": k[3], "count": v}
+        for k, v in buckets.items()
+    ]
+    for model, rows in ((ComplaintDailyRollup, rollup_rows), (ResolutionTimeBucket, bucket_rows)):
+        for i in range(0, len(rows), batch_size):
+            db.execute(insert(model), rows[i:i + batch_size])
+
+
+def _try_job_lock(db: Session) -> bool:
+    # Birden fazla worker aynı anda çalıştırırsa sadece biri ilerler (Postgres).
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"), {"name": ROLLUP_JOB_NAME}).scalar())
+
+
+def run_rollup(db: Session, full: bool = False) -> dict:
+    """
+    Rollup tablolarını artımlı günceller: son çalışmadan beri değişen
+    şikayetlerin dokunduğu günleri ve kirli işaretlenmiş günleri bulur,
+    sadece o günleri yeniden hesaplar. full=True tüm geçmişi baştan
+    üretir. Commit etmez.
+    """
+    if not _try_job_lock(db):
+        return {"skipped": True, "days": 0}
+
+    started_at = datetime.utcnow()
+    watermark_raw = None if full else get_checkpoint(db, ROLLUP_JOB_NAME)
+    dirty = db.query(AnalyticsDirtyDay.day, AnalyticsDirtyDay.changes).all()
+
+    if watermark_raw is None:
+        first = db.query(func.min(Complaint.created_at)).scalar()
+        ranges = [(first.date(), started_at.date())] if first else []
+    else:
+        watermark = datetime.fromisoformat(watermark_raw)
+        days = [day for day, _ in dirty]
+        for row in (
+            db.query(Complaint.created_at, Complaint.updated_at, Complaint.resolved_at, Complaint.rejected_at)
+            .filter(Complaint.updated_at > watermark)
+            .execution_options(yield_per=5000)
+        ):
+            days.extend(value.date() for value in row if value is not None)
+        ranges = _contiguous_ranges(days)
+
+    for day_from, day_to in ranges:
+        _recompute_range(db, day_from, day_to)
+
+    # Okunduktan sonra yeniden işaretlenen gün (changes arttı) bir sonraki çalışmaya kalır
+    for day, changes in dirty:
+        db.query(AnalyticsDirtyDay).filter(
+            and_(AnalyticsDirtyDay.day == day, AnalyticsDirtyDay.changes == changes)
+        ).delete(synchronize_session=False)
+
+    set_checkpoint(db, ROLLUP_JOB_NAME, (started_at - ROLLUP_OVERLAP).isoformat())
+    return {
+        "skipped": False,
+        "days": sum((b - a).days + 1 for a, b in ranges),
+    }
+
+
+def _rollup_loop(interval: int):
+    while True:
+        db = SessionLocal()
+        try:
+            run_rollup(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"ANALYTICS_ROLLUP_ERROR: {e}")
+        finally:
+            db.close()
+        time_module.sleep(interval)
+
+
+def start_rollup_worker():
+    """
+    ANALYTICS_ROLLUP_INTERVAL > 0 ise rollup job'unu arka plan thread'inde
+    periyodik çalıştırır.
+    """
+    if ANALYTICS_ROLLUP_INTERVAL <= 0:
+        return None
+    worker = threading.Thread(
+        target=_rollup_loop,
+        args=(ANALYTICS_ROLLUP_INTERVAL,),
+        name="analytics-rollup",
+        daemon=True,
+    )
+    worker.start()
+    return worker
+
+
+def _period(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def get_timeseries(
+    db: Session,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    category_id: Optional[int] = None,
+    area: Optional[str] = None,
+    group_by: Optional[str] = None,
+) -> dict:
+    """
+    Günlük/haftalık açılan, çözülen, reddedilen sayıları ve medyan çözülme
+    süresini (saat) rollup tablolarından döner; ham şikayet satırı okunmaz.
+    """
+    if granularity not in ("day", "week"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="granularity 'day' veya 'week' olmalı.")
+    if group_by not in (None, "category", "area"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="group_by 'category' veya 'area' olmalı.")
+    if end < start or (end - start).days > TIMESERIES_MAX_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Geçersiz tarih aralığı.")
+
+    def _filtered(model):
+        q = db.query(model).filter(model.day >= start, model.day <= end)
+        if category_id is not None:
+            q = q.filter(model.category_id == category_id)
+        if area:
+            q = q.filter(model.area == area[:AREA_PRECISION])
+        return q
+
+    def _key(row):
+        group = None
+        if group_by == "category":
+            group = row.category_id
+        elif group_by == "area":
+            group = row.area
+        return _period(row.day, granularity), group
+
+    totals: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0, 0])
+    for row in _filtered(ComplaintDailyRollup):
+        acc = totals[_key(row)]
+        acc[0] += row.opened
+        acc[1] += row.resolved
+        acc[2] += row.rejected
+
+    histograms: Dict[tuple, Counter] = defaultdict(Counter)
+    for row in _filtered(ResolutionTimeBucket):
+        histograms[_key(row)][row.bucket] += row.count
+
+    points = []
+    for key in sorted(totals, key=lambda k: (k[0], str(k[1]))):
+        period, group = key
+        opened, resolved, rejected = totals[key]
+        point = {
+            "period": period,
+            "opened": opened,
+            "resolved": resolved,
+            "rejected": rejected,
+            "median_resolution_hours": _median_hours(histograms.get(key, Counter())),
+        }
+        if group_by == "category":
+            point["category_id"] = group
+        elif group_by == "area":
+            point["area"] = group
+        points.append(point)
+
+    return {"granularity": granularity, "points": points}
@@ -5,6 +5,7 @@ from fastapi import HTTPException, status
 from app.models.assignment_model import Assignment, AssignmentStatus
 from app.models.user_model import User, UserRole
 from app.models.complaint_model import Complaint, ComplaintStatus
+from app.services import aggregate_service
 
 
 ALLOWED_ASSIGNMENT_TRANSITIONS = {
@@ -37,14 +38,16 @@ def _ensure_assignment_transition(current_status: AssignmentStatus, new_status:
         )
 
 
-def _sync_complaint_status_with_assignment(complaint: Complaint, new_assignment_status: AssignmentStatus):
+def _sync_complaint_status_with_assignment(db: Session, complaint: Complaint, new_assignment_status: AssignmentStatus):
     """
     Görev durumu değişince ilgili şikayet status'unu senkron et.
     """
+    before = aggregate_service.snapshot(complaint)
     if new_assignment_status == AssignmentStatus.in_progress:
         complaint.status = ComplaintStatus.in_progress
     elif new_assignment_status == AssignmentStatus.completed:
         complaint.status = ComplaintStatus.resolved
+    aggregate_service.on_complaint_changed(db, complaint, before)
 
 
 
@@ -54,7 +57,7 @@ def assign_complaint_to_employee(
     employee_id: int,
 ):
     
-    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).with_for_update().first()
     if not complaint:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,7 +93,7 @@ def assign_complaint_to_employee(
         existing.start_time = None
         existing.end_time = None
         existing.solution_photo_url = None
-        _sync_complaint_status_with_assignment(complaint, AssignmentStatus.assigned)
+        _sync_complaint_status_with_assignment(db, complaint, AssignmentStatus.assigned)
         db.commit()
         db.refresh(existing)
         return existing
@@ -102,7 +105,7 @@ def assign_complaint_to_employee(
         status=AssignmentStatus.assigned,
     )
 
-    _sync_complaint_status_with_assignment(complaint, AssignmentStatus.assigned)
+    _sync_complaint_status_with_assignment(db, complaint, AssignmentStatus.assigned)
 
     db.add(assignment)
     db.commit()
@@ -143,9 +146,11 @@ def update_assignment_status(
             assignment.solution_photo_url = solution_photo_url
 
     
-    complaint = assignment.complaint
+    complaint = (
+        db.query(Complaint).filter(Complaint.id == assignment.complaint_id).with_for_update().first()
+    )
     if complaint:
-        _sync_complaint_status_with_assignment(complaint, new_status)
+        _sync_complaint_status_with_assignment(db, complaint, new_status)
 
     db.commit()
     db.refresh(assignment)
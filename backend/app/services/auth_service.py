@@ -1,4 +1,5 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.models.user_model import User, UserRole
@@ -6,30 +7,24 @@ from app.utils.db import get_db
 from app.utils.security import decode_access_token
 from app.schemas.user_schema import UserCreate, UserLogin
 from app.utils.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
 )
 
 import secrets
+from datetime import datetime
 from app.utils.email_service import send_verification_email
 
 auth_scheme = HTTPBearer()
 
 
 
-def register_user(db: Session, user_data: UserCreate):
- 
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bu email zaten kayıtlı."
-        )
+def _find_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
 
-    hashed_password = hash_password(user_data.password)
 
-  
+def _create_unverified_user(db: Session, user_data: UserCreate, hashed_password: str) -> User:
     verification_token = secrets.token_urlsafe(32)
 
     new_user = User(
@@ -51,11 +46,27 @@ def register_user(db: Session, user_data: UserCreate):
     return new_user
 
 
+# login/register async'tir: DB işleri threadpool'da, bcrypt hash havuzunda
+# beklenir. bcrypt beklerken threadpool thread'i tutulmaz.
+async def register_user(db: Session, user_data: UserCreate):
+ 
+    existing_user = await run_in_threadpool(_find_user_by_email, db, user_data.email)
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bu email zaten kayıtlı."
+        )
+
+    hashed_password = await hash_password_async(user_data.password)
+
+    return await run_in_threadpool(_create_unverified_user, db, user_data, hashed_password)
 
-def login_user(db: Session, user: UserLogin):
-    db_user = db.query(User).filter(User.email == user.email).first()
 
-    if not db_user or not verify_password(user.password, db_user.password_hash):
+
+async def login_user(db: Session, user: UserLogin):
+    db_user = await run_in_threadpool(_find_user_by_email, db, user.email)
+
+    if not db_user or not await verify_password_async(user.password, db_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Geçersiz kimlik bilgileri."
@@ -68,15 +79,32 @@ def login_user(db: Session, user: UserLogin):
             detail="Email doğrulanmamış. Lütfen emailinizi kontrol edin."
         )
 
+    if not db_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Hesabınız devre dışı bırakılmış."
+        )
+
     token = create_access_token({
         "sub": str(db_user.id),
-        "role": db_user.role.value
+        "role": db_user.role.value,
+        "ver": db_user.token_version or 0,
     })
 
     return {"access_token": token, "token_type": "bearer"}
 
 
 
+def revoke_tokens(user: User):
+    """
+    Kullanıcının o ana kadar aldığı tüm token'ları geçersiz kılar.
+    Commit etmez; commit'ten sonra token_revocations.note() çağrılmalıdır.
+    """
+    user.token_version = (user.token_version or 0) + 1
+    user.token_revoked_at = datetime.utcnow()
+
+
+
 def get_current_user(
     token: HTTPAuthorizationCredentials = Depends(auth_scheme),
     db: Session = Depends(get_db)
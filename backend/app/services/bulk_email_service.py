@@ -0,0 +1,272 @@
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, text
+from sqlalchemy.orm import Session
+
+from app.models.bulk_email_job_model import BulkEmailJob
+from app.models.complaint_model import Complaint, ComplaintStatus
+from app.models.complaint_support_model import ComplaintSupport
+from app.models.outbound_email_model import OutboundEmail
+from app.models.user_model import User
+from app.services import mail_queue_service
+from app.utils import email_templates
+from app.utils.email_service import supporter_notification_fields
+from app.utils.smtp_client import smtp_configured
+
+
+# Toplu gönderimlerde saniyedeki en fazla mesaj (0: sınırsız)
+MAIL_BULK_RATE = float(os.getenv("MAIL_BULK_RATE", "10"))
+BULK_EMAIL_CHUNK_SIZE = int(os.getenv("BULK_EMAIL_CHUNK_SIZE", "500"))
+
+RECIPIENTS_DEFAULT_LIMIT = 100
+RECIPIENTS_MAX_LIMIT = 500
+
+
+# Toplu mesajların gönderim zamanlarını planlayan işlemleri sıralayan
+# Postgres advisory lock anahtarı
+_SCHEDULE_LOCK_KEY = 0x62756C6B  # "bulk"
+
+
+def create_supporter_notification(
+    db: Session,
+    actor_id: int,
+    complaint_id: int,
+    note: Optional[str],
+    resend: bool = False,
+) -> BulkEmailJob:
+    """
+    Çözülen şikayetin destekçilerine bildirim job'u oluşturur. Alıcılar
+    mail worker'ı tarafından parça parça kuyruğa yazılır; istek beklemez.
+    Şikayet için daha önce job oluşturulduysa resend=True verilmedikçe 409
+    döner; tekrarlanan istek herkese ikinci kez mail atmaz.
+    """
+    # Aynı şikayet için eşzamanlı iki istek sırayla kontrol edilsin
+    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).with_for_update().first()
+    if not complaint:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Şikayet bulunamadı.")
+    if complaint.status != ComplaintStatus.resolved:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Yalnızca çözülen şikayetlerin destekçilerine bildirim gönderilebilir.",
+        )
+    if not smtp_configured():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="SMTP ayarları eksik; toplu e-posta gönderilemiyor.",
+        )
+    if not resend:
+        previous = (
+            db.query(BulkEmailJob.id)
+            .filter(BulkEmailJob.complaint_id == complaint.id)
+            .order_by(BulkEmailJob.id.desc())
+            .first()
+        )
+        if previous is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Bu şikayetin destekçilerine zaten bildirim gönderildi (job {previous.id}). "
+                "Yeniden göndermek için resend=true verin.",
+            )
+
+    job = BulkEmailJob(
+        complaint_id=complaint.id,
+        created_by=actor_id,
+        note=(note or "").strip() or None,
+        status="queued",
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    mail_queue_service.wake()
+    return job
+
+
+def _lock_job(db: Session, job_id: int) -> Optional[BulkEmailJob]:
+    # Aynı job'u başka bir worker genişletiyorsa atla
+    return (
+        db.query(BulkEmailJob)
+        .filter(BulkEmailJob.id == job_id, BulkEmailJob.status.in_(("queued", "expanding")))
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+
+
+def expand_job(db: Session, job_id: int) -> int:
+    """
+    Destekçileri complaint_supports üzerinden id sırasıyla BULK_EMAIL_CHUNK_SIZE'lık
+    parçalar halinde okur ve kişiselleştirilmiş mesajları outbound_emails'e
+    toplu insert eder. Her parça job'un kaldığı yerle birlikte commit edilir;
+    yarıda kalan job bir sonraki çalışmada devam eder.
+
+    Hız sınırı gönderim zamanlarına yansıtılır: her mesaj kuyruktaki son
+    toplu mesajdan 1 / MAIL_BULK_RATE saniye sonra gönderilmek üzere
+    planlanır. Planlama tüm job'lar ve worker'lar için tek sırada yapılır
+    (_schedule_start), yani hız job başına değil toplamdır. Tekil mailler
+    (doğrulama, şifre sıfırlama) toplu gönderimin arkasında beklemez.
+    """
+    job = _lock_job(db, job_id)
+    if job is None:
+        return 0
+
+    complaint = db.query(Complaint).filter(Complaint.id == job.complaint_id).first()
+    template = email_templates.get("supporter_notification")
+    fields = supporter_notification_fields(complaint.title if complaint else None, job.note)
+
+    enqueued = 0
+
+    while job is not None:
+        job.status = "expanding"
+        rows = (
+            db.query(ComplaintSupport.id, User.id, User.name, User.email)
+            .join(User, User.id == ComplaintSupport.user_id)
+            .filter(
+                ComplaintSupport.complaint_id == job.complaint_id,
+                ComplaintSupport.id > job.last_support_id,
+                User.is_active.is_(True),
+            )
+            .order_by(ComplaintSupport.id)
+            .limit(BULK_EMAIL_CHUNK_SIZE)
+            .all()
+        )
+
+        if not rows:
+            job.status = "done"
+            job.expanded_at = datetime.utcnow()
+            db.commit()
+            break
+
+        send_at = _schedule_start(db)
+        values = []
+        for _, user_id, name, to_email in rows:
+            rendered = template.render(to_email, recipient_name=name or "", **fields)
+            values.append({
+                "to_email": to_email,
+                "subject": rendered.subject,
+                "message": rendered.raw,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": send_at,
+                "bulk_job_id": job.id,
+                "recipient_user_id": user_id,
+            })
+            if MAIL_BULK_RATE > 0:
+                send_at += timedelta(seconds=1 / MAIL_BULK_RATE)
+
+        db.execute(insert(OutboundEmail), values)
+        job.last_support_id = rows[-1][0]
+        job.total_recipients = (job.total_recipients or 0) + len(values)
+        enqueued += len(values)
+        db.commit()
+
+        job = _lock_job(db, job_id)
+
+    if enqueued:
+        mail_queue_service.wake()
+    return enqueued
+
+
+def _schedule_start(db: Session) -> datetime:
+    """
+    Sıradaki toplu mesajın gönderim zamanı: kuyruktaki en son planlanmış
+    toplu mesajdan 1 / MAIL_BULK_RATE saniye sonra, en erken şimdi.
+
+    Postgres'te transaction sonuna kadar tutulan advisory lock alınır:
+    eşzamanlı genişletilen job'lar birbirinin eklediği mesajları görüp
+    arkasına planlanır. Yeniden deneme bekleyen (attempts > 0) mesajlar
+    sayılmaz; geri çekilme süreleri planı ileri itmesin.
+    """
+    now = datetime.utcnow()
+    if MAIL_BULK_RATE <= 0:
+        return now
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _SCHEDULE_LOCK_KEY})
+    last = (
+        db.query(func.max(OutboundEmail.next_attempt_at))
+        .filter(
+            OutboundEmail.status == "pending",
+            OutboundEmail.bulk_job_id.isnot(None),
+            OutboundEmail.attempts == 0,
+        )
+        .scalar()
+    )
+    if last is None:
+        return now
+    return max(now, last + timedelta(seconds=1 / MAIL_BULK_RATE))
+
+
+def expand_pending_jobs(db: Session) -> int:
+    """
+    Bekleyen tüm toplu gönderim job'larını genişletir. Mail worker'ı her
+    turda çağırır.
+    """
+    job_ids = [
+        job_id for (job_id,) in
+        db.query(BulkEmailJob.id)
+        .filter(BulkEmailJob.status.in_(("queued", "expanding")))
+        .order_by(BulkEmailJob.id)
+        .all()
+    ]
+    return sum(expand_job(db, job_id) for job_id in job_ids)
+
+
+def get_job(db: Session, job_id: int) -> BulkEmailJob:
+    job = db.query(BulkEmailJob).filter(BulkEmailJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Toplu gönderim bulunamadı.")
+    return job
+
+
+def job_summary(db: Session, job_id: int) -> dict:
+    job = get_job(db, job_id)
+    counts = dict(
+        db.query(OutboundEmail.status, func.count(OutboundEmail.id))
+        .filter(OutboundEmail.bulk_job_id == job.id)
+        .group_by(OutboundEmail.status)
+        .all()
+    )
+    return {
+        "id": job.id,
+        "complaint_id": job.complaint_id,
+        "status": job.status,
+        "total_recipients": job.total_recipients,
+        "pending": counts.get("pending", 0) + counts.get("sending", 0),
+        "sent": counts.get("sent", 0),
+        "failed": counts.get("failed", 0),
+        "created_at": job.created_at,
+        "expanded_at": job.expanded_at,
+    }
+
+
+def list_job_recipients(
+    db: Session,
+    job_id: int,
+    status_filter: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = RECIPIENTS_DEFAULT_LIMIT,
+) -> list:
+    """
+    Job'un alıcı bazında gönderim durumu; outbound_emails.id üzerinden
+    keyset sayfalama (after_id).
+    """
+    get_job(db, job_id)
+    limit = max(1, min(limit, RECIPIENTS_MAX_LIMIT))
+
+    # message sütunu (tam RFC 822 metni) okunmaz
+    query = db.query(
+        OutboundEmail.id,
+        OutboundEmail.recipient_user_id,
+        OutboundEmail.to_email,
+        OutboundEmail.status,
+        OutboundEmail.attempts,
+        OutboundEmail.last_error,
+        OutboundEmail.sent_at,
+    ).filter(OutboundEmail.bulk_job_id == job_id)
+    if status_filter:
+        query = query.filter(OutboundEmail.status == status_filter)
+    if after_id:
+        query = query.filter(OutboundEmail.id > after_id)
+    return query.order_by(OutboundEmail.id).limit(limit).all()
@@ -0,0 +1,22 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.job_checkpoint_model import JobCheckpoint
+
+
+def get_checkpoint(db: Session, name: str) -> Optional[str]:
+    row = db.query(JobCheckpoint).filter(JobCheckpoint.name == name).first()
+    return row.value if row else None
+
+
+def set_checkpoint(db: Session, name: str, value: Optional[str]):
+    """
+    Job'un kaldığı yeri kaydeder. Commit etmez; job'un kendi yazdıklarıyla
+    aynı transaction'da tutulursa yarım kalan iş asla "bitti" görünmez.
+    """
+    row = db.query(JobCheckpoint).filter(JobCheckpoint.name == name).first()
+    if row is None:
+        db.add(JobCheckpoint(name=name, value=value))
+    else:
+        row.value = value
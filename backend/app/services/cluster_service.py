@@ -0,0 +1,186 @@
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.complaint_cluster_model import ComplaintClusterCell
+from app.models.complaint_model import Complaint
+from app.utils.db import upsert_increment
+from app.utils.geo import tile_xy
+
+
+# Kümeler bu zoom aralığı için tutulur; istekteki zoom bu aralığa sıkıştırılır.
+CLUSTER_MIN_ZOOM = 3
+CLUSTER_MAX_ZOOM = 16
+# Bir karo (256px) 2^2 x 2^2 hücreye bölünür, yani hücre ~64px.
+CLUSTER_CELL_SUBDIVISION = 2
+# Tek istekte dönebilecek en fazla hücre; aşılırsa zoom düşürülür.
+CLUSTER_MAX_CELLS = 4096
+
+_KEY_COLUMNS = ("zoom", "cell_x", "cell_y", "status", "category_id")
+_INCREMENT_COLUMNS = ("count", "lat_sum", "lon_sum")
+
+
+def _cell_xy(lat: float, lon: float, zoom: int) -> Tuple[int, int]:
+    return tile_xy(lat, lon, zoom + CLUSTER_CELL_SUBDIVISION)
+
+
+def cluster_deltas(snapshot, sign: int) -> Dict[tuple, List[float]]:
+    """
+    Bir şikayet görüntüsünün (snapshot) tüm zoom seviyelerindeki katkısı.
+    sign=+1 ekler, sign=-1 geri alır. Konumsuz şikayetler haritada yoktur.
+    """
+    if snapshot is None or snapshot.latitude is None or snapshot.longitude is None:
+        return {}
+
+    deltas = {}
+    for zoom in range(CLUSTER_MIN_ZOOM, CLUSTER_MAX_ZOOM + 1):
+        x, y = _cell_xy(snapshot.latitude, snapshot.longitude, zoom)
+        key = (zoom, x, y, snapshot.status, snapshot.category_id)
+        deltas[key] = [sign, sign * snapshot.latitude, sign * snapshot.longitude]
+    return deltas
+
+
+def apply_cluster_deltas(db: Session, deltas: Dict[tuple, List[float]]):
+    """
+    Biriktirilmiş delta'ları tek bir çok satırlı upsert ile yazar. Commit etmez.
+    """
+    rows = [
+        dict(zip(_KEY_COLUMNS, key), count=int(d[0]), lat_sum=d[1], lon_sum=d[2])
+        for key, d in deltas.items()
+        if d[0] != 0
+    ]
+    upsert_increment(db, ComplaintClusterCell, rows, _KEY_COLUMNS, _INCREMENT_COLUMNS)
+
+
+def merge_deltas(target: Dict[tuple, List[float]], source: Dict[tuple, List[float]]):
+    for key, d in source.items():
+        acc = target.setdefault(key, [0, 0.0, 0.0])
+        acc[0] += d[0]
+        acc[1] += d[1]
+        acc[2] += d[2]
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    "min_lon,min_lat,max_lon,max_lat" biçimindeki bbox parametresini çözer.
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox 'min_lon,min_lat,max_lon,max_lat' biçiminde olmalı.",
+        )
+
+    if not (-180 <= min_lon < max_lon <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz bbox değeri.",
+        )
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def _cell_range(bbox: Tuple[float, float, float, float], zoom: int):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    # Kuzey yukarıda: y, enlem arttıkça azalır
+    x0, y0 = _cell_xy(max_lat, min_lon, zoom)
+    x1, y1 = _cell_xy(min_lat, max_lon, zoom)
+    return x0, x1, y0, y1
+
+
+def get_clusters(db: Session, bbox: Tuple[float, float, float, float], zoom: int) -> dict:
+    """
+    Görünen alandaki hücreleri status/kategori kırılımıyla döner.
+    Maliyet görünen hücre sayısıyla orantılıdır, şikayet sayısıyla değil.
+    """
+    zoom = min(max(zoom, CLUSTER_MIN_ZOOM), CLUSTER_MAX_ZOOM)
+    x0, x1, y0, y1 = _cell_range(bbox, zoom)
+    while zoom > CLUSTER_MIN_ZOOM and (x1 - x0 + 1) * (y1 - y0 + 1) > CLUSTER_MAX_CELLS:
+        zoom -= 1
+        x0, x1, y0, y1 = _cell_range(bbox, zoom)
+
+    rows = (
+        db.query(ComplaintClusterCell)
+        .filter(
+            ComplaintClusterCell.zoom == zoom,
+            ComplaintClusterCell.cell_x.between(x0, x1),
+            ComplaintClusterCell.cell_y.between(y0, y1),
+            ComplaintClusterCell.count > 0,
+        )
+        .all()
+    )
+
+    cells = {}
+    for row in rows:
+        cell = cells.get((row.cell_x, row.cell_y))
+        if cell is None:
+            cell = cells[(row.cell_x, row.cell_y)] = {
+                "x": row.cell_x,
+                "y": row.cell_y,
+                "count": 0,
+                "lat_sum": 0.0,
+                "lon_sum": 0.0,
+                "by_status": defaultdict(int),
+                "by_category": defaultdict(int),
+            }
+        cell["count"] += row.count
+        cell["lat_sum"] += row.lat_sum
+        cell["lon_sum"] += row.lon_sum
+        cell["by_status"][row.status] += row.count
+        cell["by_category"][str(row.category_id)] += row.count
+
+    result = []
+    for cell in cells.values():
+        count = cell.pop("count")
+        lat_sum = cell.pop("lat_sum")
+        lon_sum = cell.pop("lon_sum")
+        result.append({
+            **cell,
+            "count": count,
+            "latitude": lat_sum / count,
+            "longitude": lon_sum / count,
+            "by_status": dict(cell["by_status"]),
+            "by_category": dict(cell["by_category"]),
+        })
+
+    return {"zoom": zoom, "cells": result}
+
+
+def rebuild_clusters(db: Session, batch_size: int = 5000) -> int:
+    """
+    Küme tablosunu şikayetlerden baştan üretir. Bellek kullanımı şikayet
+    sayısıyla değil hücre sayısıyla orantılıdır. Commit etmez; Postgres'te
+    tablo commit'e kadar yazmaya kilitli kalır.
+    """
+    from app.services.aggregate_service import snapshot_from_row
+
+    if db.get_bind().dialect.name == "postgresql":
+        # rebuild_counters ile aynı: tarama sırasında commit edilen delta'lar
+        # DELETE ile kaybolmasın, yazanlar commit'imizi bekleyip üstüne eklesin.
+        db.execute(text("LOCK TABLE complaint_cluster_cells IN EXCLUSIVE MODE"))
+
+    deltas: Dict[tuple, List[float]] = {}
+    processed = 0
+    rows = (
+        db.query(
+            Complaint.status,
+            Complaint.category_id,
+            Complaint.latitude,
+            Complaint.longitude,
+            Complaint.created_at,
+        )
+        .filter(Complaint.latitude.isnot(None), Complaint.longitude.isnot(None))
+        .execution_options(yield_per=batch_size)
+    )
+    for row in rows:
+        merge_deltas(deltas, cluster_deltas(snapshot_from_row(row), +1))
+        processed += 1
+
+    db.query(ComplaintClusterCell).delete(synchronize_session=False)
+    items = list(deltas.items())
+    for i in range(0, len(items), batch_size):
+        apply_cluster_deltas(db, dict(items[i:i + batch_size]))
+    return processed
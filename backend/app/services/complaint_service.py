@@ -1,9 +1,16 @@
+import base64
+import json
+import heapq
+import math
+import os
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status
-from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import func
+from sqlalchemy import func, tuple_, or_, and_
+from sqlalchemy.exc import IntegrityError
 
 from app.models.complaint_model import Complaint, ComplaintStatus, Priority
 from app.models.complaint_rating_model import ComplaintRating
@@ -17,13 +24,27 @@ from app.schemas.complaint_schema import (
     ComplaintSupportCreate,  
 )
 from app.models.complaint_photo_model import ComplaintPhoto
+from app.models.assignment_model import Assignment
+from app.utils.geo import geohash_encode, cells_for_radius, bounding_box, haversine_m
+from app.utils.category_cache import category_ids
+from app.utils.text_normalize import normalize_complaint_text
+from app.services import ai_service
 from app.services.ai_service import predict_category
+from app.services import aggregate_service
+from app.services import media_store
 from app.models.complaint_model import Complaint,ComplaintStatus
 from app.models.complaint_support_model import ComplaintSupport
 
 
 
 
+# Bu uzunluktan (normalize edilmiş) kısa metinler için öneri yapılmaz
+CATEGORY_SUGGEST_MIN_CHARS = int(os.getenv("CATEGORY_SUGGEST_MIN_CHARS", "8"))
+# En olası kategorinin skoru bunu geçerse tek öneri döner
+CATEGORY_SUGGEST_THRESHOLD = float(os.getenv("CATEGORY_SUGGEST_THRESHOLD", "0.8"))
+# Bunun altındaki skorlar öneri sayılmaz
+_MIN_SUGGEST_SCORE = 0.05
+
 ALLOWED_TRANSITIONS = {
     ComplaintStatus.pending: {ComplaintStatus.in_progress},
     ComplaintStatus.in_progress: {ComplaintStatus.resolved},
@@ -64,37 +85,80 @@ def _ensure_valid_transition(current_status: ComplaintStatus, new_status: Compla
 
 
 
+def _geo_cell_for(lat: Optional[float], lon: Optional[float]) -> Optional[str]:
+    if lat is None or lon is None:
+        return None
+    return geohash_encode(lat, lon)
+
+
 def create_complaint(db: Session, user_id: int, complaint: ComplaintCreate):
     
     category_name = predict_category(complaint.description)
 
-    category = db.query(Category).filter(Category.name == category_name).first()
-    if not category:
-        category = Category(
-            name=category_name,
-            description=f"{category_name} sorunları"
+    for attempt in range(2):
+        category_id = category_ids.get_or_create(db, category_name)
+        new_complaint = Complaint(
+            user_id=user_id,
+            title=complaint.title,                
+            description=complaint.description,
+            category_id=category_id,
+            latitude=complaint.latitude,
+            longitude=complaint.longitude,
+            geo_cell=_geo_cell_for(complaint.latitude, complaint.longitude),
+            photo_url=complaint.photo_url,
+            is_anonymous=complaint.is_anonymous,  
+            status=ComplaintStatus.pending,
+            priority=Priority.medium,
         )
-        db.add(category)
-        db.commit()
-        db.refresh(category)
-
-    new_complaint = Complaint(
-        user_id=user_id,
-        title=complaint.title,                
-        description=complaint.description,
-        category_id=category.id,              
-        latitude=complaint.latitude,
-        longitude=complaint.longitude,
-        photo_url=complaint.photo_url,
-        is_anonymous=complaint.is_anonymous,  
-        status=ComplaintStatus.pending,
-        priority=Priority.medium,
-    )
-    db.add(new_complaint)
+        try:
+            with db.begin_nested():
+                db.add(new_complaint)
+                db.flush()
+            break
+        except IntegrityError:
+            # Kategori başka bir worker'da silinmiş, buradaki önbellek henüz
+            # tazelenmemiş olabilir: önbelleği yenileyip bir kez daha dene
+            if attempt:
+                raise
+            category_ids.invalidate()
+
+    aggregate_service.on_complaint_created(db, new_complaint)
     db.commit()
     db.refresh(new_complaint)
     return new_complaint
 
+async def suggest_categories(text: str, k: int) -> dict:
+    """
+    Yazılan metin için en olası k aktif kategori. Sonuç normalize edilmiş
+    metne göre önbellekten gelir; model sadece yeni metinlerde çalışır.
+    En yüksek skor eşiği geçerse (confident) tek öneri döner ve uygulama
+    kategoriyi doğrudan seçebilir.
+    """
+    key = normalize_complaint_text(text)
+    if len(key) < CATEGORY_SUGGEST_MIN_CHARS:
+        return {"suggestions": [], "confident": False}
+
+    ranking = await ai_service.rank_categories_async(key)
+    ids = category_ids.snapshot() or await run_in_threadpool(category_ids.load)
+
+    suggestions = []
+    for name, score in ranking:
+        if score < _MIN_SUGGEST_SCORE:
+            break
+        entry = ids.get(name)
+        if entry is None or not entry[1]:
+            continue
+        suggestions.append({"category_id": entry[0], "name": name, "score": score})
+        if len(suggestions) == k:
+            break
+
+    confident = bool(suggestions) and suggestions[0]["score"] >= CATEGORY_SUGGEST_THRESHOLD
+    return {
+        "suggestions": suggestions[:1] if confident else suggestions,
+        "confident": confident,
+    }
+
+
 def get_my_complaints(db: Session, user_id: int):
     return db.query(Complaint).filter(Complaint.user_id == user_id).all()
 
@@ -112,10 +176,11 @@ def update_complaint_fields(db: Session, complaint_id: int, data: ComplaintUpdat
       - category_id
     güncellenebilir.
     """
-    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).with_for_update().first()
     if not complaint:
         return None
 
+    before = aggregate_service.snapshot(complaint)
     
     if data.status is not None:
         new_status = _parse_status(data.status)
@@ -137,6 +202,7 @@ def update_complaint_fields(db: Session, complaint_id: int, data: ComplaintUpdat
         complaint.category_id = data.category_id
 
     complaint.updated_at = datetime.utcnow()
+    aggregate_service.on_complaint_changed(db, complaint, before)
     db.commit()
     db.refresh(complaint)
     return complaint
@@ -147,15 +213,17 @@ def change_complaint_status(db: Session, complaint_id: int, new_status_raw):
     PATCH /complaints/{id}/status endpoint'i için:
     Sadece status değiştirir, pending -> in_progress -> resolved kuralını uygular.
     """
-    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).with_for_update().first()
     if not complaint:
         return None
 
     new_status = _parse_status(new_status_raw)
     _ensure_valid_transition(complaint.status, new_status)
 
+    before = aggregate_service.snapshot(complaint)
     complaint.status = new_status
     complaint.updated_at = datetime.utcnow()
+    aggregate_service.on_complaint_changed(db, complaint, before)
     db.commit()
     db.refresh(complaint)
     return complaint
@@ -198,12 +266,14 @@ def add_support(db: Session, complaint_id: int, user_id: int):
     db.commit()
     db.refresh(support)
     return support
-def add_photo(db: Session, complaint_id: int, photo_url: str):
+def add_photo(db: Session, complaint_id: int, photo_url: str, variants: Optional[dict] = None, blobs=()):
     photo = ComplaintPhoto(
         complaint_id=complaint_id,
-        photo_url=photo_url
+        photo_url=photo_url,
+        variants=variants,
     )
     db.add(photo)
+    media_store.acquire(db, blobs)
     db.commit()
     db.refresh(photo)
     return photo
@@ -278,9 +348,12 @@ def get_feed_complaints(
             Complaint.longitude.isnot(None),
         )
 
+        # Boylam farkı cos(lat) ile ölçeklenir; aksi halde 40° civarında
+        # doğu-batı mesafeleri ~%30 büyük sayılıyordu.
+        lon_scale = math.cos(math.radians(lat))
         distance_expr = (
             (Complaint.latitude - lat) * (Complaint.latitude - lat)
-            + (Complaint.longitude - lon) * (Complaint.longitude - lon)
+            + (Complaint.longitude - lon) * (Complaint.longitude - lon) * (lon_scale * lon_scale)
         )
 
         query = query.order_by(distance_expr, Complaint.created_at.desc())
@@ -290,19 +363,242 @@ def get_feed_complaints(
         query = query.order_by(Complaint.created_at.desc())
 
     return query.all()
+
+
+FEED_DEFAULT_LIMIT = 20
+FEED_MAX_LIMIT = 100
+
+# Her sıralama için keyset anahtarı (kolonlar) ve yönü.
+FEED_SORT_KEYS = {
+    "newest": ((Complaint.created_at, Complaint.id), "desc"),
+    "oldest": ((Complaint.created_at, Complaint.id), "asc"),
+    "popular": ((Complaint.support_count, Complaint.created_at, Complaint.id), "desc"),
+}
+
+
+def _cursor_values(sort: str, complaint: Complaint) -> Optional[list]:
+    if complaint.created_at is None:
+        return None
+    values = [complaint.created_at.isoformat(), complaint.id]
+    if sort == "popular":
+        values.insert(0, complaint.support_count)
+    return values
+
+
+def encode_feed_cursor(sort: str, complaint: Complaint) -> Optional[str]:
+    """
+    Sayfanın son şikayetinden opak cursor üretir (base64url JSON).
+    created_at'i olmayan satırdan cursor üretilemez; None döner.
+    """
+    values = _cursor_values(sort, complaint)
+    if values is None:
+        return None
+    payload = json.dumps({"s": sort, "k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_feed_cursor(sort: str, cursor: str) -> tuple:
+    """
+    Cursor'ı çözüp keyset değerlerini döner. Bozuk ya da başka bir
+    sıralamaya ait cursor 400 döner.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["s"] != sort:
+            raise ValueError("sort mismatch")
+        values = list(payload["k"])
+        if len(values) != len(FEED_SORT_KEYS[sort][0]):
+            raise ValueError("key length mismatch")
+        values[-2] = datetime.fromisoformat(values[-2])
+        values[-1] = int(values[-1])
+        if sort == "popular":
+            values[0] = int(values[0])
+        return tuple(values)
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz cursor değeri.",
+        )
+
+
+def get_feed_page(
+    db: Session,
+    sort: str = "newest",
+    limit: int = FEED_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Complaint], Optional[str]]:
+    """
+    Feed'in bir sayfasını keyset (seek) yöntemiyle döner.
+    OFFSET kullanılmadığı için her sayfa, tablo ne kadar büyürse büyüsün
+    index üzerinde sabit maliyetle okunur.
+    """
+    if sort not in FEED_SORT_KEYS:
+        sort = "newest"
+    limit = max(1, min(limit, FEED_MAX_LIMIT))
+
+    columns, direction = FEED_SORT_KEYS[sort]
+
+    # created_at'i olmayan eski satırlar keyset ile karşılaştırılamaz
+    # (NULL < x bilinmez); feed'e alınmaz.
+    query = db.query(Complaint).options(
+        selectinload(Complaint.photos),
+        selectinload(Complaint.resolution_photos),
+        joinedload(Complaint.user),
+        joinedload(Complaint.category),
+    ).filter(Complaint.created_at.isnot(None))
+
+    if cursor:
+        key = tuple_(*columns)
+        values = tuple_(*decode_feed_cursor(sort, cursor))
+        query = query.filter(key < values if direction == "desc" else key > values)
+
+    if direction == "desc":
+        query = query.order_by(*[c.desc() for c in columns])
+    else:
+        query = query.order_by(*[c.asc() for c in columns])
+
+    # Bir fazla satır çekip sonraki sayfanın varlığını anlıyoruz.
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = encode_feed_cursor(sort, rows[-1]) if has_more and rows else None
+    return rows, next_cursor
+
+
+NEARBY_DEFAULT_RADIUS_M = 1000
+NEARBY_MAX_RADIUS_M = 50000
+
+
+def get_nearby_complaints(
+    db: Session,
+    lat: float,
+    lon: float,
+    radius_m: float = NEARBY_DEFAULT_RADIUS_M,
+    limit: int = FEED_DEFAULT_LIMIT,
+) -> List[Tuple[Complaint, float]]:
+    """
+    Yarıçap içindeki şikayetleri mesafeye göre sıralı döner: (şikayet, metre).
+
+    Önce geo_cell index'i üzerinden prefix aralıklarıyla aday satırlar
+    daraltılır, sonra yalnızca (id, lat, lon) okunup haversine ile elenir
+    ve sıralanır. Tam satırlar sadece seçilen `limit` kadar id için yüklenir.
+    """
+    limit = max(1, min(limit, FEED_MAX_LIMIT))
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_m)
+
+    query = db.query(Complaint.id, Complaint.latitude, Complaint.longitude).filter(
+        Complaint.latitude.between(min_lat, max_lat),
+        Complaint.longitude.between(min_lon, max_lon),
+    )
+
+    cells = cells_for_radius(lat, lon, radius_m)
+    if cells:
+        # "abc" prefix'i, ["abc", "abc~") aralığıdır; "~" base32 alfabesinden büyüktür.
+        query = query.filter(
+            or_(*[and_(Complaint.geo_cell >= c, Complaint.geo_cell < c + "~") for c in cells])
+        )
+
+    candidates = (
+        (haversine_m(lat, lon, row.latitude, row.longitude), row.id)
+        for row in query.all()
+    )
+    nearest = heapq.nsmallest(
+        limit,
+        (item for item in candidates if item[0] <= radius_m),
+    )
+    if not nearest:
+        return []
+
+    complaints = {
+        c.id: c
+        for c in db.query(Complaint)
+        .options(
+            selectinload(Complaint.photos),
+            selectinload(Complaint.resolution_photos),
+            joinedload(Complaint.user),
+            joinedload(Complaint.category),
+        )
+        .filter(Complaint.id.in_([complaint_id for _, complaint_id in nearest]))
+        .all()
+    }
+    return [
+        (complaints[complaint_id], distance)
+        for distance, complaint_id in nearest
+        if complaint_id in complaints
+    ]
+
+
+def get_legacy_resolution_photos(db: Session, complaints: List[Complaint]) -> Dict[int, List[dict]]:
+    """
+    complaint_resolution_photos kaydı olmayan şikayetler için eski
+    assignments.solution_photo_url (JSON liste) alanından çözüm fotoğraflarını
+    tek sorguda toplar. complaint_id -> foto listesi döner.
+    """
+    missing = {c.id: c for c in complaints if not c.resolution_photos}
+    if not missing:
+        return {}
+
+    rows = (
+        db.query(Assignment.complaint_id, Assignment.solution_photo_url, Assignment.end_time)
+        .filter(
+            Assignment.complaint_id.in_(list(missing.keys())),
+            Assignment.solution_photo_url.isnot(None),
+        )
+        .order_by(Assignment.complaint_id, Assignment.id)
+        .all()
+    )
+
+    result: Dict[int, List[dict]] = {}
+    for complaint_id, raw_urls, end_time in rows:
+        try:
+            urls = json.loads(raw_urls)
+        except ValueError:
+            continue
+        if not isinstance(urls, list):
+            continue
+
+        photos = result.setdefault(complaint_id, [])
+        created_at = end_time or missing[complaint_id].updated_at or datetime.utcnow()
+        for url in urls:
+            photos.append({
+                "id": 1000 + len(photos),
+                "photo_url": url,
+                "created_at": created_at,
+            })
+    return result
+
+
 def delete_complaint(db: Session, complaint_id: int):
-    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).with_for_update().first()
     if not complaint:
         return False
+    aggregate_service.on_complaint_deleted(db, complaint)
+    media_store.release(db, _photo_urls(list(complaint.photos) + list(complaint.resolution_photos)))
     db.delete(complaint)
     db.commit()
     return True
 
 
+def _photo_urls(photos) -> List[str]:
+    """
+    Fotoğrafların gösterdiği dosyalar: türevler, türevi yoksa photo_url.
+    """
+    urls = []
+    for photo in photos:
+        urls.extend(media_store.variant_urls(photo.variants) or [photo.photo_url])
+    return urls
+
+
 def delete_photo(db: Session, photo_id: int):
+    """
+    Fotoğrafı siler; türevlerin son referansı gidiyorsa dosyaları da silinir.
+    """
     photo = db.query(ComplaintPhoto).filter(ComplaintPhoto.id == photo_id).first()
     if not photo:
         return False
     db.delete(photo)
+    media_store.release(db, _photo_urls([photo]))
     db.commit()
     return True
\ No newline at end of file
@@ -0,0 +1,254 @@
+import email
+import email.policy
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.outbound_email_model import OutboundEmail
+from app.utils.db import SessionLocal
+from app.utils.email_templates import RenderedEmail
+from app.utils.smtp_client import smtp_configured, smtp_pool
+
+
+# Uygulama süreci içinde kuyruğu boşaltan thread'i başlatır (0: kapalı)
+MAIL_QUEUE_WORKER = os.getenv("MAIL_QUEUE_WORKER", "1").lower() in ("1", "true", "yes")
+MAIL_QUEUE_POLL_INTERVAL = float(os.getenv("MAIL_QUEUE_POLL_INTERVAL", "5"))
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "50"))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "8"))
+MAIL_RETRY_BASE_SECONDS = int(os.getenv("MAIL_RETRY_BASE_SECONDS", "30"))
+MAIL_RETRY_MAX_SECONDS = int(os.getenv("MAIL_RETRY_MAX_SECONDS", "3600"))
+# "sending" durumunda kalan (ör. worker çöktü) mesajlar bu süreden sonra tekrar alınır.
+# Süre her mesajın gönderiminden hemen önce yenilenir; tek bir SMTP gönderiminden
+# (zaman aşımı dahil) uzun olmalıdır.
+MAIL_SEND_LEASE_SECONDS = int(os.getenv("MAIL_SEND_LEASE_SECONDS", "300"))
+# Gönderilmiş mesajlar (doğrulama / sıfırlama bağlantıları içerir) bu kadar gün sonra silinir
+MAIL_SENT_RETENTION_DAYS = int(os.getenv("MAIL_SENT_RETENTION_DAYS", "7"))
+MAIL_PURGE_INTERVAL = float(os.getenv("MAIL_PURGE_INTERVAL", "3600"))
+MAIL_PURGE_BATCH_SIZE = int(os.getenv("MAIL_PURGE_BATCH_SIZE", "1000"))
+
+_wakeup = threading.Event()
+
+
+def enqueue(rendered: RenderedEmail, db: Optional[Session] = None) -> int:
+    """
+    Hazır mesajı gönderim kuyruğuna yazar ve worker'ı uyandırır. db verilirse
+    mesaj o session'a eklenip commit edilir; verilmezse kısa ömürlü bir
+    session açılır.
+    """
+    row = OutboundEmail(
+        to_email=rendered.to_email,
+        subject=rendered.subject,
+        message=rendered.raw,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+    try:
+        db.add(row)
+        db.commit()
+        row_id = row.id
+    finally:
+        if own_session:
+            db.close()
+
+    _wakeup.set()
+    return row_id
+
+
+def wake():
+    """
+    Worker'ı bir sonraki poll'u beklemeden çalıştırır.
+    """
+    _wakeup.set()
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    seconds = min(MAIL_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)), MAIL_RETRY_MAX_SECONDS)
+    return timedelta(seconds=seconds)
+
+
+def _is_permanent(error: Exception) -> bool:
+    # 5xx yanıtlar (geçersiz alıcı, reddedilen mesaj) tekrar denenmez
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def _claim_batch(db: Session, limit: int) -> Tuple[List[OutboundEmail], Dict[int, datetime]]:
+    """
+    Zamanı gelmiş mesajları "sending" olarak kiralar. Her satırın kira
+    bitişi ayrıca döner: _renew_lease() satırın hâlâ bu worker'da olduğunu
+    ona bakarak anlar.
+    """
+    now = datetime.utcnow()
+    rows = (
+        db.query(OutboundEmail)
+        .filter(
+            OutboundEmail.status.in_(("pending", "sending")),
+            OutboundEmail.next_attempt_at <= now,
+        )
+        .order_by(OutboundEmail.next_attempt_at, OutboundEmail.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    lease_until = now + timedelta(seconds=MAIL_SEND_LEASE_SECONDS)
+    leases = {}
+    for row in rows:
+        row.status = "sending"
+        row.next_attempt_at = lease_until
+        leases[row.id] = lease_until
+    db.commit()
+    return rows, leases
+
+
+def _renew_lease(db: Session, row_id: int, leases: Dict[int, datetime]) -> bool:
+    """
+    Gönderimden hemen önce satırın kirasını uzatır. Kira bu arada dolup
+    satırı başka bir worker aldıysa (next_attempt_at artık bizim kira
+    bitişimiz değil) False döner; mesaj ikinci kez gönderilmez.
+    """
+    lease_until = datetime.utcnow() + timedelta(seconds=MAIL_SEND_LEASE_SECONDS)
+    renewed = (
+        db.query(OutboundEmail)
+        .filter(
+            OutboundEmail.id == row_id,
+            OutboundEmail.status == "sending",
+            OutboundEmail.next_attempt_at == leases[row_id],
+        )
+        .update({OutboundEmail.next_attempt_at: lease_until}, synchronize_session=False)
+    )
+    db.commit()
+    if renewed:
+        leases[row_id] = lease_until
+    return bool(renewed)
+
+
+def _send(row: OutboundEmail):
+    parsed = email.message_from_string(row.message, policy=email.policy.default)
+    with smtp_pool.connection() as server:
+        server.send_message(parsed)
+
+
+def deliver_due(db: Session, limit: int = MAIL_BATCH_SIZE) -> dict:
+    """
+    Zamanı gelmiş mesajları havuzdaki SMTP oturumlarıyla gönderir.
+    Her mesajın kirası gönderimden önce yenilenir, sonucu ayrı commit edilir.
+    """
+    result = {"claimed": 0, "sent": 0, "retry": 0, "failed": 0, "lost": 0}
+    rows, leases = _claim_batch(db, limit)
+    result["claimed"] = len(rows)
+
+    for row in rows:
+        if not _renew_lease(db, row.id, leases):
+            result["lost"] += 1
+            continue
+        try:
+            _send(row)
+        except Exception as e:
+            row.attempts += 1
+            row.last_error = f"{type(e).__name__}: {e}"[:2000]
+            if _is_permanent(e) or row.attempts >= MAIL_MAX_ATTEMPTS:
+                row.status = "failed"
+                result["failed"] += 1
+                print(f"❌ Mail gönderilemedi → {row.to_email}: {row.last_error}")
+            else:
+                row.status = "pending"
+                row.next_attempt_at = datetime.utcnow() + _retry_delay(row.attempts)
+                result["retry"] += 1
+        else:
+            row.attempts += 1
+            row.status = "sent"
+            row.sent_at = datetime.utcnow()
+            row.last_error = None
+            result["sent"] += 1
+        db.commit()
+
+    return result
+
+
+def purge_sent(db: Session, older_than_days: int = MAIL_SENT_RETENTION_DAYS) -> int:
+    """
+    Saklama süresini aşmış gönderilmiş mesajları parça parça siler; her
+    parça ayrı commit edilir. Silinen satır sayısını döner.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    purged = 0
+    while True:
+        ids = [
+            row_id for (row_id,) in
+            db.query(OutboundEmail.id)
+            .filter(OutboundEmail.status == "sent", OutboundEmail.sent_at < cutoff)
+            .order_by(OutboundEmail.id)
+            .limit(MAIL_PURGE_BATCH_SIZE)
+            .all()
+        ]
+        if not ids:
+            return purged
+        db.query(OutboundEmail).filter(OutboundEmail.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        purged += len(ids)
+
+
+def _mail_loop():
+    from app.services import bulk_email_service
+
+    next_purge = 0.0
+    while True:
+        _wakeup.clear()
+        db = SessionLocal()
+        try:
+            if time.monotonic() >= next_purge:
+                next_purge = time.monotonic() + MAIL_PURGE_INTERVAL
+                purge_sent(db)
+            bulk_email_service.expand_pending_jobs(db)
+            result = deliver_due(db)
+        except Exception as e:
+            db.rollback()
+            print(f"MAIL_QUEUE_ERROR: {e}")
+            result = {"claimed": 0}
+        finally:
+            db.close()
+
+        # Dolu bir batch geldiyse beklemeden devam et
+        if result["claimed"] < MAIL_BATCH_SIZE:
+            _wakeup.wait(MAIL_QUEUE_POLL_INTERVAL)
+
+
+def start_mail_worker():
+    """
+    SMTP tanımlıysa ve MAIL_QUEUE_WORKER açıksa kuyruğu arka plan
+    thread'inde boşaltır.
+    """
+    if not (MAIL_QUEUE_WORKER and smtp_configured()):
+        return None
+    worker = threading.Thread(target=_mail_loop, name="mail-queue", daemon=True)
+    worker.start()
+    return worker
+
+
+def queue_stats(db: Session) -> dict:
+    counts = dict(
+        db.query(OutboundEmail.status, func.count(OutboundEmail.id))
+        .group_by(OutboundEmail.status)
+        .all()
+    )
+    return {
+        "pending": counts.get("pending", 0),
+        "sending": counts.get("sending", 0),
+        "sent": counts.get("sent", 0),
+        "failed": counts.get("failed", 0),
+        "smtp_pool": smtp_pool.stats(),
+    }
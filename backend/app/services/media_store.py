@@ -0,0 +1,294 @@
+import hashlib
+import os
+import re
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.models.media_blob_model import MediaBlob
+from app.utils import storage as storage_config
+from app.utils.db import upsert_increment
+from app.utils.storage import storage
+
+
+MEDIA_ROOT = Path(storage_config.MEDIA_ROOT)
+BLOB_PREFIX = "blobs"
+# Ham yüklemeler ve henüz yayınlanmamış türevler; her zaman yerel diskte.
+# MEDIA_ROOT altında olduğu için yerel depoya yayınlama os.replace ile yapılır.
+STAGING_DIR = MEDIA_ROOT / ".staging"
+STAGING_DIR.mkdir(parents=True, exist_ok=True)
+
+# İçerik adresli dosya hiç değişmez; istemci ve CDN yeniden doğrulamaz
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+CONTENT_TYPES = {
+    "webp": "image/webp",
+    "jpg": "image/jpeg",
+    "png": "image/png",
+}
+
+_BLOB_URL = re.compile(rf"^/media/{BLOB_PREFIX}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/([0-9a-f]{{64}})\.\w+$")
+
+
+class StagedBlob(NamedTuple):
+    sha256: str
+    key: str
+    size: int
+    content_type: str
+    path: str
+
+
+class _HashingWriter:
+    """
+    Yazılan baytları dosyaya yazarken sha256'sını da hesaplar; encoder
+    çıktısı ikinci kez okunmaz.
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.digest.update(data)
+        self.size += len(data)
+        return self._f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+def blob_key(sha256: str, extension: str) -> str:
+    return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}.{extension}"
+
+
+def url_for(key: str) -> str:
+    return f"/media/{key}"
+
+
+def sha_from_url(url: Optional[str]) -> Optional[str]:
+    """
+    İçerik adresli URL'in sha256'sı; eski (blobs/ dışındaki) URL'ler için None.
+    """
+    match = _BLOB_URL.match(url or "")
+    return match.group(1) if match else None
+
+
+def stage(write, extension: str) -> StagedBlob:
+    """
+    write(f) ile üretilen içeriği staging dizinine yazar ve hash'ler.
+    Süreç havuzunda da çalışır; veritabanına dokunmaz.
+    """
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=STAGING_DIR, prefix=".blob-", suffix=f".{extension}")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            writer = _HashingWriter(f)
+            write(writer)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    sha256 = writer.digest.hexdigest()
+    return StagedBlob(
+        sha256,
+        blob_key(sha256, extension),
+        writer.size,
+        CONTENT_TYPES.get(extension, "application/octet-stream"),
+        tmp_path,
+    )
+
+
+class StagedBatch(list):
+    """
+    publishing() bloğundaki türevler. acquire() depoya yazdığı blob'ları
+    published'a ekler; commit olmazsa publishing() onları geri siler.
+    """
+
+    def __init__(self, staged: Iterable[StagedBlob]):
+        super().__init__(staged)
+        self.published: List[StagedBlob] = []
+
+
+def acquire(db: Session, staged: Iterable[StagedBlob]):
+    """
+    Türevlerin blob satırlarını oluşturur ya da referans sayılarını artırır
+    ve yeni blob'ların dosyalarını depoya yazar; zaten var olanların
+    staging dosyası silinir. Commit etmez: dosya commit'ten önce yazılır,
+    commit edilen satır hiçbir zaman yazılmamış bir dosyayı göstermez.
+    Yazma hata verirse exception çağırana geçer (publishing() temizler).
+    """
+    batch = staged if isinstance(staged, StagedBatch) else None
+    staged = list(staged)
+    counts = Counter(blob.sha256 for blob in staged)
+    first = {}
+    for blob in staged:
+        first.setdefault(blob.sha256, blob)
+    rows = [
+        {
+            "sha256": sha256,
+            "key": first[sha256].key,
+            "size": first[sha256].size,
+            "content_type": first[sha256].content_type,
+            "ref_count": count,
+        }
+        for sha256, count in sorted(counts.items())
+    ]
+    upsert_increment(db, MediaBlob, rows, key_columns=["sha256"], increment_columns=["ref_count"])
+
+    # Satırlar bu transaction'da kilitli. Sayısı bizim eklediğimiz kadar olan
+    # blob yenidir: başka commit edilmiş referansı yoktur, dosyası yazılmalıdır.
+    existing = dict(
+        db.query(MediaBlob.sha256, MediaBlob.ref_count).filter(MediaBlob.sha256.in_(list(counts))).all()
+    )
+    for sha256, blob in sorted(first.items()):
+        if existing.get(sha256) != counts[sha256]:
+            continue
+        storage.put(blob.key, blob.path, blob.content_type, IMMUTABLE_CACHE_CONTROL)
+        if batch is not None:
+            batch.published.append(blob)
+    discard(staged)
+
+
+def discard(staged: Iterable[StagedBlob]):
+    _remove_quietly(Path(blob.path) for blob in staged)
+
+
+def _unpublish(published: Iterable[StagedBlob]):
+    for blob in published:
+        try:
+            storage.delete(blob.key)
+        except Exception as e:
+            print(f"⚠️ Medya dosyası geri alınamadı ({blob.key}): {e}")
+
+
+@contextmanager
+def publishing(db: Session, staged: Iterable[StagedBlob]):
+    """
+    Blok acquire() + commit yapar. Blok commit'ten önce hata verirse
+    acquire()'ın depoya yazdığı yeni dosyalar silinir; satırlar hâlâ
+    kilitli olduğundan aynı içeriği yükleyen eşzamanlı istek silmeden
+    sonra kendi dosyasını yazar. Staging dosyaları her durumda silinir.
+    """
+    batch = StagedBatch(staged)
+    committed = []
+
+    def _on_commit(session):
+        committed.append(True)
+
+    event.listen(db, "after_commit", _on_commit)
+    try:
+        yield batch
+    except BaseException:
+        if not committed:
+            _unpublish(batch.published)
+        raise
+    finally:
+        event.remove(db, "after_commit", _on_commit)
+        discard(batch)
+
+
+def retain(db: Session, urls: Iterable[Optional[str]]) -> Set[str]:
+    """
+    Var olan blob'ları gösteren URL'ler için referans ekler (ör. istemcinin
+    profilde verdiği avatar URL'i). Referansı eklenen sha256'ları döner;
+    satırı olmayan (ya da bu arada silinen) blob'lar dönmez. Çağıran,
+    dönmeyen URL'i kaydetmemelidir: sonradan release() edilirse aynı
+    içeriğe sahip başka birinin referansını düşürür.
+    """
+    counts = Counter(sha for sha in map(sha_from_url, urls) if sha)
+    retained = set()
+    for sha256, count in sorted(counts.items()):
+        updated = db.query(MediaBlob).filter(MediaBlob.sha256 == sha256).update(
+            {MediaBlob.ref_count: MediaBlob.ref_count + count},
+            synchronize_session=False,
+        )
+        if updated:
+            retained.add(sha256)
+    return retained
+
+
+def _legacy_path(url: Optional[str]) -> Optional[Path]:
+    """
+    İçerik adresli olmayan /media/ URL'inin dosyası; MEDIA_ROOT dışına
+    çıkan ya da blob dizinine işaret eden URL'ler için None.
+    """
+    if not url or not url.startswith("/media/"):
+        return None
+    root = MEDIA_ROOT.resolve()
+    path = (MEDIA_ROOT / url[len("/media/"):]).resolve()
+    if not path.is_relative_to(root) or path.is_relative_to(root / BLOB_PREFIX):
+        return None
+    return path
+
+
+def release(db: Session, urls: Iterable[Optional[str]]):
+    """
+    URL'lerin referanslarını bırakır; son referansı giden blob'ların satırı
+    ve dosyası silinir. Eski (içerik adresli olmayan) /media/ dosyaları
+    doğrudan silinir.
+
+    Çağıranın commit'inden hemen önce çağrılmalıdır: blob satırları kilitli
+    tutulurken dosya silinir, aynı içeriği yükleyen eşzamanlı istek
+    acquire()'da bu commit'i bekler, blob'u yeni bulur ve dosyayı yeniden
+    yazar.
+    """
+    counts: Counter = Counter()
+    legacy: List[Path] = []
+    for url in urls:
+        sha256 = sha_from_url(url)
+        if sha256:
+            counts[sha256] += 1
+        elif _legacy_path(url) is not None:
+            legacy.append(_legacy_path(url))
+
+    orphans: List[str] = []
+    for sha256, count in sorted(counts.items()):
+        blob = db.query(MediaBlob).filter(MediaBlob.sha256 == sha256).with_for_update().first()
+        if blob is None:
+            continue
+        blob.ref_count -= count
+        if blob.ref_count <= 0:
+            orphans.append(blob.key)
+            db.delete(blob)
+    db.flush()
+    for key in orphans:
+        try:
+            storage.delete(key)
+        except Exception as e:
+            # Silinemeyen dosya sadece yer kaplar; referansı olan dosya kaybolmaz
+            print(f"⚠️ Medya dosyası silinemedi ({key}): {e}")
+    _remove_quietly(legacy)
+
+
+def variant_urls(variants: Optional[Dict[str, dict]]) -> List[str]:
+    return [variant["url"] for variant in (variants or {}).values()]
+
+
+def stats(db: Session) -> dict:
+    count, stored, referenced = db.query(
+        func.count(MediaBlob.sha256),
+        func.coalesce(func.sum(MediaBlob.size), 0),
+        func.coalesce(func.sum(MediaBlob.size * MediaBlob.ref_count), 0),
+    ).one()
+    return {
+        "blobs": count,
+        "stored_bytes": int(stored),
+        "referenced_bytes": int(referenced),
+        "dedup_saved_bytes": int(referenced) - int(stored),
+    }
+
+
+def _remove_quietly(paths: Iterable[Path]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,345 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence
+
+import joblib
+from fastapi import HTTPException, status
+
+
+ARTIFACT_PREFIX = "category_model-"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_stamp(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ModelVersion:
+    """
+    Yüklenmiş ve doğrulanmış bir model. vectorizer/model hiç değişmez;
+    istekler registry.current'ı bir kez okuyup bu nesneyle çalışır.
+    """
+
+    __slots__ = ("name", "path", "sha256", "vectorizer", "model", "loaded_at", "load_seconds")
+
+    def __init__(self, name, path, sha256, vectorizer, model, load_seconds):
+        self.name = name
+        self.path = path
+        self.sha256 = sha256
+        self.vectorizer = vectorizer
+        self.model = model
+        self.loaded_at = datetime.utcnow()
+        self.load_seconds = load_seconds
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "path": self.path,
+            "sha256": self.sha256,
+            "classes": [str(c) for c in getattr(self.model, "classes_", [])],
+            "loaded_at": self.loaded_at.isoformat(),
+            "load_seconds": round(self.load_seconds, 3),
+        }
+
+
+class ModelRegistry:
+    """
+    Kategori modelinin çalışan süreçteki sürümlerini yönetir.
+
+    Aktif model dosyası (active_path) tüm worker'lar için ortak işarettir:
+    eğitim betiği ve admin endpoint'i yeni sürümü bu dosyaya atomik olarak
+    yazar, her worker'ın izleyici thread'i değişikliği görüp modeli arka
+    planda yükler. Yeni model yüklenip smoke cümleleriyle doğrulanmadan
+    referans değişmez; değişim tek atama olduğundan hiçbir istek yarım
+    yüklenmiş model görmez. Bir önceki sürüm bellekte tutulur, geri alma
+    anında yapılır.
+    """
+
+    def __init__(
+        self,
+        active_path: str,
+        models_dir: str,
+        smoke_texts: Sequence[str],
+        mmap_mode: Optional[str] = None,
+        on_swap: Optional[Callable[[], None]] = None,
+    ):
+        self.active_path = active_path
+        self.models_dir = models_dir
+        self.smoke_texts = list(smoke_texts)
+        self.mmap_mode = mmap_mode
+        self.on_swap = on_swap
+
+        self.current: Optional[ModelVersion] = None
+        self.previous: Optional[ModelVersion] = None
+        self.loading: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+        self._initialized = False
+        self._seen_stamp = None
+        self._swap_lock = threading.Lock()
+        # Aynı anda tek yükleme; ilk yükleme de bu lock'ta beklenir
+        self._load_lock = threading.Lock()
+        self._watcher = None
+
+    # --- yükleme / doğrulama ---
+
+    def _identify(self, path: str, sha256: str):
+        """
+        (ad, dosya) ikilisi. Aktif dosya models_dir'deki bir sürümün kopyasıysa
+        o sürümün adı ve dosyası kullanılır; geri almada aynı dosya yayınlanır.
+        """
+        if os.path.basename(path).startswith(ARTIFACT_PREFIX):
+            return os.path.basename(path)[len(ARTIFACT_PREFIX):-len(".pkl")], path
+        for artifact in self.available_versions():
+            if artifact.get("sha256") == sha256:
+                return artifact["version"], self.artifact_path(artifact["version"])
+        return f"{os.path.basename(path)}@{sha256[:12]}", path
+
+    def _validate(self, vectorizer, model):
+        predicted = model.predict(vectorizer.transform(self.smoke_texts))
+        if len(predicted) != len(self.smoke_texts):
+            raise ValueError(f"{len(self.smoke_texts)} smoke cümlesine {len(predicted)} tahmin döndü")
+        classes = set(getattr(model, "classes_", []))
+        unknown = [label for label in predicted if label not in classes]
+        if unknown:
+            raise ValueError(f"Model bilinmeyen sınıf döndürdü: {unknown[0]!r}")
+
+    def load(self, path: str) -> ModelVersion:
+        """
+        Dosyayı okuyup doğrular; başarısızsa ValueError. Aktif modele dokunmaz.
+        """
+        started = time.monotonic()
+        if not os.path.exists(path):
+            raise ValueError(f"Model dosyası bulunamadı: {path}")
+        sha256 = file_sha256(path)
+        try:
+            vectorizer, model = joblib.load(path, mmap_mode=self.mmap_mode)
+        except Exception as e:
+            raise ValueError(f"Model yüklenemedi: {e}") from e
+        try:
+            self._validate(vectorizer, model)
+        except Exception as e:
+            raise ValueError(f"Model doğrulanamadı: {e}") from e
+        name, source = self._identify(path, sha256)
+        return ModelVersion(name, source, sha256, vectorizer, model, time.monotonic() - started)
+
+    def _swap(self, version: ModelVersion):
+        with self._swap_lock:
+            if self.current is not None and self.current.sha256 == version.sha256:
+                return
+            self.previous, self.current = self.current, version
+        if self.on_swap:
+            self.on_swap()
+        print(f"🔁 Kategori modeli değişti: {version.name}")
+
+    def _publish(self, version: ModelVersion):
+        """
+        Sürümü aktif dosyaya atomik yazar; diğer worker'lar izleyicileriyle
+        aynı sürüme geçer. Kendi izleyicimiz bu değişikliği tekrar yüklemez.
+        """
+        directory = os.path.dirname(os.path.abspath(self.active_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".pkl")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if os.path.exists(version.path) and os.path.abspath(version.path) != os.path.abspath(self.active_path):
+                    with open(version.path, "rb") as src:
+                        for block in iter(lambda: src.read(1 << 20), b""):
+                            f.write(block)
+                else:
+                    # Aktif dosyadan yüklenmiş ve o dosya sonradan değişmiş olabilir
+                    joblib.dump((version.vectorizer, version.model), f)
+                f.flush()
+                os.fsync(f.fileno())
+            published_sha = file_sha256(tmp_path)
+            os.replace(tmp_path, self.active_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._seen_stamp = _file_stamp(self.active_path)
+        if published_sha != version.sha256:
+            version.sha256 = published_sha
+
+    # --- okuma ---
+
+    @property
+    def initialized(self) -> bool:
+        """
+        İlk yükleme denendiyse True; get() artık dosya okumaz ve lock beklemez.
+        """
+        return self._initialized
+
+    def get(self) -> Optional[ModelVersion]:
+        """
+        Aktif model; ilk çağrıda aktif dosyayı yükler. Model yoksa None.
+        """
+        if not self._initialized:
+            with self._load_lock:
+                if not self._initialized:
+                    self._seen_stamp = _file_stamp(self.active_path)
+                    try:
+                        self._swap(self.load(self.active_path))
+                        self.last_error = None
+                    except ValueError as e:
+                        self.last_error = str(e)
+                        print(f"⚠️ Kategori modeli yüklenemedi ({e}); varsayılan kategori kullanılacak. "
+                              f"train_category_model.py ile model üretebilirsiniz.")
+                    self._initialized = True
+        return self.current
+
+    # --- değişiklik ---
+
+    def check_for_update(self) -> bool:
+        """
+        Aktif dosya değiştiyse yeni sürüme geçer. Bir önceki sürüme dönülmüşse
+        (rollback başka worker'da yapıldıysa) yükleme yapılmaz, anında değişir.
+        """
+        if not self._initialized:
+            self.get()
+            return False
+        stamp = _file_stamp(self.active_path)
+        if stamp is None or stamp == self._seen_stamp:
+            return False
+
+        with self._load_lock:
+            if stamp == self._seen_stamp:
+                return False
+            self._seen_stamp = stamp
+            try:
+                sha256 = file_sha256(self.active_path)
+                if self.current is not None and sha256 == self.current.sha256:
+                    return False
+                if self.previous is not None and sha256 == self.previous.sha256:
+                    self._swap(self.previous)
+                    return True
+                self.loading = self.active_path
+                self._swap(self.load(self.active_path))
+                self.last_error = None
+                return True
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+                print(f"❌ Yeni kategori modeli reddedildi, mevcut model kullanılmaya devam ediyor: {e}")
+                return False
+            finally:
+                self.loading = None
+
+    def _activate(self, path: str):
+        try:
+            version = self.load(path)
+            if path != self.active_path:
+                self._publish(version)
+            self._swap(version)
+            self.last_error = None
+        except (OSError, ValueError) as e:
+            self.last_error = str(e)
+            print(f"❌ Kategori modeli etkinleştirilemedi: {e}")
+        finally:
+            self.loading = None
+            self._load_lock.release()
+
+    def activate(self, version: Optional[str] = None, background: bool = True):
+        """
+        models_dir'deki sürümü (verilmezse aktif dosyayı) arka planda yükler,
+        doğrular ve etkinleştirir. Yükleme sürerken 409 döner.
+        """
+        if version is not None and version not in {v["version"] for v in self.available_versions()}:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model sürümü bulunamadı.")
+        path = self.active_path if version is None else self.artifact_path(version)
+        if not os.path.exists(path):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model sürümü bulunamadı.")
+        if not self._load_lock.acquire(blocking=False):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Başka bir model yükleniyor.")
+
+        self.loading = path
+        if not background:
+            self._activate(path)
+            return None
+        worker = threading.Thread(target=self._activate, args=(path,), name="category-model-load", daemon=True)
+        worker.start()
+        return worker
+
+    def rollback(self) -> ModelVersion:
+        """
+        Bir önceki sürüme anında döner ve onu aktif dosyaya yazar.
+        """
+        with self._load_lock:
+            previous = self.previous
+            if previous is None:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Geri dönülecek önceki model yok.")
+            self._publish(previous)
+            self._swap(previous)
+            return previous
+
+    # --- izleme / durum ---
+
+    def _watch_loop(self, interval: float):
+        while True:
+            time.sleep(interval)
+            try:
+                self.check_for_update()
+            except Exception as e:
+                print(f"❌ Model izleyici hatası: {e}")
+
+    def start_watcher(self, interval: float):
+        if interval <= 0 or self._watcher is not None:
+            return None
+        self._watcher = threading.Thread(
+            target=self._watch_loop,
+            args=(interval,),
+            name="category-model-watcher",
+            daemon=True,
+        )
+        self._watcher.start()
+        return self._watcher
+
+    def artifact_path(self, version: str) -> str:
+        return os.path.join(self.models_dir, f"{ARTIFACT_PREFIX}{version}.pkl")
+
+    def available_versions(self) -> List[dict]:
+        """
+        models_dir'deki sürümler (yeniden eskiye), eğitim özetleriyle birlikte.
+        """
+        try:
+            names = os.listdir(self.models_dir)
+        except OSError:
+            return []
+        versions = []
+        for name in sorted(names, reverse=True):
+            if not (name.startswith(ARTIFACT_PREFIX) and name.endswith(".pkl")):
+                continue
+            version = name[len(ARTIFACT_PREFIX):-len(".pkl")]
+            entry = {"version": version}
+            try:
+                with open(os.path.join(self.models_dir, name[:-len(".pkl")] + ".json"), encoding="utf-8") as f:
+                    entry.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+            entry["version"] = version
+            versions.append(entry)
+        return versions
+
+    def status(self) -> dict:
+        current, previous = self.current, self.previous
+        return {
+            "current": current.describe() if current else None,
+            "previous": previous.describe() if previous else None,
+            "loading": self.loading,
+            "last_error": self.last_error,
+            "available": self.available_versions(),
+        }
@@ -0,0 +1,163 @@
+import json
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app.models.category_model import Category
+from app.models.complaint_model import Complaint, ComplaintStatus
+from app.services import aggregate_service, ai_service, analytics_service
+from app.services.checkpoint_service import get_checkpoint, set_checkpoint
+
+
+RECLASSIFY_JOB_NAME = "reclassify_complaints"
+
+_complaints = Complaint.__table__
+
+# updated_at kendisine atanır: onupdate tetiklenmez. Yeniden sınıflandırma
+# kullanıcı/yetkili işlemi değildir; etkilenen rollup günleri
+# analytics_service.mark_days_dirty ile ayrıca işaretlenir.
+_UPDATE_CATEGORY = (
+    update(_complaints)
+    .where(_complaints.c.id == bindparam("complaint_id"))
+    .values(category_id=bindparam("new_category_id"), updated_at=_complaints.c.updated_at)
+)
+
+
+def _load_state(db: Session) -> Optional[dict]:
+    raw = get_checkpoint(db, RECLASSIFY_JOB_NAME)
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def _category_ids(db: Session, names: Iterable[str], known: Dict[str, int]) -> Dict[str, int]:
+    """
+    Kategori adlarını id'ye çevirir; modelin bildiği ama tabloda olmayan
+    kategoriler create_complaint'teki gibi oluşturulur.
+    """
+    missing = set(names).difference(known)
+    if missing:
+        for category in db.query(Category).filter(Category.name.in_(missing)):
+            known[category.name] = category.id
+        for name in sorted(missing.difference(known)):
+            category = Category(name=name, description=f"{name} sorunları")
+            db.add(category)
+            db.flush()
+            known[name] = category.id
+    return known
+
+
+def reclassify_complaints(
+    db: Session,
+    chunk_size: int = 1000,
+    restart: bool = False,
+    dry_run: bool = False,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Bekleyen (pending) şikayetleri yüklü modelle yeniden sınıflandırır ve
+    kategorisi değişenleri günceller. İşleme alınmış şikayetlere dokunulmaz:
+    kategorileri yetkili tarafından onaylanmış ya da düzeltilmiştir ve
+    train_category_model.py onları etiket olarak kullanır.
+
+    Tablo id sırasıyla chunk_size'lık parçalar halinde okunur (id > son_id,
+    primary key index'i üzerinden) ve parça FOR UPDATE SKIP LOCKED ile
+    kilitlenir; o anda başka bir işlemin düzenlediği satırlar atlanır. Her
+    parça tek predict_categories çağrısıyla sınıflandırılır, değişen
+    satırlar tek executemany UPDATE ile yazılır, küme/sayaç farkları ve
+    kirli rollup günleri checkpoint ile birlikte commit edilir. Bellek
+    kullanımı parça boyutuyla sınırlıdır.
+
+    Checkpoint modelin kimliğini de tutar: aynı modelle tekrar çalıştırılınca
+    kaldığı yerden (ve sonradan eklenen şikayetlerle) devam eder, model
+    değiştiyse baştan başlar. Etkilenen günler sonraki analitik rollup'ta
+    yeniden hesaplanır. dry_run=True hiçbir şey yazmaz, sadece sayar.
+    """
+    version = ai_service.model_version()
+    if version is None:
+        return {"skipped": True, "reason": "Kategori modeli yüklenemedi."}
+
+    state = None if restart else _load_state(db)
+    last_id = state["last_id"] if state and state.get("model") == version else 0
+    resumed_from = last_id
+
+    categories: Dict[str, int] = {}
+    days = set()
+    processed = changed = 0
+    started = time.monotonic()
+
+    while True:
+        rows = (
+            db.query(
+                Complaint.id,
+                Complaint.description,
+                Complaint.status,
+                Complaint.category_id,
+                Complaint.latitude,
+                Complaint.longitude,
+                Complaint.created_at,
+                Complaint.resolved_at,
+                Complaint.rejected_at,
+            )
+            .filter(Complaint.id > last_id, Complaint.status == ComplaintStatus.pending)
+            .order_by(Complaint.id)
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not rows:
+            break
+
+        names = ai_service.predict_categories([row.description or "" for row in rows])
+        ids = _category_ids(db, names, categories)
+
+        params, changes, chunk_days = [], [], []
+        for row, name in zip(rows, names):
+            new_category_id = ids[name]
+            if new_category_id == row.category_id:
+                continue
+            before = aggregate_service.snapshot_from_row(row)
+            changes.append((before, before._replace(category_id=new_category_id)))
+            params.append({"complaint_id": row.id, "new_category_id": new_category_id})
+            chunk_days.extend(value.date() for value in (row.created_at, row.resolved_at, row.rejected_at) if value)
+        days.update(chunk_days)
+
+        last_id = rows[-1].id
+        processed += len(rows)
+        changed += len(params)
+
+        if dry_run:
+            db.rollback()
+        else:
+            if params:
+                db.execute(_UPDATE_CATEGORY, params)
+                aggregate_service.apply_changes(db, changes)
+                analytics_service.mark_days_dirty(db, chunk_days)
+            set_checkpoint(db, RECLASSIFY_JOB_NAME, json.dumps({"model": version, "last_id": last_id}))
+            db.commit()
+
+        if on_progress:
+            elapsed = time.monotonic() - started
+            on_progress({
+                "processed": processed,
+                "changed": changed,
+                "last_id": last_id,
+                "rows_per_sec": round(processed / elapsed, 1) if elapsed > 0 else None,
+            })
+
+    elapsed = time.monotonic() - started
+    return {
+        "skipped": False,
+        "model": version,
+        "resumed_from": resumed_from,
+        "processed": processed,
+        "changed": changed,
+        "dirty_days": len(days),
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(processed / elapsed, 1) if elapsed > 0 else None,
+    }
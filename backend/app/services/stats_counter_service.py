@@ -0,0 +1,89 @@
+from collections import Counter
+from datetime import date
+from typing import Dict, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.models.complaint_model import Complaint
+from app.models.stats_counter_model import StatsCounter
+from app.utils.db import upsert_increment
+
+
+_KEY_COLUMNS = ("status", "category_id", "day")
+
+
+def counter_deltas(snapshot, sign: int) -> Counter:
+    # created_at'i olmayan şikayet hiçbir güne sayılmaz (f4c1d8a7b203 eski
+    # satırları doldurur); böylece ekleme ve geri alma hep aynı kovaya düşer.
+    if snapshot is None or snapshot.created_at is None:
+        return Counter()
+    key = (snapshot.status, snapshot.category_id, snapshot.created_at.date())
+    return Counter({key: sign})
+
+
+def apply_counter_deltas(db: Session, deltas: Counter):
+    """
+    Sayaç delta'larını tek upsert ile yazar. Commit etmez.
+    """
+    rows = [
+        dict(zip(_KEY_COLUMNS, key), count=delta)
+        for key, delta in deltas.items()
+        if delta != 0
+    ]
+    upsert_increment(db, StatsCounter, rows, _KEY_COLUMNS, ("count",))
+
+
+def complaint_counts(db: Session, since: date) -> Tuple[Dict[str, int], int]:
+    """
+    status başına toplam ve `since` gününden itibaren oluşturulanların
+    toplamı. Okunan satır sayısı kova sayısı kadardır, şikayet sayısı kadar değil.
+    """
+    rows = (
+        db.query(
+            StatsCounter.status,
+            func.sum(StatsCounter.count),
+            func.sum(StatsCounter.count).filter(StatsCounter.day >= since),
+        )
+        .group_by(StatsCounter.status)
+        .all()
+    )
+    by_status = {}
+    recent = 0
+    for status_value, total, recent_total in rows:
+        by_status[status_value] = int(total or 0)
+        recent += int(recent_total or 0)
+    return by_status, recent
+
+
+def rebuild_counters(db: Session, batch_size: int = 5000) -> int:
+    """
+    Sayaçları şikayetlerden baştan üretir (uzlaştırma). Commit etmez;
+    Postgres'te tablo commit'e kadar yazmaya kilitli kalır.
+    """
+    from app.services.aggregate_service import snapshot_from_row
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Tarama ile DELETE arasında commit edilen artışlar silinmesin: yazan
+        # istekler upsert'te commit'imizi bekler, delta'ları yeni sayaçların
+        # üstüne eklenir. Taramadan önce alınmalı; okumalar engellenmez.
+        db.execute(text("LOCK TABLE stats_counters IN EXCLUSIVE MODE"))
+
+    deltas = Counter()
+    processed = 0
+    rows = db.query(
+        Complaint.status,
+        Complaint.category_id,
+        Complaint.latitude,
+        Complaint.longitude,
+        Complaint.created_at,
+    ).execution_options(yield_per=batch_size)
+    for row in rows:
+        deltas.update(counter_deltas(snapshot_from_row(row), +1))
+        processed += 1
+
+    db.query(StatsCounter).delete(synchronize_session=False)
+    items = list(deltas.items())
+    for i in range(0, len(items), batch_size):
+        apply_counter_deltas(db, Counter(dict(items[i:i + batch_size])))
+    return processed
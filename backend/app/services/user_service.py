@@ -1,21 +1,21 @@
 from datetime import datetime, timedelta
 import random
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from app.models.user_model import User
 
 from app.utils.email_service import send_email_change_code
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.utils.user_cache import principal_cache
+from app.utils.hash_pool import hash_pool, bcrypt_hash, bcrypt_verify
 
 
 def _hash_code(code: str) -> str:
-    return pwd_context.hash(code)
+    return hash_pool.run(bcrypt_hash, code)
 
 
 def _verify_code(code: str, hashed: str) -> bool:
-    return pwd_context.verify(code, hashed)
+    return hash_pool.run(bcrypt_verify, code, hashed)
 
 
 def request_email_change(db: Session, user: User, new_email: str):
@@ -55,3 +55,4 @@ def confirm_email_change(db: Session, user: User, code: str):
     user.email_change_expires = None
 
     db.commit()
+    principal_cache.invalidate(user.id)
@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.category_model import Category
+from app.utils.db import SessionLocal
+
+
+CATEGORY_ID_CACHE_TTL = float(os.getenv("CATEGORY_ID_CACHE_TTL", "60"))
+# Bilinmeyen bir ad istendiğinde tablo en fazla bu sıklıkla yeniden okunur
+_MISS_REFRESH_INTERVAL = 1.0
+
+
+class CategoryIdCache:
+    """
+    Kategori adı -> (id, is_active). Tablo küçük olduğu için tamamı tek
+    sorguyla okunur ve TTL boyunca her istekte ad sorgusu yapılmaz.
+    Kategoriyi değiştiren admin ve yetkili işlemleri invalidate() çağırır; diğer
+    worker'lar en geç TTL sonunda tazelenir.
+    """
+
+    def __init__(self, ttl: float = CATEGORY_ID_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[int, bool]] = {}
+        self._expires_at = 0.0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self, db: Session):
+        rows = db.query(Category.name, Category.id, Category.is_active).all()
+        entries = {name: (category_id, is_active is not False) for name, category_id, is_active in rows}
+        now = time.monotonic()
+        with self._lock:
+            self._entries = entries
+            self._expires_at = now + self.ttl
+            self._refreshed_at = now
+
+    def snapshot(self) -> Optional[Dict[str, Tuple[int, bool]]]:
+        """
+        Süresi dolmamışsa eşleme; dolmuşsa None (çağıran load() etmeli).
+        """
+        if time.monotonic() >= self._expires_at:
+            return None
+        return self._entries
+
+    def load(self) -> Dict[str, Tuple[int, bool]]:
+        """
+        Eşlemeyi kendi session'ıyla yeniler. async endpoint'ler threadpool'da çağırır.
+        """
+        db = SessionLocal()
+        try:
+            self._refresh(db)
+        finally:
+            db.close()
+        return self._entries
+
+    def get_id(self, db: Session, name: str) -> Optional[int]:
+        entries = self.snapshot()
+        if entries is None:
+            self._refresh(db)
+            entries = self._entries
+        entry = entries.get(name)
+        if entry is None and time.monotonic() - self._refreshed_at >= _MISS_REFRESH_INTERVAL:
+            # Başka worker'da yeni eklenmiş olabilir
+            self._refresh(db)
+            entry = self._entries.get(name)
+        return entry[0] if entry else None
+
+    def get_or_create(self, db: Session, name: str) -> int:
+        """
+        Adın id'si; kategori yoksa çağıranın transaction'ı içinde oluşturulur
+        (commit edilmez). Oluşturulan id, commit görülmeden önbelleğe yazılmaz.
+        """
+        category_id = self.get_id(db, name)
+        if category_id is not None:
+            return category_id
+
+        try:
+            with db.begin_nested():
+                category = Category(name=name, description=f"{name} sorunları")
+                db.add(category)
+                db.flush()
+                return category.id
+        except IntegrityError:
+            # Aynı anda başka istek oluşturdu
+            return db.query(Category.id).filter(Category.name == name).scalar()
+
+    def invalidate(self):
+        with self._lock:
+            self._expires_at = 0.0
+
+
+category_ids = CategoryIdCache()
@@ -1,5 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, and_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker, Session
+from typing import Iterable, List
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:password@db:5432/urbanlife_db")
@@ -7,6 +9,9 @@ DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:password@db:5432
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Çok satırlı INSERT'te bağlanan parametre sınırı (SQLite 32766, Postgres 65535)
+_MAX_BIND_PARAMS = 30000
+
 
 def get_db():
     db: Session = SessionLocal()
@@ -14,3 +19,47 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def upsert_increment(
+    db: Session,
+    model,
+    rows: List[dict],
+    key_columns: Iterable[str],
+    increment_columns: Iterable[str],
+):
+    """
+    Sayaç tablolarına "varsa ekle, yoksa oluştur" yazar (INSERT ... ON CONFLICT
+    DO UPDATE SET col = col + excluded.col). Commit etmez; çağıranın
+    transaction'ına katılır. Satırlardaki anahtarlar tekil olmalıdır.
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    key_columns = list(key_columns)
+    increment_columns = list(increment_columns)
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        per_statement = max(1, _MAX_BIND_PARAMS // len(rows[0]))
+        for i in range(0, len(rows), per_statement):
+            stmt = insert(table).values(rows[i:i + per_statement])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=key_columns,
+                set_={col: table.c[col] + stmt.excluded[col] for col in increment_columns},
+            )
+            db.execute(stmt)
+        return
+
+    # Diğer veritabanları için satır satır güncelle / ekle
+    for row in rows:
+        where = and_(*[table.c[col] == row[col] for col in key_columns])
+        result = db.execute(
+            table.update()
+            .where(where)
+            .values({col: table.c[col] + row[col] for col in increment_columns})
+        )
+        if result.rowcount == 0:
+            db.execute(table.insert().values(row))
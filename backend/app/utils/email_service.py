@@ -1,38 +1,27 @@
+import html
 import os
-import smtplib
-import ssl
-from email.message import EmailMessage
 from email.utils import formataddr
-SMTP_HOST = os.getenv("SMTP_HOST")
-SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
-SMTP_USER = os.getenv("SMTP_USER")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
-EMAIL_FROM = os.getenv("EMAIL_FROM", SMTP_USER)
-APP_BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:8000")
-
-def send_verification_email(to_email: str, token: str):
-    
-    verification_link = f"{APP_BASE_URL}/auth/verify-email?token={token}"
 
-    if not (SMTP_USER and SMTP_PASSWORD and SMTP_HOST and SMTP_PORT):
-        print("⚠️ SMTP ayarları eksik! Mail gönderilmedi.")
-        print("Doğrulama Linki:", verification_link)
-        return
-
-    msg = EmailMessage()
-    msg["Subject"] = "CityFlow - E-posta Doğrulama"
-    msg["From"] = EMAIL_FROM
-    msg["To"] = to_email
+from app.services import mail_queue_service
+from app.utils import email_templates
+from app.utils.email_templates import RenderedEmail
+from app.utils.smtp_client import SMTP_USER, smtp_configured
+EMAIL_FROM = os.getenv("EMAIL_FROM", SMTP_USER or "no-reply@cityflow.local")
+APP_BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:8000")
 
-    
-    msg.set_content(
-        f"Merhaba!\n\n"
-        f"CityFlow hesabını aktifleştirmek için aşağıdaki bağlantıya tıkla:\n"
-        f"{verification_link}\n\n"
-    )
 
-   
-    html_content = f"""
+# Şablonlar import sırasında (uygulama açılışında) bir kez derlenir;
+# gönderimde sadece alıcıya özel alanlar yerleştirilir. Bkz. email_templates.
+email_templates.register(
+    "verification",
+    subject="CityFlow - E-posta Doğrulama",
+    from_addr=EMAIL_FROM,
+    text=(
+        "Merhaba!\n\n"
+        "CityFlow hesabını aktifleştirmek için aşağıdaki bağlantıya tıkla:\n"
+        "{{verification_link}}\n\n"
+    ),
+    html_body="""
     <html>
       <body style="font-family: Arial, sans-serif; color: #333;">
         <div style="background-color: #f4f4f4; padding: 20px;">
@@ -40,67 +29,43 @@ def send_verification_email(to_email: str, token: str):
             <h2 style="color: #4F46E5;">CityFlow'a Hoş Geldin!</h2>
             <p>Hesabını doğrulamak için lütfen aşağıdaki butona tıkla:</p>
             <div style="text-align: center; margin: 30px 0;">
-              <a href="{verification_link}" style="background-color: #4F46E5; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; font-weight: bold;">
+              <a href="{{verification_link}}" style="background-color: #4F46E5; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; font-weight: bold;">
                 E-postamı Doğrula
               </a>
             </div>
-            <p style="font-size: 12px; color: #888;">Eğer butona tıklayamıyorsan, şu linki tarayıcıya yapıştır: {verification_link}</p>
+            <p style="font-size: 12px; color: #888;">Eğer butona tıklayamıyorsan, şu linki tarayıcıya yapıştır: {{verification_link}}</p>
           </div>
         </div>
       </body>
     </html>
-    """
-    msg.add_alternative(html_content, subtype='html')
-
-    context = ssl.create_default_context()
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-        server.starttls(context=context)
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        server.send_message(msg)
-
-    print(f"📧 Doğrulama maili gönderildi → {to_email}")
-
-
-def send_password_reset_email(to_email: str, token: str):
-    
-    reset_link = f"{APP_BASE_URL}/auth/open-app?token={token}"
-
-    if not (SMTP_USER and SMTP_PASSWORD and SMTP_HOST and SMTP_PORT):
-        print("⚠️ SMTP ayarları eksik!")
-        return
-
-    msg = EmailMessage()
-    msg["Subject"] = "CityFlow - Şifre Sıfırlama"
-    
-    
-    msg["From"] = formataddr(("CityFlow", SMTP_USER))
-    
-    msg["To"] = to_email
-
-   
-    msg.set_content(
-        f"Merhaba,\n\n"
-        f"CityFlow şifrenizi sıfırlamak için lütfen aşağıdaki bağlantıdaki butonu kullanın.\n"
-    )
-
-
-    html_content = f"""
+    """,
+)
+
+email_templates.register(
+    "password_reset",
+    subject="CityFlow - Şifre Sıfırlama",
+    from_addr=formataddr(("CityFlow", SMTP_USER or EMAIL_FROM)),
+    text=(
+        "Merhaba,\n\n"
+        "CityFlow şifrenizi sıfırlamak için lütfen aşağıdaki bağlantıdaki butonu kullanın.\n"
+    ),
+    html_body="""
     <!DOCTYPE html>
     <html>
       <body style="margin: 0; padding: 0; font-family: Arial, sans-serif; background-color: #f4f4f4;">
         <table role="presentation" style="width: 100%; border-collapse: collapse;">
           <tr>
             <td style="padding: 20px 0; text-align: center;">
-              
+
               <div style="background-color: white; max-width: 600px; margin: 0 auto; padding: 40px; border-radius: 10px; box-shadow: 0 4px 10px rgba(0,0,0,0.05); text-align: center;">
-                
+
                 <h2 style="color: #4F46E5; margin-top: 0;">Şifre Sıfırlama</h2>
-                
+
                 <p style="color: #555; font-size: 16px; line-height: 1.6; margin-bottom: 30px;">
                   CityFlow hesabınızın şifresini sıfırlamak için<br>aşağıdaki butona tıklayın.
                 </p>
-                
-                <a href="{reset_link}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 16px 32px; text-decoration: none; border-radius: 8px; font-weight: bold; font-size: 18px;">
+
+                <a href="{{reset_link}}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 16px 32px; text-decoration: none; border-radius: 8px; font-weight: bold; font-size: 18px;">
                   Şifremi Sıfırla
                 </a>
 
@@ -109,46 +74,26 @@ def send_password_reset_email(to_email: str, token: str):
                 </p>
 
               </div>
-              
+
             </td>
           </tr>
         </table>
       </body>
     </html>
-    """
-    
-    msg.add_alternative(html_content, subtype='html')
-
-    context = ssl.create_default_context()
-    try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls(context=context)
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.send_message(msg)
-        print(f"📧 Şifre sıfırlama maili gönderildi → {to_email}")
-    except Exception as e:
-        print(f"❌ Mail gönderme hatası: {e}")
-
-
-def send_email_change_code(to_email: str, code: str):
-    if not (SMTP_USER and SMTP_PASSWORD and SMTP_HOST and SMTP_PORT):
-        print("⚠️ SMTP ayarları eksik! Mail gönderilmedi.")
-        print("E-posta değişim kodu:", code)
-        return
-
-    msg = EmailMessage()
-    msg["Subject"] = "CityFlow - E-posta Değiştirme Kodu"
-    msg["From"] = EMAIL_FROM
-    msg["To"] = to_email
-
-    msg.set_content(
-        f"Merhaba!\n\n"
-        f"E-posta değişikliği için doğrulama kodunuz: {code}\n"
-        f"Kod 10 dakika geçerlidir.\n\n"
-        f"Bu işlem size ait değilse bu e-postayı dikkate almayın.\n"
-    )
-
-    html_content = f"""
+    """,
+)
+
+email_templates.register(
+    "email_change_code",
+    subject="CityFlow - E-posta Değiştirme Kodu",
+    from_addr=EMAIL_FROM,
+    text=(
+        "Merhaba!\n\n"
+        "E-posta değişikliği için doğrulama kodunuz: {{code}}\n"
+        "Kod 10 dakika geçerlidir.\n\n"
+        "Bu işlem size ait değilse bu e-postayı dikkate almayın.\n"
+    ),
+    html_body="""
     <html>
       <body style="font-family: Arial, sans-serif; color: #333;">
         <div style="background-color: #f4f4f4; padding: 20px;">
@@ -157,7 +102,7 @@ def send_email_change_code(to_email: str, code: str):
             <p>E-posta değişikliğini onaylamak için doğrulama kodunuz:</p>
             <div style="text-align: center; margin: 24px 0;">
               <div style="display:inline-block; font-size: 28px; letter-spacing: 6px; font-weight: bold; padding: 12px 18px; border: 1px solid #ddd; border-radius: 8px;">
-                {code}
+                {{code}}
               </div>
             </div>
             <p style="font-size: 12px; color: #888;">Kod 10 dakika geçerlidir.</p>
@@ -165,13 +110,90 @@ def send_email_change_code(to_email: str, code: str):
         </div>
       </body>
     </html>
-    """
-    msg.add_alternative(html_content, subtype="html")
+    """,
+)
+
+email_templates.register(
+    "supporter_notification",
+    subject="CityFlow - Desteklediğiniz şikayet çözüldü",
+    from_addr=EMAIL_FROM,
+    text=(
+        "Merhaba {{recipient_name}},\n\n"
+        "Desteklediğiniz \"{{complaint_title}}\" başlıklı şikayet çözüldü olarak işaretlendi.\n"
+        "{{note_text}}"
+        "\nKatkınız için teşekkür ederiz.\n"
+    ),
+    html_body="""
+    <html>
+      <body style="font-family: Arial, sans-serif; color: #333;">
+        <div style="background-color: #f4f4f4; padding: 20px;">
+          <div style="max-width: 600px; margin: 0 auto; background-color: #fff; padding: 20px; border-radius: 8px;">
+            <h2 style="color: #4F46E5;">Şikayet Çözüldü</h2>
+            <p>Merhaba {{recipient_name}},</p>
+            <p>Desteklediğiniz <b>{{complaint_title}}</b> başlıklı şikayet çözüldü olarak işaretlendi.</p>
+            {{{note_html}}}
+            <p style="font-size: 12px; color: #888;">Katkınız için teşekkür ederiz.</p>
+          </div>
+        </div>
+      </body>
+    </html>
+    """,
+)
 
-    context = ssl.create_default_context()
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-        server.starttls(context=context)
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        server.send_message(msg)
 
-    print(f"📧 E-posta değişim kodu gönderildi → {to_email}")
+# Mesajlar burada sadece hazırlanır; SMTP teslimatı mail_queue_service
+# worker'ında yapılır, böylece istek mail sunucusunu beklemez.
+def _enqueue(rendered: RenderedEmail):
+    mail_queue_service.enqueue(rendered)
+
+def send_verification_email(to_email: str, token: str):
+
+    verification_link = f"{APP_BASE_URL}/auth/verify-email?token={token}"
+
+    if not smtp_configured():
+        print("⚠️ SMTP ayarları eksik! Mail gönderilmedi.")
+        print("Doğrulama Linki:", verification_link)
+        return
+
+    _enqueue(email_templates.render("verification", to_email, verification_link=verification_link))
+    print(f"📧 Doğrulama maili kuyruğa alındı → {to_email}")
+
+
+def send_password_reset_email(to_email: str, token: str):
+
+    reset_link = f"{APP_BASE_URL}/auth/open-app?token={token}"
+
+    if not smtp_configured():
+        print("⚠️ SMTP ayarları eksik!")
+        return
+
+    try:
+        _enqueue(email_templates.render("password_reset", to_email, reset_link=reset_link))
+        print(f"📧 Şifre sıfırlama maili kuyruğa alındı → {to_email}")
+    except Exception as e:
+        print(f"❌ Mail gönderme hatası: {e}")
+
+
+def send_email_change_code(to_email: str, code: str):
+    if not smtp_configured():
+        print("⚠️ SMTP ayarları eksik! Mail gönderilmedi.")
+        print("E-posta değişim kodu:", code)
+        return
+
+    _enqueue(email_templates.render("email_change_code", to_email, code=code))
+    print(f"📧 E-posta değişim kodu kuyruğa alındı → {to_email}")
+
+
+def supporter_notification_fields(complaint_title: str, note: str = None) -> dict:
+    """
+    Toplu bildirimde job boyunca sabit kalan alanlar; her alıcı için
+    sadece recipient_name eklenir.
+    """
+    return {
+        "complaint_title": complaint_title or "Şikayet",
+        "note_text": f"\nYetkili notu: {note}\n" if note else "",
+        "note_html": (
+            f'<p style="background-color: #f4f4f4; padding: 12px; border-radius: 5px;">{html.escape(note)}</p>'
+            if note else ""
+        ),
+    }
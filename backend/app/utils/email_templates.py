@@ -0,0 +1,146 @@
+import base64
+import html
+import re
+from collections import namedtuple
+from email.message import EmailMessage
+from email.policy import default as default_policy
+from typing import Dict, List, Tuple
+
+
+# Şablonlarda {{alan}} HTML bölümünde escape edilir, {{{alan}}} olduğu gibi
+# (önceden hazırlanmış HTML parçaları için) eklenir. Metin bölümünde ikisi aynıdır.
+_FIELD_RE = re.compile(r"\{\{\{(\w+)\}\}\}|\{\{(\w+)\}\}")
+
+# Derleme sırasında MIME iskeletinde değişken kısımların yerini tutan işaretler
+_TO_TOKEN = "@@CFT_TO@@"
+_PART_TOKEN = "@@CFT_PART_{}@@"
+_SKELETON_RE = re.compile(r"@@CFT_(TO|PART_\d+)@@")
+_TO_PLACEHOLDER = "recipient@placeholder.invalid"
+
+RenderedEmail = namedtuple("RenderedEmail", ["to_email", "subject", "raw"])
+
+# Gövde segment türleri
+_LITERAL, _ESCAPED, _RAW = range(3)
+
+
+def _compile_body(source: str, escape: bool) -> Tuple[tuple, List[str]]:
+    # set_content gibi: gövde her zaman satır sonuyla biter
+    if not source.endswith("\n"):
+        source += "\n"
+    segments, fields = [], []
+    position = 0
+    for match in _FIELD_RE.finditer(source):
+        if match.start() > position:
+            segments.append((_LITERAL, source[position:match.start()]))
+        raw_name, name = match.group(1), match.group(2)
+        field = raw_name or name
+        fields.append(field)
+        segments.append((_ESCAPED if (escape and name) else _RAW, field))
+        position = match.end()
+    if position < len(source):
+        segments.append((_LITERAL, source[position:]))
+    return tuple(segments), fields
+
+
+def _render_body(segments: tuple, values: dict) -> str:
+    out = []
+    for kind, value in segments:
+        if kind == _LITERAL:
+            out.append(value)
+        elif kind == _ESCAPED:
+            out.append(html.escape(str(values[value])))
+        else:
+            out.append(str(values[value]))
+    return base64.encodebytes("".join(out).encode("utf-8")).decode("ascii")
+
+
+def _fold_to(to_email: str) -> str:
+    if to_email.isascii() and "\n" not in to_email and len(to_email) < 900:
+        return to_email
+    # ASCII dışı adresler için header'ı stdlib kodlasın
+    folded = default_policy.fold("To", to_email)
+    return folded[len("To: "):].rstrip("\n")
+
+
+class CompiledEmail:
+    """
+    Bir kez derlenen e-posta şablonu.
+
+    Derleme sırasında gövdelerin ve alıcının yerine işaret konmuş gerçek bir
+    EmailMessage oluşturulup metne çevrilir; header kodlama, multipart sınırı
+    ve part header'ları bu iskelette bir kez hesaplanmış olur. Gövde
+    şablonları da sabit parçalar + alan listesi olarak saklanır. render()
+    yalnızca alanları yerleştirir, her gövdeyi base64'ler ve iskeletle
+    birleştirir; MIME ağacı kurulmaz.
+    """
+
+    def __init__(self, name: str, subject: str, text: str, html_body: str, from_addr: str):
+        self.name = name
+        self.subject = subject
+        self.from_addr = from_addr
+        self.text = text
+        self.html_body = html_body
+
+        text_segments, text_fields = _compile_body(text, escape=False)
+        html_segments, html_fields = _compile_body(html_body, escape=True)
+        self._parts = (text_segments, html_segments)
+        self.fields = frozenset(text_fields + html_fields)
+
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = from_addr
+        msg["To"] = _TO_PLACEHOLDER
+        msg.set_content(_PART_TOKEN.format(0), cte="7bit")
+        msg.add_alternative(_PART_TOKEN.format(1), subtype="html", cte="7bit")
+        skeleton = (
+            msg.as_string()
+            .replace(_TO_PLACEHOLDER, _TO_TOKEN, 1)
+            .replace("Content-Transfer-Encoding: 7bit", "Content-Transfer-Encoding: base64")
+        )
+
+        segments = []
+        position = 0
+        for match in _SKELETON_RE.finditer(skeleton):
+            segments.append(skeleton[position:match.start()])
+            token = match.group(1)
+            segments.append(None if token == "TO" else int(token[len("PART_"):]))
+            position = match.end()
+        segments.append(skeleton[position:])
+        self._skeleton = tuple(segments)
+
+    def render(self, to_email: str, **values) -> RenderedEmail:
+        missing = self.fields.difference(values)
+        if missing:
+            raise KeyError(f"{self.name} şablonu için eksik alan(lar): {', '.join(sorted(missing))}")
+
+        out = []
+        for index, segment in enumerate(self._skeleton):
+            if index % 2 == 0:
+                out.append(segment)
+            elif segment is None:
+                out.append(_fold_to(to_email))
+            else:
+                # İskelette gövdeden sonra zaten satır sonu var
+                out.append(_render_body(self._parts[segment], values).rstrip("\n"))
+        return RenderedEmail(to_email, self.subject, "".join(out))
+
+
+_registry: Dict[str, CompiledEmail] = {}
+
+
+def register(name: str, subject: str, text: str, html_body: str, from_addr: str) -> CompiledEmail:
+    """
+    Şablonu derleyip kayıt eder. Modül import edilirken (uygulama
+    açılışında) çağrılır.
+    """
+    template = CompiledEmail(name, subject, text, html_body, from_addr)
+    _registry[name] = template
+    return template
+
+
+def get(name: str) -> CompiledEmail:
+    return _registry[name]
+
+
+def render(name: str, to_email: str, **values) -> RenderedEmail:
+    return _registry[name].render(to_email, **values)
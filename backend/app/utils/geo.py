@@ -0,0 +1,123 @@
+import math
+from typing import List, Tuple
+
+
+EARTH_RADIUS_M = 6371008.8
+
+# Şikayetlerde saklanan geohash hassasiyeti (~153m x 153m hücre).
+GEOHASH_PRECISION = 7
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    """
+    Enlem/boylamı verilen hassasiyette geohash string'ine çevirir.
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bit, ch, even = 0, 0, True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch = (ch << 1) | 1
+                lon_lo = mid
+            else:
+                ch <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch <<= 1
+                lat_hi = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[ch])
+            bit, ch = 0, 0
+
+    return "".join(chars)
+
+
+def cell_size_deg(precision: int) -> Tuple[float, float]:
+    """
+    Verilen hassasiyette bir geohash hücresinin (enlem, boylam) derece boyutu.
+    """
+    bits = precision * 5
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def bounding_box(lat: float, lon: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """
+    Merkez + yarıçapı kapsayan (min_lat, max_lat, min_lon, max_lon) kutusu.
+    """
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = min(math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat)), 180.0)
+    return (
+        max(lat - dlat, -90.0),
+        min(lat + dlat, 90.0),
+        max(lon - dlon, -180.0),
+        min(lon + dlon, 180.0),
+    )
+
+
+def _precision_for_box(min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> int:
+    # Hücre kutudan büyük olan en ince hassasiyet: kutu en fazla 2x2 hücreye düşer.
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_size, lon_size = cell_size_deg(precision)
+        if lat_size >= (max_lat - min_lat) and lon_size >= (max_lon - min_lon):
+            return precision
+    return 0
+
+
+def cells_for_radius(lat: float, lon: float, radius_m: float) -> List[str]:
+    """
+    Dairenin çevreleyen kutusunu örten geohash prefix'lerini döner.
+    Boş liste, yarıçapın hücre filtresi için fazla büyük olduğu anlamına gelir.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_m)
+    precision = _precision_for_box(min_lat, max_lat, min_lon, max_lon)
+    if precision == 0:
+        return []
+
+    cells = set()
+    for p_lat in (min_lat, lat, max_lat):
+        for p_lon in (min_lon, lon, max_lon):
+            cells.add(geohash_encode(p_lat, p_lon, precision))
+    return sorted(cells)
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    İki nokta arasındaki büyük çember mesafesi (metre).
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+# Web Mercator'ın tanımlı olduğu enlem sınırı
+MERCATOR_MAX_LAT = 85.05112878
+
+
+def tile_xy(lat: float, lon: float, zoom: int) -> Tuple[int, int]:
+    """
+    Slippy-map (Web Mercator) karo koordinatları: verilen zoom'da (x, y).
+    """
+    lat = min(max(lat, -MERCATOR_MAX_LAT), MERCATOR_MAX_LAT)
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
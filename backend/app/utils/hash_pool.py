@@ -0,0 +1,40 @@
+import os
+
+from passlib.context import CryptContext
+
+from app.utils.process_pool import BoundedProcessPool
+
+
+# bcrypt işlemleri için ayrılan süreç sayısı. 0: işlemler çağıran thread'de yapılır.
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(min(2, os.cpu_count() or 1))))
+# Aynı anda kuyrukta + işlemde bekleyebilecek en fazla iş; aşılınca 503 döner.
+HASH_POOL_MAX_PENDING = int(os.getenv("HASH_POOL_MAX_PENDING", "32"))
+HASH_POOL_RETRY_AFTER = int(os.getenv("HASH_POOL_RETRY_AFTER", "1"))
+HASH_POOL_TIMEOUT = float(os.getenv("HASH_POOL_TIMEOUT", "30"))
+
+
+# Worker süreçlerinde import sırasında oluşturulur
+_crypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def bcrypt_hash(secret: str) -> str:
+    return _crypt_context.hash(secret)
+
+
+def bcrypt_verify(secret: str, hashed: str) -> bool:
+    return _crypt_context.verify(secret, hashed)
+
+
+class HashPool(BoundedProcessPool):
+    """
+    bcrypt için süreç havuzu.
+
+    bcrypt çağrı başına ~250ms CPU harcar; FastAPI'nin threadpool'unda veya
+    event loop'ta çalışınca login yığılmalarında diğer istekleri aç bırakır.
+    """
+
+    def __init__(self, workers: int = HASH_POOL_WORKERS, max_pending: int = HASH_POOL_MAX_PENDING):
+        super().__init__(workers, max_pending, retry_after=HASH_POOL_RETRY_AFTER, timeout=HASH_POOL_TIMEOUT)
+
+
+hash_pool = HashPool()
@@ -0,0 +1,183 @@
+import asyncio
+import os
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from fastapi import HTTPException, status
+from PIL import Image, ImageOps
+
+from app.services import media_store
+from app.services.media_store import StagedBlob
+from app.utils.process_pool import BoundedProcessPool
+from app.utils.uploads import SavedUpload
+
+
+# Görsel işleme (decode + resize + encode) için süreç sayısı. 0: threadpool'da yapılır.
+IMAGE_POOL_WORKERS = int(os.getenv("IMAGE_POOL_WORKERS", str(min(2, os.cpu_count() or 1))))
+IMAGE_POOL_MAX_PENDING = int(os.getenv("IMAGE_POOL_MAX_PENDING", "16"))
+IMAGE_POOL_TIMEOUT = float(os.getenv("IMAGE_POOL_TIMEOUT", "60"))
+# Türev dosyaların formatı: webp | jpeg
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "webp").lower()
+# Bundan büyük (genişlik x yükseklik) görseller açılmadan reddedilir
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(50_000_000)))
+
+# (ad, en uzun kenar, kalite). Büyükten küçüğe sıralı; her türev bir
+# öncekinden küçültülür, kaynak yalnızca bir kez decode edilir.
+VARIANTS = (
+    ("original", int(os.getenv("IMAGE_ORIGINAL_MAX_SIDE", "2560")), 85),
+    ("medium", 1280, 80),
+    ("thumb", 320, 70),
+)
+VARIANT_NAMES = tuple(name for name, _, _ in VARIANTS)
+# Feed ve listeler varsayılan olarak bu türevi döner
+DEFAULT_FEED_VARIANT = "thumb"
+
+_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+
+class ProcessedImage(NamedTuple):
+    # ad -> {url, width, height, bytes, sha256}; fotoğraf satırına yazılır
+    variants: Dict[str, dict]
+    # Henüz yayınlanmamış türev dosyaları (bkz. media_store.publishing)
+    staged: List[StagedBlob]
+
+
+def _encode_options(quality: int) -> dict:
+    if IMAGE_FORMAT == "jpeg":
+        return {"format": "JPEG", "quality": quality, "optimize": True, "progressive": True}
+    return {"format": "WEBP", "quality": quality, "method": 4}
+
+
+def _prepare(image: Image.Image) -> Image.Image:
+    """
+    EXIF yönünü piksellere uygular ve kaydedilebilir bir moda çevirir.
+    JPEG saydamlık taşımadığı için saydam görseller beyaz zemine basılır.
+    """
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    if not has_alpha:
+        return image.convert("RGB")
+    image = image.convert("RGBA")
+    if IMAGE_FORMAT != "jpeg":
+        return image
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def _save(image: Image.Image, quality: int, icc_profile: Optional[bytes]) -> StagedBlob:
+    """
+    Encode edip içerik adresli blob olarak staging'e yazar. exif verilmediği
+    için konum ve cihaz bilgileri türevlere geçmez; renk profili korunur.
+    """
+    options = _encode_options(quality)
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    return media_store.stage(lambda f: image.save(f, **options), _EXTENSIONS.get(IMAGE_FORMAT, "webp"))
+
+
+def process_image(source: str, names: Sequence[str] = VARIANT_NAMES) -> ProcessedImage:
+    """
+    Süreç havuzunda çalışır. Kaynak görselden istenen türevleri üretip
+    staging'e yazar. Görsel açılamazsa ValueError; bu durumda yazılmış
+    türevler silinir. Kaynak dosyaya dokunmaz.
+    """
+    staged: List[StagedBlob] = []
+    variants: Dict[str, dict] = {}
+    try:
+        try:
+            image = Image.open(source)
+        except (OSError, Image.DecompressionBombError) as e:
+            raise ValueError(f"Görsel açılamadı: {e}") from e
+        with image:
+            width, height = image.size
+            if width * height > IMAGE_MAX_PIXELS:
+                raise ValueError(f"Görsel çok büyük: {width}x{height}")
+            icc_profile = image.info.get("icc_profile")
+            largest = max(side for name, side, _ in VARIANTS if name in names)
+            # JPEG'de decode sırasında 1/2, 1/4, 1/8 ölçekleme; büyük fotoğraflarda
+            # tam çözünürlüklü decode'dan kaçınır
+            image.draft("RGB", (largest, largest))
+            try:
+                current = _prepare(image)
+            except OSError as e:
+                raise ValueError(f"Görsel çözülemedi: {e}") from e
+
+        for name, max_side, quality in VARIANTS:
+            if name not in names:
+                continue
+            if max(current.size) > max_side:
+                current = current.copy()
+                current.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            blob = _save(current, quality, icc_profile)
+            staged.append(blob)
+            variants[name] = {
+                "url": media_store.url_for(blob.key),
+                "width": current.width,
+                "height": current.height,
+                "bytes": blob.size,
+                "sha256": blob.sha256,
+            }
+    except BaseException:
+        media_store.discard(staged)
+        raise
+    return ProcessedImage(variants, staged)
+
+
+image_pool = BoundedProcessPool(
+    IMAGE_POOL_WORKERS,
+    IMAGE_POOL_MAX_PENDING,
+    timeout=IMAGE_POOL_TIMEOUT,
+)
+
+
+async def process_uploads(
+    uploads: List[SavedUpload],
+    names: Sequence[str] = VARIANT_NAMES,
+) -> List[ProcessedImage]:
+    """
+    Diske yazılmış yüklemelerin türevlerini süreç havuzunda paralel üretir
+    ve ham yüklemeleri siler (EXIF'li dosya diskte kalmaz). Biri görsel
+    değilse 400 döner ve bu istekte üretilen tüm türevler silinir; havuz
+    doluysa 503. Türevler staging'dedir; çağıran media_store.publishing
+    bloğunda media_store.acquire ile referansları yazıp depoya yayınlar.
+    """
+    def _discard_late(image: ProcessedImage):
+        # Timeout'tan sonra biten işin türevleri staging'de kalmasın
+        media_store.discard(image.staged)
+
+    try:
+        results = await asyncio.gather(
+            *[
+                image_pool.run_async(process_image, str(upload.path), tuple(names), on_abandoned=_discard_late)
+                for upload in uploads
+            ],
+            return_exceptions=True,
+        )
+    finally:
+        media_store.discard(uploads)
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        media_store.discard(
+            blob
+            for result in results
+            if not isinstance(result, BaseException)
+            for blob in result.staged
+        )
+        if isinstance(errors[0], ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Yüklenen dosya geçerli bir görsel değil.",
+            )
+        raise errors[0]
+    return results
+
+
+def variant_url(variants: Optional[Dict[str, dict]], name: str, fallback: Optional[str]) -> Optional[str]:
+    """
+    İstenen türevin URL'i; türev yoksa (eski kayıtlar) fallback.
+    """
+    if variants and name in variants:
+        return variants[name]["url"]
+    return fallback
+
@@ -0,0 +1,112 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Callable, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Eşzamanlı tekil çağrıları kısa bir süre biriktirip tek seferde işler.
+
+    submit() bir Future döner. Arka plandaki thread ilk iş geldiğinde en fazla
+    max_wait saniye ya da max_batch_size işe ulaşana kadar bekler, sonra
+    batch_fn(items) ile hepsini birden çalıştırır ve sonuçları sırasıyla
+    Future'lara yazar. batch_fn hata verirse batch'teki tüm Future'lar o
+    hatayla tamamlanır. Bekleyen tarafın iptal ettiği (istemci koptu, zaman
+    aşımı) Future'lar batch toplanırken ayıklanır; thread hiçbir hatada
+    durmaz.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List], Sequence],
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+        name: str = "micro-batcher",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self.name = name
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def submit(self, item) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            try:
+                self._run_once()
+            except BaseException:
+                logger.exception("%s: batch işlenemedi", self.name)
+
+    def _run_once(self):
+        # İptal edilmiş Future'lar RUNNING'e geçemez; onları batch'ten çıkar.
+        batch = [(item, future) for item, future in self._collect() if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        items = [item for item, _ in batch]
+        try:
+            results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: {len(items)} girdiye {len(results)} sonuç döndü")
+        except BaseException as e:
+            for _, future in batch:
+                _settle(future.set_exception, e)
+        else:
+            for (_, future), result in zip(batch, results):
+                _settle(future.set_result, result)
+
+        self.batches += 1
+        self.items += len(batch)
+        self.max_seen_batch = max(self.max_seen_batch, len(batch))
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else None,
+            "max_batch": self.max_seen_batch,
+            "queued": self._queue.qsize(),
+        }
+
+
+def _settle(setter, value):
+    try:
+        setter(value)
+    except InvalidStateError:
+        pass
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+
+def _late_result(callback: Callable):
+    """
+    Beklenmekten vazgeçilmiş işin sonucunu, iş başarıyla biterse callback'e verir.
+    """
+    def _done(future: Future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            callback(future.result())
+        except Exception as e:
+            print(f"⚠️ Terk edilen işin sonucu temizlenemedi: {e}")
+    return _done
+
+
+class BoundedProcessPool:
+    """
+    CPU yoğun işler için boyutu sınırlı süreç havuzu.
+
+    İşler ayrı süreçlerde çalışır, bekleyen iş sayısı max_pending ile
+    sınırlanır ve sınır dolunca istek 503 + Retry-After ile reddedilir.
+    workers=0: işler çağıran thread'de yapılır.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int = 1, timeout: float = 30):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _busy(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Sunucu şu anda yoğun. Lütfen biraz sonra tekrar deneyin.",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def _reserve(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise self._busy()
+        with self._lock:
+            self.submitted += 1
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+    def _release(self, started: float):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+            self.total_seconds += time.monotonic() - started
+        self._slots.release()
+
+    def submit(self, fn, *args) -> Future:
+        """
+        İşi havuza verir. Kuyruk doluysa 503 HTTPException fırlatır.
+        """
+        self._reserve()
+        started = time.monotonic()
+
+        if self.workers <= 0:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self._release(started)
+            return future
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release(started)
+            raise
+        future.add_done_callback(lambda _: self._release(started))
+        return future
+
+    def run(self, fn, *args, on_abandoned: Optional[Callable] = None):
+        """
+        Senkron endpoint'ler için: işi havuza verip sonucunu bekler.
+        Timeout'ta 503 döner ve süreç çalışmaya devam eder; on_abandoned
+        verilmişse iş bittiğinde sonucuyla çağrılır (ör. işin yazdığı
+        dosyaları silmek için).
+        """
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except BaseException as e:
+            if on_abandoned is not None:
+                future.add_done_callback(_late_result(on_abandoned))
+            if isinstance(e, FutureTimeoutError):
+                raise self._busy() from e
+            raise
+
+    async def run_async(self, fn, *args, on_abandoned: Optional[Callable] = None):
+        """
+        async endpoint'ler için: event loop'u bloklamadan sonucu bekler.
+        Timeout ya da iptalde on_abandoned, run() ile aynı şekilde çağrılır.
+        """
+        if self.workers <= 0:
+            return await run_in_threadpool(self.run, fn, *args)
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except BaseException as e:
+            if on_abandoned is not None:
+                future.add_done_callback(_late_result(on_abandoned))
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._busy() from e
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "peak_pending": self.peak_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_ms": round(self.total_seconds / self.completed * 1000, 2) if self.completed else None,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,10 +1,11 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 import os
 from dotenv import load_dotenv
 
+from app.utils.hash_pool import hash_pool, bcrypt_hash, bcrypt_verify
+
 
 load_dotenv()
 
@@ -14,23 +15,37 @@ ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-
-def hash_password(password: str) -> str:
-   
+def _check_password_length(password: str):
     if len(password.encode("utf-8")) > 72:
         raise HTTPException(
             status_code=400,
             detail="Şifre en fazla 72 karakter olabilir"
         )
-    return pwd_context.hash(password)
+
+
+# bcrypt işleri hash_pool üzerinde çalışır; havuz doluysa ya da iş zaman
+# aşımına uğrarsa 503 fırlatılır. Sync sürümler sync endpoint'ler içindir ve
+# bir threadpool thread'ini bekletir; sık çağrılan login/register async
+# sürümleri kullanır.
+def hash_password(password: str) -> str:
+    _check_password_length(password)
+    return hash_pool.run(bcrypt_hash, password)
 
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return hash_pool.run(bcrypt_verify, plain_password, hashed_password)
+
+
+
+async def hash_password_async(password: str) -> str:
+    _check_password_length(password)
+    return await hash_pool.run_async(bcrypt_hash, password)
+
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hash_pool.run_async(bcrypt_verify, plain_password, hashed_password)
 
 
 
@@ -0,0 +1,144 @@
+import os
+import queue
+import smtplib
+import ssl
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+# Yerel test sink'i gibi TLS desteklemeyen sunucular için false yapılabilir
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+# Bu süreden uzun boşta kalan bağlantı kullanılmadan önce NOOP ile yoklanır
+SMTP_IDLE_CHECK = float(os.getenv("SMTP_IDLE_CHECK", "30"))
+# Bu süreden uzun boşta kalan bağlantı kapatılıp yenisi açılır
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "240"))
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+
+
+def smtp_configured() -> bool:
+    """
+    SMTP sunucusu tanımlı mı? Kullanıcı/şifre verilmezse oturum açılmadan
+    gönderilir (ör. yerel sink veya relay).
+    """
+    return bool(SMTP_HOST)
+
+
+class _PooledConnection:
+    __slots__ = ("server", "last_used")
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.last_used = time.monotonic()
+
+
+class SmtpConnectionPool:
+    """
+    Açık SMTP oturumlarını (bağlantı + STARTTLS + login) tekrar kullanan
+    küçük havuz. Her mesaj için yeniden el sıkışma yapılmaz; bağlantı
+    hataya düşerse atılır ve bir sonraki kullanımda yenisi açılır.
+    """
+
+    def __init__(self, size: int = SMTP_POOL_SIZE):
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        self.opened = 0
+        self.reused = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        try:
+            server.ehlo()
+            if SMTP_STARTTLS:
+                server.starttls(context=ssl.create_default_context())
+                server.ehlo()
+            if SMTP_USER and SMTP_PASSWORD:
+                server.login(SMTP_USER, SMTP_PASSWORD)
+        except Exception:
+            _close(server)
+            raise
+        self.opened += 1
+        return server
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return _PooledConnection(self._connect())
+
+            idle = time.monotonic() - conn.last_used
+            if idle > SMTP_IDLE_TIMEOUT:
+                _close(conn.server)
+                continue
+            if idle > SMTP_IDLE_CHECK:
+                try:
+                    if conn.server.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("noop failed")
+                except Exception:
+                    _close(conn.server)
+                    continue
+            self.reused += 1
+            return conn
+
+    def _checkin(self, conn: _PooledConnection):
+        conn.last_used = time.monotonic()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            _close(conn.server)
+
+    @contextmanager
+    def connection(self):
+        """
+        Havuzdan açık bir SMTP oturumu verir. Blok içinde bağlantı seviyesinde
+        hata olursa bağlantı havuza geri konmaz.
+        """
+        conn = self._checkout()
+        try:
+            yield conn.server
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+            # Alıcı reddi gibi mesaj seviyesindeki hatalarda oturum sağlam kalır
+            try:
+                conn.server.rset()
+            except Exception:
+                _close(conn.server)
+                raise
+            self._checkin(conn)
+            raise
+        except BaseException:
+            _close(conn.server)
+            raise
+        else:
+            self._checkin(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _close(conn.server)
+
+    def stats(self) -> dict:
+        return {"idle": self._idle.qsize(), "opened": self.opened, "reused": self.reused}
+
+
+def _close(server: Optional[smtplib.SMTP]):
+    if server is None:
+        return
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
+
+
+smtp_pool = SmtpConnectionPool()
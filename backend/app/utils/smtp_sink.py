@@ -0,0 +1,144 @@
+"""
+Geliştirme ve test için yerel SMTP sink'i. Gelen mesajları teslim etmez;
+bellekte tutar ve istenirse bir klasöre .eml olarak yazar.
+
+    python -m app.utils.smtp_sink --port 1025 --dir mail_sink
+
+Uygulama tarafında: SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=false
+"""
+import argparse
+import os
+import socketserver
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+class _SmtpSinkHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode("ascii"))
+        self.wfile.flush()
+
+    def handle(self):
+        sink: "SmtpSink" = self.server.sink
+        sink.connections += 1
+        self._reply("220 cityflow-sink ESMTP")
+
+        mail_from, rcpt_to = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            verb = line.split(" ", 1)[0].upper()
+
+            if verb in ("EHLO", "HELO"):
+                if verb == "EHLO":
+                    self.wfile.write(b"250-cityflow-sink\r\n250-8BITMIME\r\n250-SMTPUTF8\r\n")
+                self._reply("250 OK")
+            elif verb == "MAIL":
+                mail_from, rcpt_to = line[10:].split(" ", 1)[0].strip("<>"), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                address = line[8:].split(" ", 1)[0].strip("<>")
+                if sink.reject and address in sink.reject:
+                    self._reply("550 No such user")
+                    continue
+                rcpt_to.append(address)
+                self._reply("250 OK")
+            elif verb == "DATA":
+                if not rcpt_to:
+                    self._reply("503 Need RCPT")
+                    continue
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = bytearray()
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    if chunk.startswith(b".."):
+                        chunk = chunk[1:]
+                    data += chunk
+                sink._store(mail_from, list(rcpt_to), bytes(data))
+                mail_from, rcpt_to = None, []
+                self._reply("250 OK queued")
+            elif verb == "RSET":
+                mail_from, rcpt_to = None, []
+                self._reply("250 OK")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SmtpSink:
+    """
+    Testlerde kullanılacak arka plan SMTP sunucusu.
+
+        sink = SmtpSink(port=0).start()   # port=0: boş port seçilir
+        ...
+        sink.messages  ->  [(mail_from, [rcpt], raw_bytes), ...]
+        sink.stop()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, directory: Optional[str] = None, reject=None):
+        self.host = host
+        self.port = port
+        self.directory = directory
+        self.reject = set(reject or [])
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server: Optional[_ThreadingServer] = None
+
+    def _store(self, mail_from: str, rcpt_to: List[str], data: bytes):
+        with self._lock:
+            self.messages.append((mail_from, rcpt_to, data))
+            index = len(self.messages)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{int(time.time() * 1000)}_{index}.eml")
+            with open(path, "wb") as f:
+                f.write(data)
+        print(f"📥 SINK: {mail_from} → {', '.join(rcpt_to)} ({len(data)} bytes)")
+
+    def start(self) -> "SmtpSink":
+        self._server = _ThreadingServer((self.host, self.port), _SmtpSinkHandler)
+        self._server.sink = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel SMTP sink")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--dir", default=None, help="Mesajların .eml olarak yazılacağı klasör")
+    args = parser.parse_args()
+
+    sink = SmtpSink(args.host, args.port, args.dir).start()
+    print(f"SMTP sink dinleniyor: {sink.host}:{sink.port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        sink.stop()
+
+
+if __name__ == "__main__":
+    main()
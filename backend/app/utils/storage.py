@@ -0,0 +1,215 @@
+import os
+import stat as stat_module
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+
+# local: dosyalar MEDIA_ROOT altında; s3: S3 uyumlu bucket (AWS, MinIO, ...)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+MEDIA_ROOT = "media"
+
+S3_BUCKET = os.getenv("S3_BUCKET", "urbanlife-media")
+# Boş: AWS. MinIO için ör. http://minio:9000
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+# İstemcilere verilen imzalı URL'lerin host'u (imza host'u da kapsar);
+# boşsa S3_ENDPOINT_URL kullanılır
+S3_PUBLIC_ENDPOINT_URL = os.getenv("S3_PUBLIC_ENDPOINT_URL") or None
+S3_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID") or None
+S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY") or None
+S3_PREFIX = os.getenv("S3_PREFIX", "").strip("/")
+# İmzalı URL süresi (saniye); 0: yönlendirme yok, dosyalar uygulama üzerinden
+S3_PRESIGN_EXPIRES = int(os.getenv("S3_PRESIGN_EXPIRES", "3600"))
+
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+class StoredObject(NamedTuple):
+    size: int
+    content_type: Optional[str]
+    last_modified: Optional[datetime]
+    etag: Optional[str]
+
+
+class LocalStorage:
+    """
+    Dosyaları tek bir dizin altında tutar. Tek makinelik kurulumlar ve
+    geliştirme içindir; birden fazla API kopyası ancak ortak volume ile
+    aynı dosyaları görür.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str = MEDIA_ROOT):
+        self.root = Path(root)
+        self._resolved_root = self.root.resolve()
+
+    def local_path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self._resolved_root) or path == self._resolved_root:
+            raise ValueError(f"Geçersiz anahtar: {key}")
+        return path
+
+    def put(self, key: str, source: str, content_type: Optional[str] = None, cache_control: Optional[str] = None):
+        """
+        Yerel dosyayı anahtarın yerine taşır (aynı dosya sistemindeyse
+        kopyalamadan). Kaynak dosya artık kullanılmaz. Başlıklar servis
+        sırasında belirlenir (bkz. media_routes).
+        """
+        target = self.local_path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            st = self.local_path(key).stat()
+        except (OSError, ValueError):
+            return None
+        if not stat_module.S_ISREG(st.st_mode):
+            return None
+        return StoredObject(
+            st.st_size,
+            None,
+            datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+            None,
+        )
+
+    def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        [start, end] (end dahil) bayt aralığını parça parça okur.
+        """
+        with open(self.local_path(key), "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(STREAM_CHUNK_SIZE if remaining is None else min(STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.local_path(key))
+        except (OSError, ValueError):
+            pass
+
+    def presigned_url(self, key: str, expires: int = S3_PRESIGN_EXPIRES) -> Optional[str]:
+        # Yerel dosyalar uygulama üzerinden servis edilir
+        return None
+
+
+class S3Storage:
+    """
+    S3 uyumlu nesne deposu. Bütün API kopyaları aynı bucket'ı kullandığı
+    için medya ortak volume/NFS olmadan paylaşılır. boto3 sadece bu sürücü
+    seçildiğinde gerekir.
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str = S3_BUCKET,
+        endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+        public_endpoint_url: Optional[str] = S3_PUBLIC_ENDPOINT_URL,
+        region: str = S3_REGION,
+        access_key_id: Optional[str] = S3_ACCESS_KEY_ID,
+        secret_access_key: Optional[str] = S3_SECRET_ACCESS_KEY,
+        prefix: str = S3_PREFIX,
+    ):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 için boto3 kurulu olmalı (pip install boto3).") from e
+
+        self.bucket = bucket
+        self.prefix = prefix
+        options = dict(
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            # MinIO gibi sunucular bucket'ı host'ta değil path'te bekler
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        )
+        self._client = boto3.client("s3", endpoint_url=endpoint_url, **options)
+        self._presign_client = (
+            boto3.client("s3", endpoint_url=public_endpoint_url, **options)
+            if public_endpoint_url
+            else self._client
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key: str, source: str, content_type: Optional[str] = None, cache_control: Optional[str] = None):
+        """
+        Yerel dosyayı yükler (büyük dosyalar multipart) ve siler. Başlıklar
+        nesneye yazılır; imzalı URL'den okuyan istemci de onları alır.
+        """
+        extra = {}
+        if content_type:
+            extra["ContentType"] = content_type
+        if cache_control:
+            extra["CacheControl"] = cache_control
+        self._client.upload_file(source, self.bucket, self._key(key), ExtraArgs=extra)
+        try:
+            os.remove(source)
+        except OSError:
+            pass
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self._client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return StoredObject(
+            head["ContentLength"],
+            head.get("ContentType"),
+            head.get("LastModified"),
+            (head.get("ETag") or "").strip('"') or None,
+        )
+
+    def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+        body = self._client.get_object(**params)["Body"]
+        try:
+            yield from body.iter_chunks(STREAM_CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def delete(self, key: str):
+        self._client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def presigned_url(self, key: str, expires: int = S3_PRESIGN_EXPIRES) -> Optional[str]:
+        if expires <= 0:
+            # Bucket istemcilere açık değil; dosyalar uygulama üzerinden akıtılır
+            return None
+        return self._presign_client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._key(key)},
+            ExpiresIn=expires,
+        )
+
+
+def create_storage(backend: str = STORAGE_BACKEND):
+    if backend == "local":
+        return LocalStorage()
+    if backend == "s3":
+        return S3Storage()
+    raise RuntimeError(f"Bilinmeyen STORAGE_BACKEND: {backend}")
+
+
+storage = create_storage()
+# Depo S3 olsa da içerik adresli olmayan eski dosyalar (complaints/,
+# solutions/, avatars/) yerel diskte kalır
+local_storage = storage if isinstance(storage, LocalStorage) else LocalStorage()
@@ -0,0 +1,34 @@
+import re
+import unicodedata
+
+
+# Python'un lower()'ı Türkçe için yanlış: "I" -> "i" (doğrusu "ı"),
+# "İ" -> "i" + birleşik nokta (U+0307).
+_TR_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def turkish_lower(text: str) -> str:
+    return text.translate(_TR_UPPER).lower()
+
+
+def normalize_complaint_text(text: str) -> str:
+    """
+    Şikayet metnini sınıflandırma ve önbellek için tek biçime getirir:
+
+    - NFKC: birleşik/ayrık yazılmış harfler ("s" + U+0327 ile "ş") ve
+      uyumluluk karakterleri (tam genişlikli harfler vb.) aynı hale gelir
+    - Türkçe kurallarıyla küçük harf (I -> ı, İ -> i)
+    - kalan birleşik işaretler (ör. "i̇"deki fazladan nokta) atılır
+    - boşluklar tek boşluğa indirilir, baş/son boşluk kırpılır
+
+    ç, ğ, ı, ö, ş, ü ASCII karşılıklarına çevrilmez; sınıflandırıcı bu
+    harfleri ayrı kelimeler olarak öğreniyor.
+    """
+    if not text:
+        return ""
+    text = turkish_lower(unicodedata.normalize("NFKC", text))
+    if not text.isascii():
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+        text = unicodedata.normalize("NFC", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
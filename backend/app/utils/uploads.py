@@ -0,0 +1,165 @@
+import os
+import secrets
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+
+# Dosya başına ve istek başına (tüm dosyaların toplamı) bayt sınırları
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(40 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 256 * 1024
+# multipart sınırları ve part header'ları için istek gövdesine tanınan pay
+_MULTIPART_OVERHEAD = 64 * 1024
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".heic"}
+
+
+class SavedUpload(NamedTuple):
+    path: Path
+    filename: str
+    size: int
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+def _file_too_large() -> HTTPException:
+    return _too_large(f"Dosya boyutu en fazla {UPLOAD_MAX_FILE_BYTES // (1024 * 1024)} MB olabilir.")
+
+
+def _request_too_large() -> HTTPException:
+    return _too_large(f"Tek seferde en fazla {UPLOAD_MAX_REQUEST_BYTES // (1024 * 1024)} MB yüklenebilir.")
+
+
+def upload_name(prefix: str, original: Optional[str], allowed_extensions: Iterable[str] = IMAGE_EXTENSIONS) -> str:
+    """
+    Diske yazılacak dosya adı. İstemcinin verdiği addan sadece (izinliyse)
+    uzantı alınır; aynı saniyede gelen yüklemeler çakışmasın diye rastgele
+    ek konur.
+    """
+    ext = os.path.splitext(original or "")[1].lower()
+    if ext not in allowed_extensions:
+        ext = ".jpg"
+    return f"{prefix}_{int(time.time())}_{secrets.token_hex(4)}{ext}"
+
+
+def _copy_to(source, directory: Path, filename: str, max_bytes: int, on_too_large) -> SavedUpload:
+    """
+    Blocking kısım; threadpool'da çalışır. Kaynağı sabit boyutlu parçalarla
+    aynı dizindeki geçici dosyaya yazar ve tamamlanınca atomik olarak
+    yerine taşır. Yarım dosya hiçbir zaman son adıyla görünmez.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            source.seek(0)
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise on_too_large()
+                out.write(chunk)
+        final_path = directory / filename
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return SavedUpload(final_path, filename, size)
+
+
+def _remove_quietly(paths: Iterable[Path]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+async def save_uploads(files: List[UploadFile], directory: Path, prefix: str) -> List[SavedUpload]:
+    """
+    İstekteki dosyaları diske yazar; dosya ve istek boyut sınırlarını
+    yazarken uygular (413). Dosya kopyalama event loop dışında yapılır.
+    Bir dosya başarısız olursa bu istekte yazılmış diğerleri de silinir,
+    böylece DB'ye yazmadan önce ya hepsi ya hiçbiri diskte olur.
+    """
+    saved: List[SavedUpload] = []
+    remaining = UPLOAD_MAX_REQUEST_BYTES
+    try:
+        for upload in files:
+            if remaining >= UPLOAD_MAX_FILE_BYTES:
+                max_bytes, on_too_large = UPLOAD_MAX_FILE_BYTES, _file_too_large
+            else:
+                max_bytes, on_too_large = remaining, _request_too_large
+            result = await run_in_threadpool(
+                _copy_to,
+                upload.file,
+                directory,
+                upload_name(prefix, upload.filename),
+                max_bytes,
+                on_too_large,
+            )
+            saved.append(result)
+            remaining -= result.size
+    except BaseException:
+        await run_in_threadpool(_remove_quietly, [s.path for s in saved])
+        raise
+    finally:
+        for upload in files:
+            await upload.close()
+    return saved
+
+
+async def save_upload(upload: UploadFile, directory: Path, prefix: str) -> SavedUpload:
+    return (await save_uploads([upload], directory, prefix))[0]
+
+
+class UploadSizeLimitMiddleware:
+    """
+    multipart istek gövdesini ağdan okunurken sayar; sınır aşılınca gövdenin
+    geri kalanı okunmadan 413 döner. Starlette dosya part'larını 1 MB'tan
+    sonra diske taşıdığı için ayrıştırma sırasında bellek de sabit kalır.
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_REQUEST_BYTES + _MULTIPART_OVERHEAD):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            error = _request_too_large()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Route'un body ayrıştırması HTTPException'ı olduğu gibi iletir
+                    raise _request_too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
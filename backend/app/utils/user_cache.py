@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.user_model import User, UserRole
+from app.utils.security import ACCESS_TOKEN_EXPIRE_MINUTES
+
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+# Diğer worker'larda yapılan token iptallerinin en geç kaç saniyede görüleceği
+TOKEN_REVOCATION_SYNC_INTERVAL = float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", "5"))
+# token_revoked_at commit'ten önce yazılır; senkron penceresi bu kadar geriden
+# başlar. İptal eden en uzun transaction süresinden (ve saat kaymasından) büyük olmalı.
+TOKEN_REVOCATION_SYNC_OVERLAP = float(os.getenv("TOKEN_REVOCATION_SYNC_OVERLAP", "300"))
+
+
+class UserPrincipal:
+    """
+    Kimliği doğrulanmış kullanıcının yetki kontrolleri için gereken hafif
+    görüntüsü. ORM nesnesi değildir; session'a bağlı değildir ve değiştirilmez.
+    """
+    __slots__ = ("id", "name", "email", "role", "is_active", "is_verified", "token_version")
+
+    def __init__(
+        self,
+        id: int,
+        name: Optional[str],
+        email: Optional[str],
+        role: UserRole,
+        is_active: bool,
+        is_verified: bool,
+        token_version: int = 0,
+    ):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.role = role
+        self.is_active = is_active
+        self.is_verified = is_verified
+        self.token_version = token_version
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            token_version=user.token_version or 0,
+        )
+
+    @classmethod
+    def from_claims(cls, user_id: int, role: UserRole, token_version: int) -> "UserPrincipal":
+        """
+        Yalnızca JWT claim'lerinden kurulan principal. name/email bilinmez;
+        sadece id ve role ihtiyaç duyan (role_required) endpoint'ler içindir.
+        """
+        return cls(
+            id=user_id,
+            name=None,
+            email=None,
+            role=role,
+            is_active=True,
+            is_verified=True,
+            token_version=token_version,
+        )
+
+    @property
+    def full_name(self):
+        return self.name
+
+
+class PrincipalCache:
+    """
+    Süreç içi LRU + TTL önbellek: user_id -> UserPrincipal.
+    Kullanıcıyı değiştiren her işlem invalidate() çağırmalıdır; diğer
+    worker'lardaki kopyalar en geç TTL sonunda tazelenir.
+    """
+
+    def __init__(self, maxsize: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[UserPrincipal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, principal: UserPrincipal):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class TokenRevocations:
+    """
+    Token'ları iptal edilmiş kullanıcıların süreç içi listesi:
+    user_id -> geçerli en küçük token_version.
+
+    Bu süreçte yapılan iptaller note() ile hemen işlenir; diğer süreçlerdeki
+    iptaller refresh() ile en fazla TOKEN_REVOCATION_SYNC_INTERVAL saniyede
+    bir, yalnızca son senkrondan beri iptal edilen kullanıcıları okuyan tek
+    sorguyla çekilir. Token ömrünü aşan kayıtlar atılır.
+    """
+
+    def __init__(
+        self,
+        sync_interval: float = TOKEN_REVOCATION_SYNC_INTERVAL,
+        sync_overlap: float = TOKEN_REVOCATION_SYNC_OVERLAP,
+    ):
+        self.sync_interval = sync_interval
+        self.sync_overlap = timedelta(seconds=sync_overlap)
+        self.retention = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        self._min_versions = {}
+        self._lock = threading.Lock()
+        self._synced_at: Optional[datetime] = None
+        self._next_sync = 0.0
+
+    def note(self, user_id: int, token_version: int, revoked_at: Optional[datetime] = None):
+        with self._lock:
+            self._note(user_id, token_version, revoked_at or datetime.utcnow())
+
+    def _note(self, user_id: int, token_version: int, revoked_at: datetime):
+        current = self._min_versions.get(user_id)
+        if current is None or current[0] < token_version:
+            self._min_versions[user_id] = (token_version, revoked_at)
+
+    def is_revoked(self, user_id: int, token_version: int) -> bool:
+        entry = self._min_versions.get(user_id)
+        return entry is not None and token_version < entry[0]
+
+    def refresh(self, db: Session):
+        if time.monotonic() < self._next_sync:
+            return
+        with self._lock:
+            if time.monotonic() < self._next_sync:
+                return
+            now = datetime.utcnow()
+            # İlk senkronda hâlâ geçerli olabilecek tüm token'ların iptalleri okunur.
+            # Sonrakilerde pencere sync_overlap kadar geriden başlar: token_revoked_at
+            # commit'ten önce atanır, geç commit edilen iptal önceki senkronda
+            # görünmemiş olabilir. Tekrar okunan satırlar zararsızdır.
+            since = (now - self.retention) if self._synced_at is None else (self._synced_at - self.sync_overlap)
+            rows = (
+                db.query(User.id, User.token_version, User.token_revoked_at)
+                .filter(User.token_revoked_at >= since)
+                .all()
+            )
+            for user_id, token_version, revoked_at in rows:
+                self._note(user_id, token_version or 0, revoked_at)
+
+            cutoff = now - self.retention
+            for user_id in [k for k, v in self._min_versions.items() if v[1] < cutoff]:
+                del self._min_versions[user_id]
+
+            self._synced_at = now
+            self._next_sync = time.monotonic() + self.sync_interval
+
+    def clear(self):
+        with self._lock:
+            self._min_versions.clear()
+            self._synced_at = None
+            self._next_sync = 0.0
+
+
+principal_cache = PrincipalCache()
+token_revocations = TokenRevocations()
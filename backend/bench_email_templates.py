@@ -0,0 +1,69 @@
+"""
+E-posta oluşturma mikro benchmark'ı: mesaj başına eski yöntem (her çağrıda
+EmailMessage + set_content + add_alternative + as_string) ile derlenmiş
+şablonların render() maliyetini karşılaştırır.
+
+    python bench_email_templates.py [--n 5000]
+"""
+import argparse
+import html
+import time
+from email.message import EmailMessage
+
+from app.utils import email_templates
+import app.utils.email_service  # noqa: F401  (şablonları kaydeder)
+
+
+SAMPLES = {
+    "verification": {"verification_link": "http://localhost:8000/auth/verify-email?token=AbCdEf0123456789"},
+    "password_reset": {"reset_link": "http://localhost:8000/auth/open-app?token=AbCdEf0123456789"},
+    "email_change_code": {"code": "482913"},
+    "supporter_notification": {
+        "recipient_name": "Ayşe Yılmaz",
+        "complaint_title": "Kaldırımdaki çukur",
+        "note_text": "\nYetkili notu: Yol asfaltlandı.\n",
+        "note_html": "<p>Yol asfaltlandı.</p>",
+    },
+}
+
+
+def legacy_build(template, to_email: str, values: dict) -> str:
+    # Önceki email_service davranışı: her mesaj için tam MIME ağacı kurulur
+    def fill(source, escape):
+        def replace(match):
+            raw_name, name = match.group(1), match.group(2)
+            value = str(values[raw_name or name])
+            return html.escape(value) if (escape and name) else value
+        return email_templates._FIELD_RE.sub(replace, source)
+
+    msg = EmailMessage()
+    msg["Subject"] = template.subject
+    msg["From"] = template.from_addr
+    msg["To"] = to_email
+    msg.set_content(fill(template.text, False))
+    msg.add_alternative(fill(template.html_body, True), subtype="html")
+    return msg.as_string()
+
+
+def measure(fn, n: int) -> float:
+    started = time.perf_counter()
+    for i in range(n):
+        fn(f"user{i}@example.com")
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'şablon':<24}{'önce (µs)':>12}{'sonra (µs)':>12}{'hızlanma':>10}")
+    for name, values in SAMPLES.items():
+        template = email_templates.get(name)
+        before = measure(lambda to: legacy_build(template, to, values), args.n)
+        after = measure(lambda to: template.render(to, **values), args.n)
+        print(f"{name:<24}{before:>12.1f}{after:>12.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Türevleri (thumb/medium/original) olmayan eski şikayet ve çözüm
+fotoğrafları için türev üretir. Kayıtlar id sırasıyla parça parça okunur,
+görseller süreç havuzunda paralel işlenir ve türevler içerik adresli
+blob olarak (media/blobs/) saklanır. photo_url ve kaynak dosya değişmez
+(eski istemciler ve assignments.solution_photo_url aynı dosyayı gösterir);
+feed küçük resmi variants'tan alır.
+
+Tekrar çalıştırılırsa sadece variants'ı hâlâ boş olanlar işlenir.
+
+Kullanım:
+    python generate_image_variants.py
+    python generate_image_variants.py --chunk-size 200 --workers 4
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.utils.db import SessionLocal
+from app.utils.images import IMAGE_POOL_WORKERS, process_image
+from app.services import media_store
+from app.services.media_store import MEDIA_ROOT
+from app.models.complaint_photo_model import ComplaintPhoto
+from app.models.complaint_resolution_photo_model import ComplaintResolutionPhoto
+
+
+def _source(photo):
+    """Fotoğrafın diskteki dosyası; /media/ dışındaki ya da kayıp dosyalar için None."""
+    if not photo.photo_url or not photo.photo_url.startswith("/media/"):
+        return None
+    source = MEDIA_ROOT / photo.photo_url[len("/media/"):]
+    return str(source) if source.is_file() else None
+
+
+def backfill(db, executor, model, chunk_size: int) -> dict:
+    processed = failed = skipped = 0
+    last_id = 0
+    while True:
+        photos = (
+            db.query(model)
+            .filter(model.id > last_id, model.variants.is_(None))
+            .order_by(model.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not photos:
+            break
+        last_id = photos[-1].id
+
+        sources = [(photo, _source(photo)) for photo in photos]
+        futures = [(photo, executor.submit(process_image, source)) for photo, source in sources if source]
+        skipped += sum(1 for _, source in sources if not source)
+        staged = []
+        for photo, future in futures:
+            try:
+                image = future.result()
+            except ValueError as e:
+                failed += 1
+                print(f"  ⚠️ {model.__tablename__} #{photo.id}: {e}")
+                continue
+            photo.variants = image.variants
+            staged.extend(image.staged)
+            processed += 1
+        with media_store.publishing(db, staged) as batch:
+            media_store.acquire(db, batch)
+            db.commit()
+        print(f"  {model.__tablename__}: {processed} işlendi, {failed} hatalı, {skipped} atlandı (son id {last_id})")
+    return {"processed": processed, "failed": failed, "skipped": skipped}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eski fotoğraflar için küçük resim ve web türevleri üretir.")
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=max(1, IMAGE_POOL_WORKERS))
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            for model in (ComplaintPhoto, ComplaintResolutionPhoto):
+                result = backfill(db, executor, model, args.chunk_size)
+                print(
+                    f" {model.__tablename__}: {result['processed']} fotoğraf işlendi, "
+                    f"{result['failed']} hatalı, {result['skipped']} atlandı"
+                )
+    finally:
+        db.close()
+    print(f" Tamamlandı ({time.monotonic() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,13 @@ from app.models import (
     complaint_photo_model,
     audit_log_model,
     worker,
+    complaint_cluster_model,
+    stats_counter_model,
+    analytics_rollup_model,
+    job_checkpoint_model,
+    outbound_email_model,
+    bulk_email_job_model,
+    media_blob_model,
 )
 
 
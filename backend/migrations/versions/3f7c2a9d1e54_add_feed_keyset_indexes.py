@@ -0,0 +1,36 @@
+"""add feed keyset indexes
+
+Revision ID: 3f7c2a9d1e54
+Revises: e0fdfd4e9c9a
+Create Date: 2026-10-18 09:12:41.203517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7c2a9d1e54'
+down_revision: Union[str, Sequence[str], None] = 'e0fdfd4e9c9a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_complaints_created_at_id",
+        "complaints",
+        ["created_at", "id"],
+    )
+    op.create_index(
+        "ix_complaints_support_count_created_at_id",
+        "complaints",
+        ["support_count", "created_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_complaints_support_count_created_at_id", table_name="complaints")
+    op.drop_index("ix_complaints_created_at_id", table_name="complaints")
@@ -0,0 +1,44 @@
+"""create stats_counters
+
+Revision ID: 5a9e3c71b6d2
+Revises: c21f9a7e5d38
+Create Date: 2026-10-18 12:41:55.072913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9e3c71b6d2'
+down_revision: Union[str, Sequence[str], None] = 'c21f9a7e5d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "stats_counters",
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("status", "category_id", "day"),
+    )
+
+    # Mevcut şikayetlerden ilk değerleri doldur. created_at'i olmayan eski
+    # satırlar, uygulamadaki gibi (aggregate_service.snapshot_from_row) bugüne sayılır.
+    op.execute(
+        """
+        INSERT INTO stats_counters (status, category_id, day, count)
+        SELECT CAST(status AS VARCHAR), COALESCE(category_id, 0), COALESCE(CAST(created_at AS DATE), CURRENT_DATE), COUNT(*)
+        FROM complaints
+        GROUP BY CAST(status AS VARCHAR), COALESCE(category_id, 0), COALESCE(CAST(created_at AS DATE), CURRENT_DATE)
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("stats_counters")
@@ -0,0 +1,36 @@
+"""add user token_version
+
+Revision ID: 6c0b9e4d2a13
+Revises: d84b0f2c9e61
+Create Date: 2026-10-18 14:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c0b9e4d2a13'
+down_revision: Union[str, Sequence[str], None] = 'd84b0f2c9e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "users",
+        sa.Column("token_revoked_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_token_revoked_at", "users", ["token_revoked_at"])
+
+
+def downgrade():
+    op.drop_index("ix_users_token_revoked_at", table_name="users")
+    op.drop_column("users", "token_revoked_at")
+    op.drop_column("users", "token_version")
@@ -0,0 +1,47 @@
+"""add complaint geo_cell
+
+Revision ID: 8b1d4e6f2a07
+Revises: 3f7c2a9d1e54
+Create Date: 2026-10-18 10:03:17.551820
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.geo import geohash_encode
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1d4e6f2a07'
+down_revision: Union[str, Sequence[str], None] = '3f7c2a9d1e54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column(
+        "complaints",
+        sa.Column("geo_cell", sa.String(12, collation="C"), nullable=True),
+    )
+    op.create_index("ix_complaints_geo_cell", "complaints", ["geo_cell"])
+
+    # Mevcut konumlu şikayetleri doldur
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(
+            "SELECT id, latitude, longitude FROM complaints "
+            "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        )
+    ).fetchall()
+    if rows:
+        conn.execute(
+            sa.text("UPDATE complaints SET geo_cell = :cell WHERE id = :id"),
+            [{"id": r.id, "cell": geohash_encode(r.latitude, r.longitude)} for r in rows],
+        )
+
+
+def downgrade():
+    op.drop_index("ix_complaints_geo_cell", table_name="complaints")
+    op.drop_column("complaints", "geo_cell")
@@ -0,0 +1,61 @@
+"""create bulk_email_jobs
+
+Revision ID: a7e3c5b90d14
+Revises: f2a6d81c4b70
+Create Date: 2026-10-18 15:20:03.664182
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c5b90d14'
+down_revision: Union[str, Sequence[str], None] = 'f2a6d81c4b70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "bulk_email_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("complaint_id", sa.Integer(), sa.ForeignKey("complaints.id"), nullable=False),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("note", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(16), nullable=False, server_default="queued"),
+        sa.Column("total_recipients", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_support_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("expanded_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_bulk_email_jobs_id", "bulk_email_jobs", ["id"])
+    op.create_index("ix_bulk_email_jobs_complaint_id", "bulk_email_jobs", ["complaint_id"])
+
+    op.add_column(
+        "outbound_emails",
+        sa.Column("bulk_job_id", sa.Integer(), sa.ForeignKey("bulk_email_jobs.id"), nullable=True),
+    )
+    op.add_column(
+        "outbound_emails",
+        sa.Column("recipient_user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+    )
+    op.create_index("ix_outbound_emails_bulk_job_id", "outbound_emails", ["bulk_job_id"])
+
+    op.create_index(
+        "ix_complaint_supports_complaint_id_id",
+        "complaint_supports",
+        ["complaint_id", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_complaint_supports_complaint_id_id", table_name="complaint_supports")
+    op.drop_index("ix_outbound_emails_bulk_job_id", table_name="outbound_emails")
+    op.drop_column("outbound_emails", "recipient_user_id")
+    op.drop_column("outbound_emails", "bulk_job_id")
+    op.drop_index("ix_bulk_email_jobs_complaint_id", table_name="bulk_email_jobs")
+    op.drop_index("ix_bulk_email_jobs_id", table_name="bulk_email_jobs")
+    op.drop_table("bulk_email_jobs")
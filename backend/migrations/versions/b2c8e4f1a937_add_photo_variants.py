@@ -0,0 +1,29 @@
+"""add photo variants
+
+Revision ID: b2c8e4f1a937
+Revises: a7e3c5b90d14
+Create Date: 2026-10-18 16:42:11.208417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2c8e4f1a937'
+down_revision: Union[str, Sequence[str], None] = 'a7e3c5b90d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Mevcut fotoğraflar NULL kalır; generate_image_variants.py ile doldurulur
+    op.add_column("complaint_photos", sa.Column("variants", sa.JSON(), nullable=True))
+    op.add_column("complaint_resolution_photos", sa.Column("variants", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("complaint_resolution_photos", "variants")
+    op.drop_column("complaint_photos", "variants")
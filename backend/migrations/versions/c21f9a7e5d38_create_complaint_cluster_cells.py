@@ -0,0 +1,38 @@
+"""create complaint_cluster_cells
+
+Revision ID: c21f9a7e5d38
+Revises: 8b1d4e6f2a07
+Create Date: 2026-10-18 11:26:09.318442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c21f9a7e5d38'
+down_revision: Union[str, Sequence[str], None] = '8b1d4e6f2a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "complaint_cluster_cells",
+        sa.Column("zoom", sa.Integer(), nullable=False),
+        sa.Column("cell_x", sa.Integer(), nullable=False),
+        sa.Column("cell_y", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("lat_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("lon_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("zoom", "cell_x", "cell_y", "status", "category_id"),
+    )
+    # Tablo rebuild_aggregates.py ile mevcut şikayetlerden doldurulur.
+
+
+def downgrade():
+    op.drop_table("complaint_cluster_cells")
@@ -0,0 +1,35 @@
+"""create media_blobs
+
+Revision ID: c7d2a91e4b58
+Revises: b2c8e4f1a937
+Create Date: 2026-10-18 18:05:46.917302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2a91e4b58'
+down_revision: Union[str, Sequence[str], None] = 'b2c8e4f1a937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Mevcut dosyalar yerinde kalır; yeni yüklemeler blobs/ altına yazılır
+    op.create_table(
+        "media_blobs",
+        sa.Column("sha256", sa.String(64), primary_key=True),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("content_type", sa.String(64), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table("media_blobs")
@@ -0,0 +1,53 @@
+"""create analytics rollups and job checkpoints
+
+Revision ID: d84b0f2c9e61
+Revises: 5a9e3c71b6d2
+Create Date: 2026-10-18 13:58:30.614207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd84b0f2c9e61'
+down_revision: Union[str, Sequence[str], None] = '5a9e3c71b6d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "complaint_daily_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("area", sa.String(5), nullable=False),
+        sa.Column("opened", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("resolved", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rejected", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("day", "category_id", "area"),
+    )
+    op.create_table(
+        "resolution_time_buckets",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("area", sa.String(5), nullable=False),
+        sa.Column("bucket", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("day", "category_id", "area", "bucket"),
+    )
+    op.create_table(
+        "job_checkpoints",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("value", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+    )
+    # Rollup'lar ilk kez `python run_analytics_rollup.py --full` ile doldurulur.
+
+
+def downgrade():
+    op.drop_table("job_checkpoints")
+    op.drop_table("resolution_time_buckets")
+    op.drop_table("complaint_daily_rollups")
@@ -0,0 +1,56 @@
+"""add complaint resolved_at / rejected_at and analytics dirty days
+
+Revision ID: e3b7f0a2c916
+Revises: c7d2a91e4b58
+Create Date: 2026-10-18 19:24:11.508213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7f0a2c916'
+down_revision: Union[str, Sequence[str], None] = 'c7d2a91e4b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column("complaints", sa.Column("resolved_at", sa.DateTime(), nullable=True))
+    op.add_column("complaints", sa.Column("rejected_at", sa.DateTime(), nullable=True))
+
+    # Eski kayıtlar: çözülme anı son tamamlanan görevin bitişi (görevsiz
+    # çözülenlerde son güncelleme), red anı son güncelleme
+    op.execute(
+        """
+        UPDATE complaints SET resolved_at = COALESCE(
+            (SELECT MAX(a.end_time) FROM assignments a
+             WHERE a.complaint_id = complaints.id AND a.status = 'completed'),
+            updated_at
+        )
+        WHERE status = 'resolved'
+        """
+    )
+    op.execute("UPDATE complaints SET rejected_at = updated_at WHERE status = 'rejected'")
+
+    op.create_index("ix_complaints_resolved_at", "complaints", ["resolved_at"])
+    op.create_index("ix_complaints_rejected_at", "complaints", ["rejected_at"])
+
+    op.create_table(
+        "analytics_dirty_days",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("changes", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Sayımlar değiştiği için rollup'lar `python run_analytics_rollup.py --full`
+    # ile yeniden üretilmelidir.
+
+
+def downgrade():
+    op.drop_table("analytics_dirty_days")
+    op.drop_index("ix_complaints_rejected_at", table_name="complaints")
+    op.drop_index("ix_complaints_resolved_at", table_name="complaints")
+    op.drop_column("complaints", "rejected_at")
+    op.drop_column("complaints", "resolved_at")
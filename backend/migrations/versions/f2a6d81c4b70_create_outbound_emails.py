@@ -0,0 +1,46 @@
+"""create outbound_emails
+
+Revision ID: f2a6d81c4b70
+Revises: 6c0b9e4d2a13
+Create Date: 2026-10-18 14:38:40.127755
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6d81c4b70'
+down_revision: Union[str, Sequence[str], None] = '6c0b9e4d2a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "outbound_emails",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("to_email", sa.String(), nullable=False),
+        sa.Column("subject", sa.String(), nullable=True),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_outbound_emails_id", "outbound_emails", ["id"])
+    op.create_index(
+        "ix_outbound_emails_status_next_attempt_at",
+        "outbound_emails",
+        ["status", "next_attempt_at"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_outbound_emails_status_next_attempt_at", table_name="outbound_emails")
+    op.drop_index("ix_outbound_emails_id", table_name="outbound_emails")
+    op.drop_table("outbound_emails")
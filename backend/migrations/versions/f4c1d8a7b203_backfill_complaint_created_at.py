@@ -0,0 +1,53 @@
+"""backfill NULL complaint created_at and rebuild stats_counters
+
+Revision ID: f4c1d8a7b203
+Revises: e3b7f0a2c916
+Create Date: 2026-10-18 21:07:42.316590
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c1d8a7b203'
+down_revision: Union[str, Sequence[str], None] = 'e3b7f0a2c916'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # created_at'i olmayan eski şikayetler, her değişiklikte başka bir güne
+    # sayılmasın diye son güncellemelerine (o da yoksa bugüne) sabitlenir.
+    # Rollup'ta henüz sayılmadıkları günler önce kirli işaretlenir.
+    op.execute(
+        """
+        INSERT INTO analytics_dirty_days (day, changes)
+        SELECT d.day, d.changes FROM (
+            SELECT CAST(COALESCE(updated_at, CURRENT_TIMESTAMP) AS DATE) AS day, COUNT(*) AS changes
+            FROM complaints
+            WHERE created_at IS NULL
+            GROUP BY CAST(COALESCE(updated_at, CURRENT_TIMESTAMP) AS DATE)
+        ) d
+        WHERE NOT EXISTS (SELECT 1 FROM analytics_dirty_days x WHERE x.day = d.day)
+        """
+    )
+    op.execute("UPDATE complaints SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL")
+
+    # Bu satırlar sayaçlarda migration gününe sayılmıştı; günleri değiştiği
+    # için sayaçlar baştan üretilir.
+    op.execute("DELETE FROM stats_counters")
+    op.execute(
+        """
+        INSERT INTO stats_counters (status, category_id, day, count)
+        SELECT CAST(status AS VARCHAR), COALESCE(category_id, 0), CAST(created_at AS DATE), COUNT(*)
+        FROM complaints
+        GROUP BY CAST(status AS VARCHAR), COALESCE(category_id, 0), CAST(created_at AS DATE)
+        """
+    )
+
+
+def downgrade():
+    # Doldurulan created_at değerleri ayırt edilemez; geri alınacak bir şey yok.
+    pass
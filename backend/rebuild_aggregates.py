@@ -0,0 +1,44 @@
+"""
+Önceden toplanmış tabloları (harita kümeleri, dashboard sayaçları)
+şikayetlerden baştan üretir. Artımlı güncellemelerde oluşabilecek
+sapmaları uzlaştırmak için de kullanılır.
+
+Kullanım:
+    python rebuild_aggregates.py                # hepsi
+    python rebuild_aggregates.py counters       # sadece stats_counters
+    python rebuild_aggregates.py clusters       # sadece complaint_cluster_cells
+"""
+import sys
+import time
+
+from app.utils.db import SessionLocal
+from app.services import cluster_service, stats_counter_service
+
+
+TARGETS = {
+    "clusters": ("Harita kümeleri", cluster_service.rebuild_clusters),
+    "counters": ("İstatistik sayaçları", stats_counter_service.rebuild_counters),
+}
+
+
+def main(names):
+    names = names or list(TARGETS)
+    unknown = [n for n in names if n not in TARGETS]
+    if unknown:
+        print(f"Bilinmeyen hedef: {', '.join(unknown)} (seçenekler: {', '.join(TARGETS)})")
+        sys.exit(2)
+
+    db = SessionLocal()
+    try:
+        for name in names:
+            label, rebuild = TARGETS[name]
+            started = time.monotonic()
+            processed = rebuild(db)
+            db.commit()
+            print(f" {label} yeniden üretildi: {processed} şikayet, {time.monotonic() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
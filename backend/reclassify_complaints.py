@@ -0,0 +1,55 @@
+"""
+Model yeniden eğitildikten sonra mevcut şikayetlerin kategorilerini yeni
+modelle günceller. Yarıda kesilirse tekrar çalıştırıldığında kaldığı yerden
+devam eder (aynı model dosyası için).
+
+Kullanım:
+    python reclassify_complaints.py                  # kaldığı yerden / baştan
+    python reclassify_complaints.py --restart        # checkpoint'i yok say
+    python reclassify_complaints.py --dry-run        # yazmadan kaç şikayetin değişeceğini say
+    python reclassify_complaints.py --chunk-size 5000
+"""
+import argparse
+
+from app.utils.db import SessionLocal
+from app.services import reclassify_service
+
+
+def _report(progress: dict):
+    print(
+        f"  {progress['processed']} şikayet işlendi, {progress['changed']} değişti "
+        f"(son id {progress['last_id']}, {progress['rows_per_sec']} satır/s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Şikayetleri mevcut kategori modeliyle yeniden sınıflandırır.")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--restart", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = reclassify_service.reclassify_complaints(
+            db,
+            chunk_size=args.chunk_size,
+            restart=args.restart,
+            dry_run=args.dry_run,
+            on_progress=_report,
+        )
+        if result["skipped"]:
+            print(f" Atlandı: {result['reason']}")
+            return
+        print(
+            f" Yeniden sınıflandırma tamamlandı: {result['processed']} şikayet, "
+            f"{result['changed']} kategori değişti, {result['dirty_days']} gün rollup için işaretlendi, "
+            f"{result['seconds']}s ({result['rows_per_sec']} satır/s)"
+            + (" [dry-run]" if args.dry_run else "")
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
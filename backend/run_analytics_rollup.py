@@ -0,0 +1,32 @@
+"""
+Analitik rollup tablolarını (complaint_daily_rollups, resolution_time_buckets)
+günceller. Cron ile periyodik çalıştırılabilir.
+
+Kullanım:
+    python run_analytics_rollup.py          # son çalışmadan beri değişen günler
+    python run_analytics_rollup.py --full   # tüm geçmişi baştan üret
+"""
+import sys
+import time
+
+from app.utils.db import SessionLocal
+from app.services import analytics_service
+
+
+def main(argv):
+    full = "--full" in argv
+    db = SessionLocal()
+    try:
+        started = time.monotonic()
+        result = analytics_service.run_rollup(db, full=full)
+        db.commit()
+        if result["skipped"]:
+            print(" Başka bir rollup çalışıyor, atlandı.")
+        else:
+            print(f" Rollup tamamlandı: {result['days']} gün, {time.monotonic() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
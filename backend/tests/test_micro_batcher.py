@@ -0,0 +1,48 @@
+import threading
+
+from app.utils.micro_batcher import MicroBatcher
+
+
+def test_cancelled_future_does_not_stop_batcher():
+    started = threading.Event()
+    gate = threading.Event()
+
+    def batch_fn(items):
+        started.set()
+        gate.wait(5)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_wait=0)
+
+    # İlk iş batch_fn içinde bekler; ikincisi kuyrukta iken iptal edilir.
+    first = batcher.submit(1)
+    assert started.wait(5)
+    pending = batcher.submit(2)
+    assert pending.cancel()
+    gate.set()
+
+    assert first.result(timeout=5) == 2
+    assert batcher.submit(3).result(timeout=5) == 6
+    assert batcher._thread.is_alive()
+
+
+def test_batch_fn_error_is_delivered_and_batcher_survives():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(items)
+        if len(calls) == 1:
+            raise ValueError("boom")
+        return items
+
+    batcher = MicroBatcher(batch_fn, max_wait=0)
+
+    failed = batcher.submit("a")
+    try:
+        failed.result(timeout=5)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("hata Future'a yazılmadı")
+
+    assert batcher.submit("b").result(timeout=5) == "b"
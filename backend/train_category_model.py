@@ -1,26 +1,302 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+"""
+Şikayet kategori modelini eğitir.
+
+Etiketli örnekler (açıklama, kategori adı) veritabanından id sırasıyla
+parça parça okunur; HashingVectorizer sözlük tutmadığı ve SGDClassifier
+partial_fit ile öğrendiği için bellek kullanımı veri miktarından bağımsızdır.
+Yeterli etiketli şikayet yoksa aşağıdaki örnek cümlelerle eğitilir.
+
+Çıktı sürümlü olarak CATEGORY_MODELS_DIR altına yazılır
+(category_model-<zaman>.pkl + .json özet) ve --no-activate verilmedikçe
+CATEGORY_MODEL_PATH'e atomik olarak kopyalanır; çalışan uygulama dosya
+değişikliğini görüp yeni modele geçer (bkz. ai_service).
+
+Kullanım:
+    python train_category_model.py                   # veritabanından eğit, aktif et
+    python train_category_model.py --seed-only       # sadece örnek cümlelerle
+    python train_category_model.py --folds 0         # çapraz doğrulamayı atla
+    python train_category_model.py --epochs 10 --chunk-size 20000 --no-activate
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
 import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from app.services.model_registry import file_sha256
+from app.utils.text_normalize import normalize_complaint_text
 
 
-texts = [
+MODEL_PATH = os.getenv("CATEGORY_MODEL_PATH", "category_model.pkl")
+MODELS_DIR = os.getenv("CATEGORY_MODELS_DIR", "category_models")
+# Bundan az etiketli şikayet varsa örnek cümlelerle eğitilir
+MIN_TRAINING_SAMPLES = 50
+# Sadece bir birimin üstlendiği şikayetler etiketli sayılır; bekleyenlerin
+# kategorisi modelin kendi tahminidir, reddedilenlerinki güvenilmez.
+TRAINING_STATUSES = ("assigned", "in_progress", "resolved")
+
+SEED_TEXTS = [
     "sokakta çöp yığılmış", "çöp bidonu dolmuş", "çöpler alınmıyor",
     "yolda çukur var", "asfalt bozuk", "yolda çalışma var",
-    "sokak lambası yanmıyor", "ışıklar patlamış", "trafik ışığı arızalı"
+    "sokak lambası yanmıyor", "ışıklar patlamış", "trafik ışığı arızalı",
 ]
-labels = [
+SEED_LABELS = [
     "Çöp", "Çöp", "Çöp",
     "Yol", "Yol", "Yol",
-    "Işıklandırma", "Işıklandırma", "Işıklandırma"
+    "Işıklandırma", "Işıklandırma", "Işıklandırma",
 ]
 
 
-vectorizer = TfidfVectorizer()
-X = vectorizer.fit_transform(texts)
+def make_vectorizer(n_features: int) -> HashingVectorizer:
+    # Metinler normalize edilmiş geliyor (ai_service de aynısını yapıyor).
+    # Karakter n-gram'ları Türkçe eklerde kelime köklerini yakalar.
+    return HashingVectorizer(
+        analyzer="char_wb",
+        ngram_range=(3, 5),
+        n_features=n_features,
+        alternate_sign=False,
+        lowercase=False,
+    )
+
+
+class SeedCorpus:
+    def __init__(self):
+        self.classes = sorted(set(SEED_LABELS))
+        self.size = len(SEED_TEXTS)
+
+    def chunks(self):
+        yield list(range(self.size)), [normalize_complaint_text(t) for t in SEED_TEXTS], list(SEED_LABELS)
+
+
+class DbCorpus:
+    """
+    (id, normalize edilmiş açıklama, kategori adı) parçaları. Her geçişte
+    tablo id > son_id ile baştan okunur; hiçbir zaman bir parçadan fazlası
+    bellekte tutulmaz.
+    """
+
+    def __init__(self, chunk_size: int):
+        from app.utils.db import SessionLocal
+        from app.models.category_model import Category
+        from app.models.complaint_model import Complaint, ComplaintStatus
+
+        self._session_factory = SessionLocal
+        self._Complaint = Complaint
+        self._Category = Category
+        self._statuses = [ComplaintStatus(s) for s in TRAINING_STATUSES]
+        self.chunk_size = chunk_size
+
+        db = SessionLocal()
+        try:
+            rows = self._labelled(db, Category.name).distinct().all()
+            self.classes = sorted(name for (name,) in rows)
+            self.size = self._labelled(db, Complaint.id).count()
+        finally:
+            db.close()
+
+    def _labelled(self, db, *columns):
+        Complaint, Category = self._Complaint, self._Category
+        return (
+            db.query(*columns)
+            .select_from(Complaint)
+            .join(Category, Category.id == Complaint.category_id)
+            .filter(Complaint.status.in_(self._statuses))
+        )
+
+    def chunks(self):
+        Complaint, Category = self._Complaint, self._Category
+        db = self._session_factory()
+        try:
+            last_id = 0
+            while True:
+                rows = (
+                    self._labelled(db, Complaint.id, Complaint.description, Category.name)
+                    .filter(Complaint.id > last_id)
+                    .order_by(Complaint.id)
+                    .limit(self.chunk_size)
+                    .all()
+                )
+                if not rows:
+                    return
+                last_id = rows[-1].id
+                yield (
+                    [row.id for row in rows],
+                    [normalize_complaint_text(row.description or "") for row in rows],
+                    [row.name for row in rows],
+                )
+        finally:
+            db.close()
+
+
+def _select(ids, texts, labels, folds, fold, holdout):
+    """fold'a düşen (holdout=True) ya da düşmeyen örnekler; fold = id % folds."""
+    if fold is None:
+        return texts, labels
+    picked = [i for i, sample_id in enumerate(ids) if (sample_id % folds == fold) == holdout]
+    return [texts[i] for i in picked], [labels[i] for i in picked]
+
+
+def train(corpus, vectorizer, epochs: int, seed: int, folds: int = 0, fold=None) -> SGDClassifier:
+    model = SGDClassifier(loss="log_loss", alpha=1e-5, random_state=seed)
+    rng = random.Random(seed)
+    for _ in range(epochs):
+        for ids, texts, labels in corpus.chunks():
+            texts, labels = _select(ids, texts, labels, folds, fold, holdout=False)
+            if not texts:
+                continue
+            # Id sırası zaman sırası; SGD parça içinde karışık örnek görmeli
+            order = list(range(len(texts)))
+            rng.shuffle(order)
+            X = vectorizer.transform([texts[i] for i in order])
+            model.partial_fit(X, [labels[i] for i in order], classes=corpus.classes)
+    return model
+
+
+def cross_validate(corpus, vectorizer, epochs: int, seed: int, folds: int):
+    scores = []
+    for fold in range(folds):
+        model = train(corpus, vectorizer, epochs, seed, folds, fold)
+        correct = total = 0
+        for ids, texts, labels in corpus.chunks():
+            texts, labels = _select(ids, texts, labels, folds, fold, holdout=True)
+            if not texts:
+                continue
+            predicted = model.predict(vectorizer.transform(texts))
+            correct += int(np.sum(predicted == np.asarray(labels)))
+            total += len(texts)
+        if total:
+            scores.append(correct / total)
+    return scores
+
+
+def measure_latency(vectorizer, model, corpus, samples: int = 200) -> dict:
+    texts = []
+    for _, chunk_texts, _ in corpus.chunks():
+        texts.extend(chunk_texts[:samples - len(texts)])
+        if len(texts) >= samples:
+            break
+
+    single = []
+    for text in texts:
+        started = time.perf_counter()
+        model.predict(vectorizer.transform([text]))
+        single.append((time.perf_counter() - started) * 1000)
+    single.sort()
+
+    started = time.perf_counter()
+    model.predict(vectorizer.transform(texts))
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        "single_p50_ms": round(single[len(single) // 2], 3),
+        "single_p95_ms": round(single[min(len(single) - 1, int(len(single) * 0.95))], 3),
+        "batch_texts_per_sec": round(len(texts) / batch_seconds) if batch_seconds > 0 else None,
+    }
+
+
+def _atomic_write(path: str, write):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_artifact(vectorizer, model, summary: dict, activate: bool) -> str:
+    """
+    Modeli sürümlü dosyaya yazar; activate ise CATEGORY_MODEL_PATH'i de
+    atomik olarak değiştirir. Okuyan süreçler hiçbir zaman yarım dosya görmez.
+    """
+    version = summary["version"]
+    path = os.path.join(MODELS_DIR, f"category_model-{version}.pkl")
+    _atomic_write(path, lambda f: joblib.dump((vectorizer, model), f))
+    # Uygulama aktif dosyanın hangi sürüm olduğunu bu özetten bulur
+    summary["sha256"] = file_sha256(path)
+    _atomic_write(
+        path[:-len(".pkl")] + ".json",
+        lambda f: f.write(json.dumps(summary, ensure_ascii=False, indent=2).encode("utf-8")),
+    )
+    if activate:
+        with open(path, "rb") as src:
+            _atomic_write(MODEL_PATH, lambda f: f.write(src.read()))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Şikayet kategori modelini eğitir.")
+    parser.add_argument("--seed-only", action="store_true", help="veritabanını kullanma")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--folds", type=int, default=5, help="k-fold çapraz doğrulama (0: kapalı)")
+    parser.add_argument("--n-features", type=int, default=2 ** 18)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-activate", action="store_true", help="sadece sürümlü dosyayı yaz")
+    args = parser.parse_args()
+
+    corpus = None
+    if not args.seed_only:
+        corpus = DbCorpus(args.chunk_size)
+        if corpus.size < MIN_TRAINING_SAMPLES or len(corpus.classes) < 2:
+            print(f"⚠️ Yeterli etiketli şikayet yok ({corpus.size}); örnek cümlelerle eğitilecek.")
+            corpus = None
+    if corpus is None:
+        corpus = SeedCorpus()
+    source = "seed" if isinstance(corpus, SeedCorpus) else "database"
+    print(f" {corpus.size} örnek, {len(corpus.classes)} kategori ({source})")
+
+    vectorizer = make_vectorizer(args.n_features)
+
+    scores = []
+    if args.folds > 1:
+        started = time.monotonic()
+        scores = cross_validate(corpus, vectorizer, args.epochs, args.seed, args.folds)
+        if scores:
+            print(
+                f" {args.folds}-fold doğruluk: {statistics.mean(scores):.3f}"
+                f" ± {statistics.pstdev(scores):.3f} ({time.monotonic() - started:.1f}s)"
+            )
+
+    started = time.monotonic()
+    model = train(corpus, vectorizer, args.epochs, args.seed)
+    train_seconds = time.monotonic() - started
+    latency = measure_latency(vectorizer, model, corpus)
+    print(
+        f" Eğitim {train_seconds:.1f}s; tahmin p50 {latency['single_p50_ms']} ms,"
+        f" p95 {latency['single_p95_ms']} ms, toplu {latency['batch_texts_per_sec']} metin/s"
+    )
 
-model = LogisticRegression()
-model.fit(X, labels)
+    summary = {
+        "version": datetime.utcnow().strftime("%Y%m%d%H%M%S"),
+        "source": source,
+        "samples": corpus.size,
+        "classes": corpus.classes,
+        "epochs": args.epochs,
+        "n_features": args.n_features,
+        "cv_folds": args.folds if scores else 0,
+        "cv_accuracy": round(statistics.mean(scores), 4) if scores else None,
+        "cv_accuracy_std": round(statistics.pstdev(scores), 4) if scores else None,
+        "train_seconds": round(train_seconds, 2),
+        "latency": latency,
+    }
+    path = save_artifact(vectorizer, model, summary, activate=not args.no_activate)
+    print(f" Model kaydedildi: {path}" + ("" if args.no_activate else f" (aktif: {MODEL_PATH})"))
 
 
-joblib.dump((vectorizer, model), "category_model.pkl")
-print(" Model kaydedildi: category_model.pkl")
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import client from "./client";
-import { Complaint, CreateComplaintDto, UpdateStatusDto } from "../types";
+import { Complaint, ComplaintFeedPage, CreateComplaintDto, NearbyComplaint, UpdateStatusDto } from "../types";
 import { Asset } from "react-native-image-picker";
 
 
@@ -53,10 +53,25 @@ export async function changeComplaintStatus(
 }
 
 export async function getFeed(
-  sort: "newest" | "popular" | "nearby" = "newest"
-): Promise<Complaint[]> {
-  const { data } = await client.get<Complaint[]>("/complaints/feed", {
-    params: { sort },
+  sort: "newest" | "oldest" | "popular" = "newest",
+  cursor?: string | null,
+  limit: number = 20
+): Promise<ComplaintFeedPage> {
+  const { data } = await client.get<ComplaintFeedPage>("/complaints/feed", {
+    params: { sort, limit, cursor: cursor ?? undefined },
+  });
+  return data;
+}
+
+// "Yakınımdakiler" feed'in bir sıralaması değil; konuma göre ayrı uç nokta.
+export async function getNearbyComplaints(
+  lat: number,
+  lon: number,
+  radiusM: number = 1000,
+  limit: number = 20
+): Promise<NearbyComplaint[]> {
+  const { data } = await client.get<NearbyComplaint[]>("/complaints/nearby", {
+    params: { lat, lon, radius_m: radiusM, limit },
   });
   return data;
 }
@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useCallback, useContext } from "react";
+import React, { useEffect, useState, useCallback, useContext, useRef } from "react";
 import {
   View,
   Text,
@@ -45,6 +45,10 @@ const HomeScreen: React.FC<Props> = ({ navigation }) => {
   const [loading, setLoading] = useState<boolean>(true);
   const [refreshing, setRefreshing] = useState<boolean>(false);
   const [sort, setSort] = useState<"newest" | "popular">("newest");
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+  // Sıralama değişince eski sıralamanın geç gelen sayfası listeye eklenmesin
+  const sortRef = useRef(sort);
 
   const [profileMenuVisible, setProfileMenuVisible] = useState(false);
   const [user, setUser] = useState<any>(null);
@@ -95,13 +99,37 @@ const HomeScreen: React.FC<Props> = ({ navigation }) => {
   const loadFeed = async (selectedSort: "newest" | "popular" = sort) => {
     try {
       setLoading(true);
-      const data = await getFeed(selectedSort);
-      setComplaints(data);
+      setNextCursor(null);
+      const page = await getFeed(selectedSort);
+      if (sortRef.current !== selectedSort) return;
+      setComplaints(page.items);
+      setNextCursor(page.next_cursor);
     } catch (err: any) {
       console.log("FEED_ERROR:", err);
     } finally {
-      setLoading(false);
-      setRefreshing(false);
+      if (sortRef.current === selectedSort) {
+        setLoading(false);
+        setRefreshing(false);
+      }
+    }
+  };
+
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore || loading || refreshing) return;
+    const selectedSort = sort;
+    try {
+      setLoadingMore(true);
+      const page = await getFeed(selectedSort, nextCursor);
+      if (sortRef.current !== selectedSort) return;
+      setComplaints((prev) => {
+        const seen = new Set(prev.map((c) => c.id));
+        return [...prev, ...page.items.filter((c) => !seen.has(c.id))];
+      });
+      setNextCursor(page.next_cursor);
+    } catch (err: any) {
+      console.log("FEED_MORE_ERROR:", err);
+    } finally {
+      setLoadingMore(false);
     }
   };
 
@@ -115,6 +143,7 @@ const HomeScreen: React.FC<Props> = ({ navigation }) => {
   };
 
   useEffect(() => {
+    sortRef.current = sort;
     loadFeed(sort);
   }, [sort]);
 
@@ -574,6 +603,11 @@ const HomeScreen: React.FC<Props> = ({ navigation }) => {
             refreshControl={
               <RefreshControl refreshing={refreshing} onRefresh={onRefresh} />
             }
+            onEndReached={loadMore}
+            onEndReachedThreshold={0.5}
+            ListFooterComponent={
+              loadingMore ? <ActivityIndicator style={{ marginVertical: 16 }} /> : null
+            }
             ListEmptyComponent={
               <View style={HomeScreenStyles.emptyContainer}>
                 <Text style={HomeScreenStyles.emptyText}>Henüz şikayet yok.</Text>
@@ -30,6 +30,15 @@ export type Complaint = {
   user_supported?: boolean;
 };
 
+export type ComplaintFeedPage = {
+  items: Complaint[];
+  next_cursor: string | null;
+};
+
+export type NearbyComplaint = Complaint & {
+  distance_m: number;
+};
+
 export interface CreateComplaintDto {
   title: string;
   description: string;